@@ -0,0 +1,361 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "src"))
+
+import pygame
+import sounds
+from board import Board, OBSTACLE, SNAKE
+from food import Food
+from settings import WINDOW_WIDTH, WINDOW_HEIGHT, CELL_SIZE, FOOD_COLOR
+from snake import Snake
+from sprites import draw_snake_body
+
+SEED = 1234
+BASELINE = os.path.join(HERE, "baseline.json")
+
+# Snakes in the update benchmarks loop around a Hamiltonian cycle over the
+# left CYCLE_COLS columns; starting obstacles go in the columns to the right.
+CYCLE_COLS = 40
+
+# Runs per benchmark in each process (--repeats); the slowest cases use a
+# third as many, but at least 3
+REPEATS = 5
+# Separate processes to measure in (--processes). Speed can differ by half
+# between two processes running the same code, with memory layout decided at
+# startup, so a single process may be stuck on its slow side.
+PROCESSES = 3
+# A case's tolerance is widened to this many times its measured noise, but
+# never past NOISE_CEILING, so a noisy case still fails at a 1.5x slowdown
+NOISE_FACTOR = 3
+NOISE_CEILING = 0.5
+
+
+# Runs `fn` (which returns seconds) `repeats` times with the garbage collector
+# off, as timeit does. Returns the best run, which is the benchmark's result,
+# and the case's noise: how far the median run sits above the best one,
+# relative to it.
+def best_of(fn, repeats=None):
+    gc.collect()
+    gc.disable()
+    try:
+        times = sorted(fn() for _ in range(repeats or REPEATS))
+    finally:
+        gc.enable()
+    best = times[0]
+    return best, (times[len(times) // 2] - best) / best if best else 0.0
+
+
+def slow_repeats():
+    return max(3, REPEATS // 3)
+
+
+def cycle_path(cols, rows):
+    # Down the first column, then snake up and down the remaining ones
+    path = [(0, y) for y in range(rows - 1, -1, -1)]
+    for x in range(1, cols):
+        ys = range(0, rows - 1) if x % 2 else range(rows - 2, -1, -1)
+        path.extend((x, y) for y in ys)
+    path.extend((x, rows - 1) for x in range(cols - 1, 0, -1))
+    return path
+
+
+def build_game(game, length, obstacles, path):
+    sim = game.sim
+    sim.reset()
+    board = Board(sim.cols, sim.rows)
+    sim.board = board
+    snake = Snake(*path[length - 1])
+    snake.segments = deque(reversed(path[:length]))
+    for x, y in snake.segments:
+        board.set(x, y, SNAKE)
+    snake.dx = path[length - 1][0] - path[length - 2][0]
+    snake.dy = path[length - 1][1] - path[length - 2][1]
+    sim.snake = snake
+    sim.obstacles = []
+    outside = [(x, y) for x in range(CYCLE_COLS, sim.cols) for y in range(sim.rows)]
+    for position in random.sample(outside, obstacles):
+        sim._place_obstacle(position)
+    sim.powerups = []
+    for food in sim.foods:
+        food.respawn(board)
+    sim.food_at = {food.position: food for food in sim.foods}
+
+
+def bench_update(game, length, obstacles, steps=2000):
+    path = cycle_path(CYCLE_COLS, game.sim.rows)
+    following = {path[i]: path[(i + 1) % len(path)] for i in range(len(path))}
+    directions = {(0, -1): "UP", (0, 1): "DOWN", (-1, 0): "LEFT", (1, 0): "RIGHT"}
+
+    def run():
+        random.seed(SEED)
+        build_game(game, length, obstacles, path)
+        elapsed = 0.0
+        done = 0
+        while done < steps:
+            sim = game.sim
+            head = (sim.snake.x, sim.snake.y)
+            target = following.get(head)
+            if not sim.alive or target is None:
+                build_game(game, length, obstacles, path)
+                continue
+            sim.change_direction(directions[(target[0] - head[0], target[1] - head[1])])
+            start = time.perf_counter()
+            game.update(sim.current_interval())
+            elapsed += time.perf_counter() - start
+            done += 1
+        return elapsed / steps
+
+    return best_of(run)
+
+
+def bench_draw(game, screen, frames=200):
+    random.seed(SEED)
+    game.seed_effects(SEED)
+    path = cycle_path(CYCLE_COLS, game.sim.rows)
+    build_game(game, 600, 300, path)
+    for _ in range(8):
+        game.particles.emit((WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2), FOOD_COLOR)
+        game._add_popup("+100", (WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2), FOOD_COLOR)
+    game.shake_time = 0
+    offset = (0, 0)
+    layers = {
+        "static": lambda: screen.blit(game.static_layer, offset),
+        "body": lambda: draw_snake_body(screen, game.sim.snake, offset),
+        "overlays": lambda: game._draw_overlays(screen, offset),
+        "particles": lambda: game.particles.draw(screen, offset),
+        "popups": lambda: game.popups.draw(screen, offset),
+        "frame": lambda: game.draw(screen),
+    }
+    results = {}
+    for name, fn in layers.items():
+        def run():
+            start = time.perf_counter()
+            for _ in range(frames):
+                fn()
+            return (time.perf_counter() - start) / frames
+        results[f"draw.{name}"] = best_of(run)
+
+    game.dirty_rects = True
+    game.draw(screen)
+    def run_dirty():
+        start = time.perf_counter()
+        for _ in range(frames):
+            game.draw(screen)
+        return (time.perf_counter() - start) / frames
+    results["draw.frame_dirty"] = best_of(run_dirty)
+    game.dirty_rects = False
+    return results
+
+
+def bench_respawn(fill, ops=2000):
+    def run():
+        random.seed(SEED)
+        board = Board(WINDOW_WIDTH // CELL_SIZE, WINDOW_HEIGHT // CELL_SIZE)
+        cells = [(x, y) for x in range(board.cols) for y in range(board.rows)]
+        for x, y in random.sample(cells, int(len(cells) * fill)):
+            board.set(x, y, OBSTACLE)
+        food = Food()
+        start = time.perf_counter()
+        for _ in range(ops):
+            food.respawn(board)
+            board.clear(*food.position)
+        return (time.perf_counter() - start) / ops
+    return best_of(run)
+
+
+def bench_snake_move(length, ops=20000):
+    def run():
+        snake = Snake(0, 0)
+        snake.segments = deque((0, i) for i in range(length))
+        start = time.perf_counter()
+        for _ in range(ops):
+            snake.move()
+        return (time.perf_counter() - start) / ops
+    return best_of(run)
+
+
+# Per-tick cost of an arena full of snakes that only ever go straight, so the
+# number measures collision and pickup resolution rather than bot decisions
+def bench_arena(snakes, ticks=1200):
+    from arena import Arena
+
+    def run():
+        arena = Arena(snakes, 400, 400, seed=SEED, food_count=snakes, bot=lambda player: None, humans=0)
+        start = time.perf_counter()
+        for _ in range(ticks):
+            arena.tick()
+        return (time.perf_counter() - start) / ticks
+    return best_of(run, slow_repeats())
+
+
+def bench_sounds():
+    rate, size, channels = 44100, -16, 2
+    results = {}
+
+    def cold():
+        start = time.perf_counter()
+        for params in sounds.TONES.values():
+            sounds.synthesize(rate, channels, *params)
+        return time.perf_counter() - start
+    results["sounds.synthesize"] = best_of(cold, slow_repeats())
+
+    cache_dir = sounds.SOUND_CACHE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        sounds.SOUND_CACHE_DIR = tmp
+        for params in sounds.TONES.values():
+            sounds.load_pcm(rate, size, channels, params)
+
+        def warm():
+            start = time.perf_counter()
+            for params in sounds.TONES.values():
+                sounds.load_pcm(rate, size, channels, params)
+            return time.perf_counter() - start
+        results["sounds.load_cached"] = best_of(warm)
+    sounds.SOUND_CACHE_DIR = cache_dir
+    return results
+
+
+def run_all():
+    pygame.init()
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    from game import Game
+    game = Game()
+
+    results = {}
+    for length in (10, 200, 1000):
+        for obstacles in (6, 300, 600):
+            results[f"update.len{length}.obs{obstacles}"] = bench_update(game, length, obstacles)
+    results.update(bench_draw(game, screen))
+    for fill in (0.5, 0.99):
+        results[f"respawn.fill{int(fill * 100)}"] = bench_respawn(fill)
+    for length in (10, 10000, 1000000):
+        results[f"snake_move.len{length}"] = bench_snake_move(length)
+    for snakes in (50, 200):
+        results[f"arena.snakes{snakes}"] = bench_arena(snakes)
+    results.update(bench_sounds())
+    pygame.quit()
+    timings = {name: best for name, (best, _) in results.items()}
+    noise = {name: spread for name, (_, spread) in results.items()}
+    return timings, noise
+
+
+# Runs every benchmark in `processes` fresh interpreters and keeps each case's
+# best time. Its noise is the larger of the noise within any one process and
+# how far the median process's best sits above the overall best.
+def run_processes(processes):
+    runs = []
+    for _ in range(processes):
+        done = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", "--repeats", str(REPEATS)],
+            check=True, capture_output=True, text=True
+        )
+        runs.append(json.loads(done.stdout.splitlines()[-1]))
+    results = {}
+    noise = {}
+    for name in runs[0]["results"]:
+        bests = sorted(run["results"][name] for run in runs)
+        best = bests[0]
+        spread = (bests[len(bests) // 2] - best) / best if best else 0.0
+        results[name] = best
+        noise[name] = max([spread] + [run["noise"][name] for run in runs])
+    return results, noise
+
+
+# A case regresses when it is slower than the baseline by more than the
+# tolerance, widened up to NOISE_CEILING for cases whose runs scatter (in this
+# run or the baseline's), and by more than `floor` seconds, so sub-microsecond jitter in
+# the tiniest cases never counts.
+def compare(results, noise, baseline, baseline_noise, tolerance, floor):
+    regressions = []
+    print(f"{'benchmark':32} {'current':>12} {'baseline':>12} {'ratio':>7} {'allowed':>8}")
+    for name, value in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print(f"{name:32} {value * 1e6:10.2f}us {'-':>12} {'-':>7} {'-':>8}")
+            continue
+        ratio = value / base if base else 1.0
+        spread = max(noise.get(name, 0.0), baseline_noise.get(name, 0.0))
+        allowed = max(tolerance, min(NOISE_CEILING, NOISE_FACTOR * spread))
+        flag = ""
+        if ratio > 1 + allowed and value - base > floor:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:32} {value * 1e6:10.2f}us {base * 1e6:10.2f}us {ratio:7.2f} {1 + allowed:8.2f}{flag}")
+    return regressions
+
+
+def main():
+    global REPEATS
+    parser = argparse.ArgumentParser(description="Benchmark PySnake hot paths headless")
+    parser.add_argument("--output", help="write results JSON to this path")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed slowdown before a benchmark counts as a regression")
+    parser.add_argument("--floor", type=float, default=1.0,
+                        help="microseconds a benchmark must slow down by to count as a regression")
+    parser.add_argument("--repeats", type=int, default=REPEATS,
+                        help="runs per benchmark in each process; the best one counts")
+    parser.add_argument("--processes", type=int, default=PROCESSES, help="processes to measure in")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="store these results as the new baseline")
+    args = parser.parse_args()
+    REPEATS = max(1, args.repeats)
+    if args.worker:
+        results, noise = run_all()
+        print(json.dumps({"results": results, "noise": noise}))
+        return 0
+
+    processes = max(1, args.processes)
+    results, noise = run_all() if processes == 1 else run_processes(processes)
+    report = {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "machine": platform.machine(),
+        "seed": SEED,
+        "repeats": REPEATS,
+        "processes": processes,
+        "results": results,
+        "noise": noise,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+        print(f"baseline written to {args.baseline}")
+        return 0
+
+    baseline = {}
+    baseline_noise = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        baseline = stored["results"]
+        baseline_noise = stored.get("noise", {})
+    regressions = compare(results, noise, baseline, baseline_noise, args.tolerance, args.floor / 1e6)
+    if regressions:
+        print(f"{len(regressions)} regression(s): {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+import random
+from board import SNAKE, FOOD, OBSTACLE, POWERUP
+from food import Food
+from snake import Snake
+from simulation import Playfield, SnakeRules, SIM_DT
+from tournament import load_bot
+from settings import (
+    GRID_COLS,
+    GRID_ROWS,
+    ARENA_SNAKES,
+    ARENA_FOOD_COUNT,
+    ARENA_POWERUPS,
+    ARENA_RESPAWN_DELAY,
+    ARENA_BOT,
+)
+
+
+# One snake in an arena with its own speed, score, combo and power-up. It
+# exposes its arena's board, foods and power-ups the way a Simulation does, so
+# single-player bots can be called with the player unchanged. Players without
+# a bot are steered from outside through change_direction().
+class Player(SnakeRules):
+    def __init__(self, arena, index, bot=None):
+        self.arena = arena
+        self.index = index
+        self.bot = bot
+        self.snake = Snake(0, 0)
+        self.alive = False
+        self.death_cause = None
+        self.death_tick = None
+        self.deaths = 0
+        self.respawn_timer = 0.0
+
+    def spawn(self, position):
+        self.snake = Snake(*position)
+        self.alive = True
+        self.death_cause = None
+        self._reset_rules()
+
+    @property
+    def board(self):
+        return self.arena.board
+
+    @property
+    def foods(self):
+        return self.arena.foods
+
+    @property
+    def powerups(self):
+        return self.arena.powerups
+
+    @property
+    def obstacles(self):
+        return self.arena.obstacles
+
+    @property
+    def cols(self):
+        return self.arena.cols
+
+    @property
+    def rows(self):
+        return self.arena.rows
+
+    @property
+    def clock(self):
+        return self.arena.clock
+
+    def change_direction(self, direction):
+        self.snake.change_direction(direction)
+
+
+# Many snakes on one board, following the single-player rules except that
+# eating does not add obstacles. The board doubles as the shared occupancy map:
+# every body, food, power-up and obstacle cell is marked on it, so a head only
+# ever looks at the cell it moves into, whatever the number of snakes.
+#
+# All snakes due to move in a tick move together. Tails leave first, so a
+# snake may follow any tail that is moving away. Each new head is then checked
+# against the board and against `claims`, a hash of the cells heads moved into
+# that tick, which catches two heads meeting on one cell or swapping places.
+# Deaths are decided for everyone before any corpse is cleared, and food and
+# power-ups are handed out afterwards in player order, so a tick costs time
+# linear in the number of snakes that move and comes out the same for a seed.
+#
+# Player 0 is the one a Game shows: its score, events and steering are what
+# the Simulation-style attributes below refer to, so update()'s `controller`
+# steers it. The first `humans` players are steered from outside, the rest by
+# `bot`; bots come back ARENA_RESPAWN_DELAY seconds after dying.
+class Arena(Playfield):
+    powerup_limit = ARENA_POWERUPS
+
+    def __init__(self, snakes=ARENA_SNAKES, cols=GRID_COLS, rows=GRID_ROWS, seed=None,
+                 food_count=ARENA_FOOD_COUNT, bot=None, humans=1):
+        self.cols = cols
+        self.rows = rows
+        self.food_count = food_count
+        self.bot = bot or load_bot(ARENA_BOT)
+        self.snakes = snakes
+        self.humans = humans
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.tick_count = 0
+        self.clock = 0.0
+        self.board = self._new_board()
+        self.players = [
+            Player(self, index, None if index < self.humans else self.bot)
+            for index in range(self.snakes)
+        ]
+        self.focus = self.players[0]
+        self._spawn(self.focus, (self.cols // 2, self.rows // 2))
+        self.powerups = []
+        self._spawn_obstacles()
+        for player in self.players[1:]:
+            self._spawn(player)
+        self.foods = [Food() for _ in range(self.food_count)]
+        self.foods = [food for food in self.foods if food.respawn(self.board, self.rng)]
+        self.food_at = {food.position: food for food in self.foods}
+        self.events = []
+
+    def _spawn(self, player, position=None):
+        if position is None:
+            position = self.board.random_free(self.rng)
+            if position is None:
+                return
+        player.spawn(position)
+        self.board.set(position[0], position[1], SNAKE)
+
+    # Simulation-style access to the focused player, for Game
+    @property
+    def snake(self):
+        return self.focus.snake
+
+    @property
+    def alive(self):
+        return self.focus.alive
+
+    @property
+    def score(self):
+        return self.focus.score
+
+    @property
+    def combo_count(self):
+        return self.focus.combo_count
+
+    @property
+    def active_powerup(self):
+        return self.focus.active_powerup
+
+    @property
+    def powerup_timer(self):
+        return self.focus.powerup_timer
+
+    def current_interval(self):
+        return self.focus.current_interval()
+
+    def change_direction(self, direction):
+        self.focus.change_direction(direction)
+
+    def move_due(self):
+        return self.focus.move_due()
+
+    def alpha(self):
+        return self.focus.alpha()
+
+    def pop_events(self):
+        events = self.events
+        self.events = []
+        return events
+
+    # Snakes move at most once per tick, which MIN_MOVE_INTERVAL > SIM_DT
+    # guarantees anyway
+    def tick(self):
+        dt = SIM_DT
+        self.tick_count += 1
+        movers = []
+        for player in self.players:
+            if not player.alive:
+                if player.bot is not None:
+                    player.respawn_timer -= dt
+                    if player.respawn_timer <= 0:
+                        self._spawn(player)
+                continue
+
+            player._count_down(dt)
+            player.accumulator += dt
+            interval = player.current_interval()
+            if player.accumulator >= interval:
+                player.accumulator -= interval
+                movers.append(player)
+
+        if movers:
+            for player in movers:
+                if player.bot is not None:
+                    direction = player.bot(player)
+                    if direction:
+                        player.snake.change_direction(direction)
+            self.step(movers)
+
+    def step(self, movers):
+        board = self.board
+        for player in movers:
+            tail = player.snake.move()
+            if tail is not None:
+                board.clear(*tail)
+
+        claims = {}
+        origins = {}
+        for player in movers:
+            head = player.snake.segments[0]
+            claims[head] = claims.get(head, 0) + 1
+            origins[player.snake.prev_head] = player
+
+        survivors = []
+        dead = []
+        for player in movers:
+            snake = player.snake
+            head = snake.segments[0]
+            kind = None
+            if not board.in_bounds(*head):
+                cause = "wall"
+            elif claims[head] > 1:
+                cause = "head"
+            else:
+                kind = board.get(*head)
+                other = origins.get(head)
+                if kind == OBSTACLE:
+                    cause = "obstacle"
+                elif kind == SNAKE:
+                    cause = "snake"
+                elif other is not None and other is not player and other.snake.segments[0] == snake.prev_head:
+                    # Two heads passing through each other
+                    cause = "head"
+                else:
+                    cause = None
+            if cause is None:
+                survivors.append((player, head, kind))
+            else:
+                dead.append((player, head, cause))
+
+        for player, head, kind in survivors:
+            board.set(head[0], head[1], SNAKE)
+        for player, head, cause in dead:
+            self._kill(player, head, cause)
+        for player, head, kind in survivors:
+            if kind == FOOD:
+                self._eat(player, head)
+            elif kind == POWERUP:
+                self._take_powerup(player, head)
+
+    def _kill(self, player, head, cause):
+        player.alive = False
+        player.death_cause = cause
+        player.death_tick = self.tick_count
+        player.deaths += 1
+        player.respawn_timer = ARENA_RESPAWN_DELAY
+        # The fatal head never made it onto the board
+        segments = player.snake.segments
+        for i in range(1, len(segments)):
+            self.board.clear(*segments[i])
+        if player is self.focus:
+            self.events.append(("dead", head))
+
+    def _eat(self, player, head):
+        food = self.food_at.pop(head)
+        # A full board has nowhere left to put this food
+        if food.respawn(self.board, self.rng):
+            self.food_at[food.position] = food
+        else:
+            self.foods.remove(food)
+        points = player._eat_food()
+        if player is self.focus:
+            self.events.append(("eat", head, points))
+        self._maybe_spawn_powerup()
+
+    def _take_powerup(self, player, head):
+        for powerup in self.powerups:
+            if head == powerup["position"]:
+                self.powerups.remove(powerup)
+                player._apply_powerup(powerup["type"])
+                if player is self.focus:
+                    self.events.append(("powerup", head, player.active_powerup))
+                break
@@ -0,0 +1,353 @@
+import array
+import heapq
+import time
+from board import SNAKE, FOOD, OBSTACLE
+from settings import AUTOPILOT_BUDGET
+
+INF = 1 << 30
+# Indexed by board cell code: 1 where the snake cannot pass
+BLOCKED = bytes(1 if kind in (SNAKE, OBSTACLE) else 0 for kind in range(256))
+MOVES = (("UP", 0, -1), ("DOWN", 0, 1), ("LEFT", -1, 0), ("RIGHT", 1, 0))
+# Share of the budget that keeping `dist` up to date may use; the rest is left
+# for checking the chosen move has room
+SYNC_SHARE = 0.75
+
+
+# Steers toward the nearest reachable food. `dist` holds every cell's path
+# length to the closest food with the snake body and obstacles as walls. It is
+# built once per board and then patched from the few cells that changed since
+# the last decision (head, tail, eaten and respawned food, new obstacles):
+# cells that lost their shortest path are invalidated in order of distance and
+# re-settled from their neighbours, and freed cells only ever lower distances.
+# Eating a food invalidates that food's whole basin, which is cheaper to
+# rebuild from scratch, so patches that grow past a sixteenth of the board do,
+# and so do patches that run past the deadline.
+#
+# A rebuild is a breadth-first search over a copy of the board taken when it
+# started. It stops at the deadline and carries on at the next decision,
+# steering greedily by grid distance to the nearest food meanwhile;
+# once it finishes, everything that changed on the board since the copy is
+# patched in.
+#
+# Candidate moves are tried nearest-food first and accepted once a flood fill
+# from the new head finds room for the whole body or reaches the tail. The
+# flood fills stop at the deadline; whatever has not been checked by then is
+# decided on distance alone.
+class Autopilot:
+    def __init__(self, budget=AUTOPILOT_BUDGET):
+        self.budget = budget
+        self.board = None
+        self.adjacent = None
+        self.dist = None
+        self.seen = None
+        self.obstacles = None
+        self.obstacle_count = 0
+        self.watched = ()
+        self.building = None
+        self.behind = False
+        self.rebuilds = 0
+        self.timeouts = 0
+        self.fallbacks = 0
+
+    def __call__(self, sim):
+        start = time.perf_counter()
+        if not self.sync(sim, start + self.budget * SYNC_SHARE):
+            self.fallbacks += 1
+        return self.choose(sim, start + self.budget)
+
+    def _watch(self, sim):
+        cells = [food.position for food in sim.foods]
+        cells.extend(powerup["position"] for powerup in sim.powerups)
+        snake = sim.snake
+        cells.append(snake.segments[0])
+        cells.append(snake.segments[-1])
+        if snake.prev_tail is not None:
+            cells.append(snake.prev_tail)
+        return cells
+
+    # Brings `dist` up to date with the board, within the deadline if it can.
+    # Returns False while a rebuild is still running.
+    def sync(self, sim, deadline):
+        board = sim.board
+        if board is not self.board or sim.obstacles is not self.obstacles:
+            self.rebuild(sim)
+        if self.building is not None:
+            if not self._build(deadline):
+                return False
+            self.behind = True
+        if self.behind:
+            # The board kept changing while the rebuild ran. Catching up gets a
+            # fresh budget if this one is spent, so it cannot fail for lack of
+            # time straight after every rebuild.
+            if time.perf_counter() > deadline:
+                return False
+            self.behind = False
+            changed = self._all_changes(sim)
+        else:
+            changed = self._watched_changes(sim)
+            if changed is None:
+                # Something changed that we were not watching for
+                self.rebuild(sim)
+                return self.sync(sim, deadline)
+        if changed and not self._update(changed, deadline):
+            self.rebuild(sim)
+            return False
+        return True
+
+    def _watched_changes(self, sim):
+        board = sim.board
+        cols = board.cols
+        cells = board.cells
+        seen = self.seen
+        changed = []
+        candidates = list(self.watched)
+        candidates.extend(self._watch(sim))
+        candidates.extend(sim.obstacles[self.obstacle_count:])
+        for x, y in candidates:
+            if not board.in_bounds(x, y):
+                continue
+            index = y * cols + x
+            if seen[index] != cells[index]:
+                changed.append((index, seen[index]))
+                seen[index] = cells[index]
+        self.obstacle_count = len(sim.obstacles)
+        self.watched = self._watch(sim)
+        if seen != cells:
+            return None
+        return changed
+
+    def _all_changes(self, sim):
+        cells = sim.board.cells
+        seen = self.seen
+        changed = [(i, old) for i, (old, new) in enumerate(zip(seen, cells)) if old != new]
+        seen[:] = cells
+        self.obstacle_count = len(sim.obstacles)
+        self.watched = self._watch(sim)
+        return changed
+
+    # Starts a rebuild from a copy of the board; _build() runs it
+    def rebuild(self, sim):
+        board = sim.board
+        if self.board is None or (board.cols, board.rows) != (self.board.cols, self.board.rows):
+            self.adjacent = self._adjacency(board.cols, board.rows)
+        self.board = board
+        self.obstacles = sim.obstacles
+        self.obstacle_count = len(sim.obstacles)
+        self.seen = bytearray(board.cells)
+        self.watched = self._watch(sim)
+        self.rebuilds += 1
+        self.behind = False
+        self.dist = None
+        dist = array.array("i", [INF]) * len(self.seen)
+        frontier = []
+        i = self.seen.find(FOOD)
+        while i >= 0:
+            frontier.append(i)
+            dist[i] = 0
+            i = self.seen.find(FOOD, i + 1)
+        self.building = (dist, frontier, 0)
+
+    # Runs the rebuild one distance ring at a time until it is done (True) or
+    # the deadline passes (False)
+    def _build(self, deadline):
+        dist, frontier, d = self.building
+        cells = self.seen
+        adjacent = self.adjacent
+        while frontier:
+            d += 1
+            next_frontier = []
+            for i in frontier:
+                for n in adjacent[i]:
+                    if dist[n] == INF and not BLOCKED[cells[n]]:
+                        dist[n] = d
+                        next_frontier.append(n)
+            frontier = next_frontier
+            if frontier and time.perf_counter() > deadline:
+                self.building = (dist, frontier, d)
+                return False
+        self.building = None
+        self.dist = dist
+        return True
+
+    def _adjacency(self, cols, rows):
+        adjacent = []
+        for i in range(cols * rows):
+            x = i % cols
+            cells = []
+            if x > 0:
+                cells.append(i - 1)
+            if x < cols - 1:
+                cells.append(i + 1)
+            if i >= cols:
+                cells.append(i - cols)
+            if i < (rows - 1) * cols:
+                cells.append(i + cols)
+            adjacent.append(tuple(cells))
+        return adjacent
+
+    def _update(self, changed, deadline):
+        board = self.board
+        cells = board.cells
+        adjacent = self.adjacent
+        dist = self.dist
+
+        # Invalidate cells whose distance depended on a cell that is now a wall
+        # or no longer food. A candidate is only dropped once every cell nearer
+        # to food has been settled, so a surviving alternative path is seen.
+        invalid = set()
+        limit = len(cells) // 16
+        heap = []
+        for index, old in changed:
+            kind = cells[index]
+            if old == FOOD or (BLOCKED[kind] and not BLOCKED[old]):
+                heapq.heappush(heap, (dist[index], index, True))
+        while heap:
+            d, i, forced = heapq.heappop(heap)
+            if i in invalid or d != dist[i] or d == INF:
+                continue
+            if not forced:
+                if cells[i] == FOOD:
+                    continue
+                supported = False
+                for n in adjacent[i]:
+                    if n not in invalid and dist[n] == d - 1 and not BLOCKED[cells[n]]:
+                        supported = True
+                        break
+                if supported:
+                    continue
+            invalid.add(i)
+            if len(invalid) > limit:
+                # Patching this much costs more than starting over
+                return False
+            if not len(invalid) & 31 and time.perf_counter() > deadline:
+                return False
+            for n in adjacent[i]:
+                if dist[n] == d + 1 and n not in invalid:
+                    heapq.heappush(heap, (d + 1, n, False))
+        for i in invalid:
+            dist[i] = INF
+
+        # Re-settle invalidated and freed cells from their neighbours, then let
+        # any lowered distance spread outward
+        heap = []
+        region = set(invalid)
+        region.update(index for index, _ in changed)
+        for i in region:
+            kind = cells[i]
+            if BLOCKED[kind]:
+                dist[i] = INF
+                continue
+            if kind == FOOD:
+                best = 0
+            else:
+                best = INF
+                for n in adjacent[i]:
+                    if dist[n] + 1 < best and not BLOCKED[cells[n]]:
+                        best = dist[n] + 1
+            if best < dist[i] or i in invalid:
+                dist[i] = best
+            if dist[i] < INF:
+                heapq.heappush(heap, (dist[i], i))
+        settled = 0
+        while heap:
+            d, i = heapq.heappop(heap)
+            if d != dist[i]:
+                continue
+            settled += 1
+            if not settled & 63 and time.perf_counter() > deadline:
+                # `dist` is half patched; the caller starts over
+                return False
+            for n in adjacent[i]:
+                if d + 1 < dist[n] and not BLOCKED[cells[n]]:
+                    dist[n] = d + 1
+                    heapq.heappush(heap, (d + 1, n))
+        return True
+
+    def _room(self, start, snake, deadline):
+        # Free cells reachable from `start`, or None once past the deadline.
+        # Stops early once there is room for the body or the tail is reachable.
+        board = self.board
+        cells = board.cells
+        adjacent = self.adjacent
+        tail = snake.segments[-1]
+        tail_index = tail[1] * board.cols + tail[0]
+        need = len(snake.segments)
+        seen = {start}
+        stack = [start]
+        count = 0
+        while stack:
+            i = stack.pop()
+            count += 1
+            if count >= need:
+                return count
+            if not count & 63 and time.perf_counter() > deadline:
+                return None
+            for n in adjacent[i]:
+                if n in seen:
+                    continue
+                if n == tail_index:
+                    return need
+                if BLOCKED[cells[n]]:
+                    continue
+                seen.add(n)
+                stack.append(n)
+        return count
+
+    # Grid distance to the nearest food, while a rebuild has not produced `dist`
+    def _grid_distance(self, sim):
+        cols = self.board.cols
+        foods = [food.position for food in sim.foods]
+
+        def distance(index):
+            x, y = index % cols, index // cols
+            return min((abs(x - fx) + abs(y - fy) for fx, fy in foods), default=INF)
+        return distance
+
+    def choose(self, sim, deadline):
+        board = self.board
+        snake = sim.snake
+        distance = self.dist.__getitem__ if self.dist is not None else self._grid_distance(sim)
+        cols = board.cols
+        head_x, head_y = snake.segments[0]
+        tail = snake.segments[-1]
+        tail_moves = snake.pending_growth == 0 and len(snake.segments) > 1
+        reverse = (-snake.dx, -snake.dy) if len(snake.segments) > 1 else None
+
+        options = []
+        for direction, dx, dy in MOVES:
+            if (dx, dy) == reverse:
+                continue
+            x, y = head_x + dx, head_y + dy
+            if not board.in_bounds(x, y):
+                continue
+            index = y * cols + x
+            if BLOCKED[board.cells[index]] and not (tail_moves and (x, y) == tail):
+                continue
+            options.append((distance(index), direction, index))
+        if not options:
+            return None
+        options.sort()
+
+        # Nearest food first; if nothing has room, take the most room found
+        best_room = -1
+        fallback = options[0][1]
+        need = len(snake.segments)
+        for _, direction, index in options:
+            room = self._room(index, snake, deadline)
+            if room is None:
+                self.timeouts += 1
+                return direction if best_room < 0 else fallback
+            if room >= need:
+                return direction
+            if room > best_room:
+                best_room = room
+                fallback = direction
+        return fallback
+
+
+autopilot = Autopilot()
+
+
+# Tournament entry point: python src/tournament.py --bot autopilot:autopilot_bot
+def autopilot_bot(sim):
+    return autopilot(sim)
@@ -0,0 +1,338 @@
+import array
+import random
+import struct
+
+EMPTY = 0
+SNAKE = 1
+FOOD = 2
+OBSTACLE = 3
+POWERUP = 4
+
+# Side of the squares renderers query a board in
+DEFAULT_CHUNK = 16
+
+WALK_STEPS = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+
+
+# The connected random walk that lays out a level's starting obstacles: from
+# `start`, each of `count` cells goes next to the last one or, a quarter of the
+# time, next to an earlier one, and after eight blocked tries the walk jumps
+# back to an earlier cell. Cells are yielded as they are chosen and must be
+# taken before the walk resumes, since `free(x, y)` decides where it can go.
+# `random()` and `pick(seq)` come from the caller's RNG.
+def obstacle_walk(start, count, free, random, pick):
+    placed = [start]
+    current = start
+    yield start
+    for _ in range(count - 1):
+        if random() < 0.25:
+            current = pick(placed)
+        for _ in range(8):
+            dx, dy = pick(WALK_STEPS)
+            position = (current[0] + dx, current[1] + dy)
+            if free(*position):
+                placed.append(position)
+                current = position
+                yield position
+                break
+        else:
+            current = pick(placed)
+
+# One byte per grid cell, row-major. Everything that takes up a cell marks it
+# here as it moves or spawns so collision and occupancy checks never have to
+# walk the snake body or the obstacle list.
+#
+# Empty cells are also kept in `free`, with `slots` mapping a cell index to its
+# position in that list (-1 when occupied). Swap-remove keeps insert, remove
+# and uniform random pick O(1) however full the board gets.
+#
+# For the large-world renderer the board also answers ChunkedBoard's spatial
+# queries (chunks_in, find_in, revisions), over `chunk` x `chunk` squares of
+# the dense cells, so a camera view works whichever storage a size picked.
+class Board:
+    def __init__(self, cols, rows, chunk=DEFAULT_CHUNK):
+        if chunk & (chunk - 1):
+            raise ValueError(f"chunk size must be a power of two, got {chunk}")
+        self.cols = cols
+        self.rows = rows
+        self.chunk = chunk
+        self.shift = chunk.bit_length() - 1
+        self.cells = bytearray(cols * rows)
+        self.free = list(range(cols * rows))
+        self.slots = array.array("i", self.free)
+        self.revisions = {}
+        # Renderers that only repaint what changed set this to a list and
+        # drain it; every cell index passed to set() is appended.
+        self.changed = None
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.cols and 0 <= y < self.rows
+
+    def get(self, x, y):
+        return self.cells[y * self.cols + x]
+
+    def is_free(self, x, y):
+        return self.cells[y * self.cols + x] == EMPTY
+
+    def is_full(self):
+        return not self.free
+
+    def free_count(self):
+        return len(self.free)
+
+    def set(self, x, y, kind):
+        index = y * self.cols + x
+        old = self.cells[index]
+        if old == EMPTY and kind != EMPTY:
+            self._take(index)
+        elif old != EMPTY and kind == EMPTY:
+            self._give(index)
+        self.cells[index] = kind
+        if (old == OBSTACLE) != (kind == OBSTACLE):
+            key = (x >> self.shift, y >> self.shift)
+            self.revisions[key] = self.revisions.get(key, 0) + 1
+        if self.changed is not None:
+            self.changed.append(index)
+
+    def clear(self, x, y):
+        self.set(x, y, EMPTY)
+
+    def random_free(self, rng=random):
+        if not self.free:
+            return None
+        index = self.free[rng.randrange(len(self.free))]
+        return (index % self.cols, index // self.cols)
+
+    def _take(self, index):
+        slot = self.slots[index]
+        last = self.free.pop()
+        if last != index:
+            self.free[slot] = last
+            self.slots[last] = slot
+        self.slots[index] = -1
+
+    def _give(self, index):
+        self.slots[index] = len(self.free)
+        self.free.append(index)
+
+    # Keys of the chunks overlapping the cell rectangle [x0, x1) x [y0, y1)
+    def chunks_in(self, x0, y0, x1, y1):
+        shift = self.shift
+        return [
+            (cx, cy)
+            for cy in range(max(0, y0) >> shift, ((min(self.rows, y1) - 1) >> shift) + 1)
+            for cx in range(max(0, x0) >> shift, ((min(self.cols, x1) - 1) >> shift) + 1)
+        ]
+
+    # Cells of the given kind inside one chunk, found with bytearray.find on
+    # each of its rows
+    def find_in(self, key, kind):
+        cells = self.cells
+        cols = self.cols
+        x0 = key[0] << self.shift
+        x1 = min(cols, x0 + self.chunk)
+        y0 = key[1] << self.shift
+        for y in range(y0, min(self.rows, y0 + self.chunk)):
+            row = y * cols
+            i = cells.find(kind, row + x0, row + x1)
+            while i >= 0:
+                yield (i - row, y)
+                i = cells.find(kind, i + 1, row + x1)
+
+    # Counts a first revision for every chunk holding an obstacle, for boards
+    # whose cells were filled in without set()
+    def _count_revisions(self):
+        self.revisions = {}
+        cells = self.cells
+        i = cells.find(OBSTACLE)
+        while i >= 0:
+            y, x = divmod(i, self.cols)
+            key = (x >> self.shift, y >> self.shift)
+            self.revisions[key] = self.revisions.get(key, 0) + 1
+            i = cells.find(OBSTACLE, i + 1)
+
+    def copy(self):
+        board = Board.__new__(Board)
+        board.cols = self.cols
+        board.rows = self.rows
+        board.chunk = self.chunk
+        board.shift = self.shift
+        board.cells = bytearray(self.cells)
+        board.free = self.free[:]
+        board.slots = self.slots[:]
+        board.revisions = dict(self.revisions)
+        board.changed = None
+        return board
+
+    # The free list is stored in order: random_free() picks by position in it,
+    # so a restored board must hand out the same cells as the original
+    def to_bytes(self):
+        return (struct.pack("<HI", self.chunk, len(self.free)) + bytes(self.cells)
+                + array.array("i", self.free).tobytes() + self.slots.tobytes())
+
+    @classmethod
+    def from_bytes(cls, cols, rows, data, pos=0):
+        chunk, count = struct.unpack_from("<HI", data, pos)
+        pos += 6
+        board = cls.__new__(cls)
+        board.cols = cols
+        board.rows = rows
+        board.chunk = chunk
+        board.shift = chunk.bit_length() - 1
+        board.cells = bytearray(data[pos:pos + cols * rows])
+        pos += cols * rows
+        free = array.array("i")
+        free.frombytes(data[pos:pos + count * free.itemsize])
+        pos += count * free.itemsize
+        board.free = free.tolist()
+        board.slots = array.array("i")
+        board.slots.frombytes(data[pos:pos + cols * rows * board.slots.itemsize])
+        pos += cols * rows * board.slots.itemsize
+        board.changed = None
+        board._count_revisions()
+        return board, pos
+
+
+# The same interface as Board for worlds too big to keep a byte per cell.
+# Cells live in square chunks of `chunk` x `chunk` bytes that exist only while
+# something occupies them, so memory follows what is on the board rather than
+# its size, and the chunks double as the spatial index renderers query to find
+# what is inside the viewport. `revisions` counts obstacle changes per chunk so
+# pre-rendered chunk art knows when it is stale.
+#
+# Random free cells are found by rejection sampling, which stays O(1) while
+# the world is mostly empty, with a linear scan as the last resort.
+class ChunkedBoard:
+    RANDOM_TRIES = 64
+
+    def __init__(self, cols, rows, chunk=DEFAULT_CHUNK):
+        if chunk & (chunk - 1):
+            raise ValueError(f"chunk size must be a power of two, got {chunk}")
+        self.cols = cols
+        self.rows = rows
+        self.chunk = chunk
+        self.shift = chunk.bit_length() - 1
+        self.mask = chunk - 1
+        self.chunks = {}
+        self.counts = {}
+        self.revisions = {}
+        self.occupied = 0
+        self.changed = None
+
+    def in_bounds(self, x, y):
+        return 0 <= x < self.cols and 0 <= y < self.rows
+
+    def get(self, x, y):
+        data = self.chunks.get((x >> self.shift, y >> self.shift))
+        if data is None:
+            return EMPTY
+        return data[((y & self.mask) << self.shift) | (x & self.mask)]
+
+    def is_free(self, x, y):
+        return self.get(x, y) == EMPTY
+
+    def is_full(self):
+        return self.occupied == self.cols * self.rows
+
+    def free_count(self):
+        return self.cols * self.rows - self.occupied
+
+    def set(self, x, y, kind):
+        key = (x >> self.shift, y >> self.shift)
+        data = self.chunks.get(key)
+        if data is None and kind != EMPTY:
+            data = self.chunks[key] = bytearray(self.chunk * self.chunk)
+            self.counts[key] = 0
+        if data is not None:
+            i = ((y & self.mask) << self.shift) | (x & self.mask)
+            old = data[i]
+            data[i] = kind
+            if old == EMPTY and kind != EMPTY:
+                self.counts[key] += 1
+                self.occupied += 1
+            elif old != EMPTY and kind == EMPTY:
+                self.counts[key] -= 1
+                self.occupied -= 1
+                if not self.counts[key]:
+                    del self.chunks[key]
+                    del self.counts[key]
+            if (old == OBSTACLE) != (kind == OBSTACLE):
+                self.revisions[key] = self.revisions.get(key, 0) + 1
+        if self.changed is not None:
+            self.changed.append(y * self.cols + x)
+
+    def clear(self, x, y):
+        self.set(x, y, EMPTY)
+
+    def random_free(self, rng=random):
+        total = self.cols * self.rows
+        if self.occupied >= total:
+            return None
+        for _ in range(self.RANDOM_TRIES):
+            index = rng.randrange(total)
+            x, y = index % self.cols, index // self.cols
+            if self.get(x, y) == EMPTY:
+                return (x, y)
+        for step in range(total):
+            i = (index + step) % total
+            x, y = i % self.cols, i // self.cols
+            if self.get(x, y) == EMPTY:
+                return (x, y)
+        return None
+
+    # Keys of the occupied chunks overlapping the cell rectangle [x0, x1) x [y0, y1)
+    def chunks_in(self, x0, y0, x1, y1):
+        chunks = self.chunks
+        keys = []
+        for cy in range(max(0, y0) >> self.shift, ((min(self.rows, y1) - 1) >> self.shift) + 1):
+            for cx in range(max(0, x0) >> self.shift, ((min(self.cols, x1) - 1) >> self.shift) + 1):
+                if (cx, cy) in chunks:
+                    keys.append((cx, cy))
+        return keys
+
+    # Cells of the given kind inside one chunk, found with bytearray.find
+    def find_in(self, key, kind):
+        data = self.chunks.get(key)
+        if data is None:
+            return
+        base_x = key[0] << self.shift
+        base_y = key[1] << self.shift
+        i = data.find(kind)
+        while i >= 0:
+            yield (base_x + (i & self.mask), base_y + (i >> self.shift))
+            i = data.find(kind, i + 1)
+
+    def copy(self):
+        board = ChunkedBoard(self.cols, self.rows, self.chunk)
+        board.chunks = {key: bytearray(data) for key, data in self.chunks.items()}
+        board.counts = dict(self.counts)
+        board.revisions = dict(self.revisions)
+        board.occupied = self.occupied
+        return board
+
+    def to_bytes(self):
+        out = bytearray(struct.pack("<HI", self.chunk, len(self.chunks)))
+        for (cx, cy), data in self.chunks.items():
+            out += struct.pack("<ii", cx, cy)
+            out += data
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, cols, rows, data, pos=0):
+        chunk, count = struct.unpack_from("<HI", data, pos)
+        pos += 6
+        board = cls(cols, rows, chunk)
+        size = chunk * chunk
+        for _ in range(count):
+            cx, cy = struct.unpack_from("<ii", data, pos)
+            pos += 8
+            cells = bytearray(data[pos:pos + size])
+            pos += size
+            filled = size - cells.count(EMPTY)
+            board.chunks[(cx, cy)] = cells
+            board.counts[(cx, cy)] = filled
+            board.occupied += filled
+            # Restored obstacles need chunk art like any others
+            if OBSTACLE in cells:
+                board.revisions[(cx, cy)] = 1
+        return board, pos
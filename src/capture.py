@@ -0,0 +1,190 @@
+import argparse
+import os
+import queue
+import sys
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from game import Game
+from replay import Replay, ReplaySimulation
+from settings import WINDOW_WIDTH, WINDOW_HEIGHT, GRID_COLS, GRID_ROWS
+
+
+# The byte order of a surface's pixels in ffmpeg's pix_fmt naming, e.g. "bgr0"
+# for the usual 32-bit XRGB surface on a little-endian machine
+def pixel_format(surface):
+    size = surface.get_bytesize()
+    names = ["0"] * size
+    for name, mask, shift in zip("rgba", surface.get_masks(), surface.get_shifts()):
+        if mask:
+            position = shift // 8
+            names[size - 1 - position if sys.byteorder == "big" else position] = name
+    return "".join(names)
+
+
+# Every frame back to back in one file, written straight from the surface's
+# pixel buffer. The file holds no header: `size` and `layout` (in
+# pixel_format()'s naming) describe it once a frame has been written.
+class RawWriter:
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "wb")
+        self.size = None
+        self.layout = None
+
+    def write(self, index, surface):
+        if self.layout is None:
+            self.size = surface.get_size()
+            self.layout = pixel_format(surface)
+        self.file.write(surface.get_view("0"))
+
+    def close(self):
+        self.file.close()
+
+
+# One numbered PNG per frame in `directory`
+class PngWriter:
+    def __init__(self, directory):
+        self.path = directory
+        os.makedirs(directory, exist_ok=True)
+        self.pattern = os.path.join(directory, "frame{:06d}.png")
+
+    def write(self, index, surface):
+        pygame.image.save(surface, self.pattern.format(index))
+
+    def close(self):
+        pass
+
+
+# Hands finished frames to a writer on its own thread, so drawing the next
+# frame overlaps writing the last. Frames are drawn into a fixed pool of
+# `depth` surfaces that go back to the pool once written: acquire() blocks
+# while the writer is `depth` frames behind, which bounds memory, and no frame
+# is ever copied on its way to the writer.
+class FrameQueue:
+    def __init__(self, writer, size, depth=8):
+        self.writer = writer
+        self.free = queue.Queue()
+        for _ in range(depth):
+            self.free.put(pygame.Surface(size).convert())
+        self.pending = queue.Queue()
+        self.count = 0
+        self.error = None
+        self.thread = threading.Thread(target=self._run, name="writer", daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            item = self.pending.get()
+            if item is None:
+                return
+            index, surface = item
+            try:
+                if self.error is None:
+                    self.writer.write(index, surface)
+            except Exception as exc:
+                self.error = exc
+            finally:
+                self.free.put(surface)
+
+    def _check(self):
+        if self.error is not None:
+            raise RuntimeError("frame writer stopped") from self.error
+
+    def acquire(self):
+        self._check()
+        return self.free.get()
+
+    def submit(self, surface):
+        self.pending.put((self.count, surface))
+        self.count += 1
+
+    def close(self):
+        self.pending.put(None)
+        self.thread.join()
+        self.writer.close()
+        self._check()
+
+
+# Plays `replay` through Game offscreen at `fps` simulated frames per second,
+# as fast as it can draw them, and hands every `every`th frame from `start`
+# seconds on to `writer`, scaled by `scale`. Capture runs for `seconds` if
+# given, otherwise until the game is over plus `tail` seconds for the death
+# effects. Returns the number of frames written.
+def capture(replay, writer, fps=60, every=1, scale=1.0, start=0.0, seconds=None, tail=1.5, depth=8):
+    sim = ReplaySimulation(replay)
+    # Only a board that does not fit on the screen needs the world camera;
+    # smaller ones draw at the fixed origin like the standard grid
+    world = replay.cols > GRID_COLS or replay.rows > GRID_ROWS
+    game = Game(dirty_rects=False, world=world, sim=sim)
+    game.seed_effects(replay.seed)
+    size = (max(1, round(WINDOW_WIDTH * scale)), max(1, round(WINDOW_HEIGHT * scale)))
+    # Downscaled frames are drawn full size once and scaled into the pool
+    canvas = None if size == (WINDOW_WIDTH, WINDOW_HEIGHT) else pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT)).convert()
+    frames = FrameQueue(writer, size, depth)
+    dt = 1.0 / fps
+    end = None if seconds is None else start + seconds
+    frame = 0
+    ended = None
+    try:
+        while True:
+            now = frame * dt
+            if end is not None and now >= end:
+                break
+            if ended is None and sim.finished():
+                ended = now
+            if ended is not None and end is None and now - ended >= tail:
+                break
+            game.update(dt)
+            if now >= start and frame % every == 0:
+                surface = frames.acquire()
+                if canvas is None:
+                    game.draw(surface)
+                else:
+                    game.draw(canvas)
+                    pygame.transform.smoothscale(canvas, size, surface)
+                frames.submit(surface)
+            frame += 1
+    finally:
+        frames.close()
+    return frames.count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a PySnake replay offscreen to raw video or PNG frames")
+    parser.add_argument("replay")
+    parser.add_argument("output", help="file for raw frames, directory for PNGs")
+    parser.add_argument("--format", choices=("raw", "png"), default="raw")
+    parser.add_argument("--fps", type=int, default=60, help="simulated frames per second")
+    parser.add_argument("--every", type=int, default=1, help="keep one frame in this many")
+    parser.add_argument("--scale", type=float, default=1.0, help="output size relative to the window")
+    parser.add_argument("--start", type=float, default=0.0, help="seconds into the game to start at")
+    parser.add_argument("--seconds", type=float, help="length of the clip (default: to the end)")
+    parser.add_argument("--queue", type=int, default=8, help="frames drawn ahead of the writer")
+    args = parser.parse_args()
+    if args.every < 1 or args.queue < 1 or args.scale <= 0 or args.fps < 1:
+        parser.error("--fps, --every and --queue must be at least 1 and --scale positive")
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    replay = Replay.load(args.replay)
+    writer = RawWriter(args.output) if args.format == "raw" else PngWriter(args.output)
+    started = time.perf_counter()
+    count = capture(replay, writer, args.fps, args.every, args.scale, args.start, args.seconds, depth=args.queue)
+    elapsed = time.perf_counter() - started
+    print(f"{writer.path}: {count} frames in {elapsed:.2f}s ({count / elapsed if elapsed else 0:.0f} frames/s)")
+    if args.format == "raw" and count:
+        width, height = writer.size
+        print(f"encode with: ffmpeg -f rawvideo -pix_fmt {writer.layout} -s {width}x{height} "
+              f"-r {args.fps / args.every:g} -i {writer.path} clip.mp4")
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
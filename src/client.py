@@ -0,0 +1,290 @@
+import argparse
+import asyncio
+import socket
+import sys
+import time
+from collections import deque
+from board import Board, ChunkedBoard, SNAKE, FOOD, OBSTACLE, POWERUP
+from food import Food
+from protocol import (
+    SNAPSHOT,
+    DELTA,
+    EVENTS,
+    POWERUPS,
+    HAS_STATUS,
+    HAS_EVENTS,
+    MOVED,
+    GREW,
+    FrameBuffer,
+    Reader,
+    encode_join,
+    encode_input,
+    encode_reset,
+    read_status,
+)
+from snake import Snake
+from settings import (
+    POWERUP_DURATION,
+    DENSE_BOARD_LIMIT,
+    WORLD_CHUNK,
+    SERVER_HOST,
+    SERVER_PORT,
+)
+
+DIRECTION_STEPS = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+
+
+# A client-side stand-in for Simulation that mirrors a room on the server.
+# It has the attributes Game draws from, applies the server's snapshots and
+# deltas as they arrive through feed(), and sends direction changes and
+# restarts to the server through `send` instead of acting on them locally.
+class RemoteSimulation:
+    def __init__(self, send, room=0):
+        self.send = send
+        self.frames = FrameBuffer()
+        self.cols = 0
+        self.rows = 0
+        self.tick_count = 0
+        self.board = Board(0, 0)
+        self.snake = Snake(0, 0)
+        self.foods = []
+        self.powerups = []
+        self.obstacles = []
+        self.score = 0
+        self.combo_count = 0
+        self.active_powerup = None
+        self.powerup_timer = 0.0
+        self.interval = 1.0
+        self.alive = True
+        self.accumulator = 0.0
+        self.clock = 0.0
+        self.events = []
+        self.moves = 0
+        self.messages = 0
+        self.bytes_received = 0
+        self.synced = False
+        self.send(encode_join(room))
+
+    def feed(self, data):
+        self.bytes_received += len(data)
+        for message in self.frames.feed(data):
+            self.messages += 1
+            reader = Reader(message)
+            if reader.kind == SNAPSHOT:
+                self._apply_snapshot(reader)
+            elif reader.kind == DELTA and self.synced:
+                self._apply_delta(reader)
+
+    def _set_status(self, reader):
+        (self.score, self.combo_count, self.active_powerup,
+         self.powerup_timer, self.interval, self.alive) = read_status(reader)
+
+    def _apply_snapshot(self, reader):
+        self.tick_count = reader.varint()
+        self.cols = reader.varint()
+        self.rows = reader.varint()
+        self._set_status(reader)
+        if self.cols * self.rows > DENSE_BOARD_LIMIT:
+            self.board = ChunkedBoard(self.cols, self.rows, WORLD_CHUNK)
+        else:
+            self.board = Board(self.cols, self.rows)
+        dx = reader.zigzag()
+        dy = reader.zigzag()
+        segments = [reader.cell() for _ in range(reader.varint())]
+        self.snake = Snake(*segments[0])
+        self.snake.segments = deque(segments)
+        self.snake.dx, self.snake.dy = dx, dy
+        for x, y in segments:
+            if self.board.in_bounds(x, y):
+                self.board.set(x, y, SNAKE)
+        self.foods = []
+        self.powerups = []
+        self.obstacles = []
+        for _ in range(reader.varint()):
+            self._set_cell(reader.varint())
+        self.accumulator = 0.0
+        self.synced = True
+
+    def _set_cell(self, value):
+        index, kind = value >> 3, value & 7
+        x, y = index % self.cols, index // self.cols
+        old = self.board.get(x, y)
+        if old == kind:
+            return
+        self._forget(x, y, old)
+        self.board.set(x, y, kind)
+        if kind == FOOD:
+            food = Food()
+            food.position = (x, y)
+            self.foods.append(food)
+        elif kind == POWERUP:
+            self.powerups.append({"type": None, "position": (x, y)})
+        elif kind == OBSTACLE:
+            self.obstacles.append((x, y))
+
+    def _forget(self, x, y, old):
+        if old == FOOD:
+            self.foods = [food for food in self.foods if food.position != (x, y)]
+        elif old == POWERUP:
+            self.powerups = [p for p in self.powerups if p["position"] != (x, y)]
+
+    def _apply_delta(self, reader):
+        flags = reader.byte()
+        self.tick_count = reader.varint()
+        if flags & HAS_STATUS:
+            self._set_status(reader)
+        if flags & HAS_EVENTS:
+            for _ in range(reader.varint()):
+                kind = EVENTS[reader.byte()]
+                cell = reader.cell()
+                if kind == "eat":
+                    self.events.append((kind, cell, reader.varint()))
+                elif kind == "powerup":
+                    self.events.append((kind, cell, POWERUPS[reader.varint()]))
+                    self.powerup_timer = POWERUP_DURATION
+                else:
+                    self.events.append((kind, cell))
+        if flags & MOVED:
+            self._move(reader.cell(), flags & GREW)
+        for _ in range(reader.varint()):
+            self._set_cell(reader.varint())
+
+    def _move(self, head, grew):
+        snake = self.snake
+        board = self.board
+        snake.prev_head = snake.segments[0]
+        snake.dx = head[0] - snake.prev_head[0]
+        snake.dy = head[1] - snake.prev_head[1]
+        if grew:
+            snake.prev_tail = None
+        else:
+            snake.prev_tail = snake.segments.pop()
+            if board.in_bounds(*snake.prev_tail):
+                board.clear(*snake.prev_tail)
+        snake.segments.appendleft(head)
+        # A fatal move leaves the cell it ran into as it was
+        if self.alive:
+            self._forget(head[0], head[1], board.get(*head))
+            board.set(head[0], head[1], SNAKE)
+        self.accumulator = 0.0
+        self.moves += 1
+
+    # The same calls Game makes on a local Simulation
+    def update(self, dt, controller=None, max_ticks=None):
+        self.accumulator += dt
+        if self.powerup_timer > 0:
+            self.powerup_timer = max(0.0, self.powerup_timer - dt)
+        if controller is not None and self.moves:
+            self.moves = 0
+            controller(self)
+        return 0
+
+    def pop_events(self):
+        events = self.events
+        self.events = []
+        return events
+
+    def reset(self, seed=None):
+        if self.synced and not self.alive:
+            self.send(encode_reset())
+
+    def change_direction(self, direction):
+        self.send(encode_input(direction))
+
+    def current_interval(self):
+        return self.interval
+
+    def alpha(self):
+        if self.interval <= 0:
+            return 1.0
+        return max(0.0, min(1.0, self.accumulator / self.interval))
+
+
+# A headless player for load tests: mirrors a room over asyncio streams and
+# steers with `bot` after every move, restarting whenever it dies
+async def run_bot_client(host, port, room, bot, duration, read_pause=0.0):
+    reader, writer = await asyncio.open_connection(host, port)
+    remote = RemoteSimulation(writer.write, room)
+    deadline = time.perf_counter() + duration
+    try:
+        while time.perf_counter() < deadline:
+            try:
+                data = await asyncio.wait_for(reader.read(65536), deadline - time.perf_counter())
+            except asyncio.TimeoutError:
+                break
+            if not data:
+                break
+            remote.feed(data)
+            if not remote.synced:
+                continue
+            if not remote.alive:
+                remote.reset()
+            elif remote.moves:
+                remote.moves = 0
+                direction = bot(remote)
+                if direction and DIRECTION_STEPS[direction] != (remote.snake.dx, remote.snake.dy):
+                    remote.change_direction(direction)
+            if read_pause:
+                # A slow reader, to exercise the server's backpressure
+                await asyncio.sleep(read_pause)
+    finally:
+        writer.close()
+    return remote
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play PySnake on a server")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--room", type=int, default=0)
+    args = parser.parse_args()
+
+    import pygame
+    from settings import WINDOW_WIDTH, WINDOW_HEIGHT, FPS
+    from game import Game
+
+    pygame.init()
+    pygame.display.set_caption("PySnake")
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    clock = pygame.time.Clock()
+    sock = socket.create_connection((args.host, args.port))
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    remote = RemoteSimulation(sock.sendall, args.room)
+    sock.setblocking(False)
+    game = Game(sim=remote)
+
+    running = True
+    last_frame = time.perf_counter()
+    while running:
+        clock.tick(FPS)
+        now = time.perf_counter()
+        dt = now - last_frame
+        last_frame = now
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            else:
+                game.handle_event(event)
+        try:
+            while True:
+                data = sock.recv(65536)
+                if not data:
+                    running = False
+                    break
+                remote.feed(data)
+        except BlockingIOError:
+            pass
+        game.update(dt)
+        if remote.synced:
+            rects = game.draw(screen)
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+    sock.close()
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,65 +1,99 @@
-import array
-import math
+import os
+import numpy as np
 import pygame
 import random
-from snake import Snake
-from food import Food
+import time
+from arena import Arena
+from autopilot import Autopilot
+from board import SNAKE, FOOD, POWERUP
+from particles import ParticlePool, PopupPool
+from profiler import FrameProfiler
+from replay import Replay, ReplaySimulation
+from simulation import Simulation
+from sounds import SoundBank
+from sprites import sprite_cache, TextCache, BODY_COLOR, draw_snake_body, draw_snake_moving
+from worker import ThreadedSimulation
+from world import WorldView
 from settings import (
     WINDOW_WIDTH,
     WINDOW_HEIGHT,
-    INITIAL_MOVE_INTERVAL,
-    SPEED_UP_FACTOR,
     CELL_SIZE,
     WHITE,
-    FOOD_COUNT,
-    OBSTACLE_COUNT,
     OBSTACLE_COLOR,
     BG_COLOR,
     GRID_COLOR,
     FOOD_COLOR,
     POWERUP_COLOR,
     COMBO_COLOR,
-    POWERUP_SPAWN_CHANCE,
-    POWERUP_DURATION,
-    POWERUP_SLOW_FACTOR,
-    POWERUP_SCORE_MULTIPLIER,
-    COMBO_WINDOW,
-    BASE_SCORE,
-    PARTICLE_COUNT,
     SHAKE_EAT,
     SHAKE_DEAD,
+    DIRTY_RECTS,
+    REPLAY_DIR,
+    WORLD_MODE,
+    WORLD_COLS,
+    WORLD_ROWS,
+    WORLD_FOOD_COUNT,
+    ARENA_MODE,
+    RIVAL_COLOR,
 )
 
+DIRECTION_KEYS = (pygame.K_UP, pygame.K_DOWN, pygame.K_LEFT, pygame.K_RIGHT)
+RIVAL_BODY_COLOR = tuple(max(0, c - 30) for c in RIVAL_COLOR)
+
 class Game:
-    def __init__(self):
+    def __init__(self, dirty_rects=DIRTY_RECTS, profiler=None, world=WORLD_MODE, sim=None, arena=ARENA_MODE):
+        # Arenas are played on the screen-sized board. Like the scrolling world
+        # view, they repaint everything each frame.
+        if sim is not None:
+            arena = isinstance(sim, Arena)
+        world = world and not arena
+        self.arena = arena
+        self.dirty_rects = dirty_rects and not world and not arena
+        self.profiler = profiler or FrameProfiler(enabled=False)
+        self._scene_offset = (0, 0)
+        self._last_rects = []
         self.font = pygame.font.SysFont(None, 36)
         self.large_font = pygame.font.SysFont(None, 72)
         self.small_font = pygame.font.SysFont(None, 24)
+        self.text_cache = TextCache()
+        # Cosmetic randomness stays off the simulation's RNG so effects can
+        # never change how a seeded game plays out
+        self.rng = random.Random()
+        self.particles = ParticlePool()
+        self.popups = PopupPool()
         self.background = self._build_background()
-        self.sounds = self._build_sounds()
-        self.reset()
+        self.static_layer = self.background.copy()
+        self._layer_obstacles = None
+        self._layer_count = 0
+        self.sounds = SoundBank()
+        # Anything with Simulation's attributes can be drawn, e.g. a mirror of
+        # a game running on a server (client.py)
+        if world:
+            self.view = WorldView(WINDOW_WIDTH, WINDOW_HEIGHT)
+            self.sim = sim or Simulation(WORLD_COLS, WORLD_ROWS, food_count=WORLD_FOOD_COUNT)
+        else:
+            self.view = None
+            self.sim = sim or (Arena() if arena else Simulation())
+        self.autopilot = None
+        # The simulation starts out fresh, or exactly as the caller built it
+        self._clear_effects()
 
     def reset(self):
-        start_x = (WINDOW_WIDTH // 2) // CELL_SIZE * CELL_SIZE
-        start_y = (WINDOW_HEIGHT // 2) // CELL_SIZE * CELL_SIZE
-        self.snake = Snake(start_x, start_y)
-        self._spawn_obstacles()
-        self.foods = [Food() for _ in range(FOOD_COUNT)]
-        self.powerups = []
-        self._respawn_all_foods()
-        self.alive = True
-        self.move_interval = INITIAL_MOVE_INTERVAL
-        self.accumulator = 0.0
-        self.score = 0
-        self.combo_timer = 0.0
-        self.combo_count = 0
-        self.score_multiplier = 1
-        self.powerup_timer = 0.0
-        self.active_powerup = None
-        self.particles = []
-        self.popups = []
+        self.sim.reset()
+        self._clear_effects()
+
+    def _clear_effects(self):
+        self.particles.clear()
+        self.popups.clear()
         self.shake_time = 0.0
         self.shake_intensity = 0.0
+        self._input = None
+
+    # Seeds the cosmetic randomness (shake and particles), e.g. so a capture of
+    # a replay comes out the same every time
+    def seed_effects(self, seed):
+        self.rng.seed(seed)
+        self.particles.rng = np.random.default_rng(seed)
 
     def _build_background(self):
         surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
@@ -70,376 +104,314 @@ class Game:
             pygame.draw.line(surface, GRID_COLOR, (0, y), (WINDOW_WIDTH, y))
         return surface
 
-    def _build_sounds(self):
-        if not pygame.mixer.get_init():
-            return {}
-        rate, size, channels = pygame.mixer.get_init()
-        if abs(size) != 16:
-            return {}
-
-        def tone(freq, duration, volume):
-            samples = int(rate * duration)
-            buf = array.array("h")
-            amplitude = int(volume * 32767)
-            for i in range(samples):
-                sample = int(amplitude * math.sin(2 * math.pi * freq * i / rate))
-                buf.append(sample)
-                if channels == 2:
-                    buf.append(sample)
-            return pygame.mixer.Sound(buffer=buf)
-
-        return {
-            "eat": tone(720, 0.08, 0.35),
-            "powerup": tone(880, 0.12, 0.35),
-            "dead": tone(220, 0.25, 0.5),
-        }
-
-    def _play_sound(self, key):
-        sound = self.sounds.get(key)
-        if sound:
-            sound.play()
-
-    def _spawn_obstacles(self):
-        self.obstacles = []
-        max_cols = WINDOW_WIDTH // CELL_SIZE
-        max_rows = WINDOW_HEIGHT // CELL_SIZE
-        occupied = set(self.snake.segments)
-        if OBSTACLE_COUNT <= 0:
-            return
-
-        directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-        start_col = random.randint(0, max_cols - 1)
-        start_row = random.randint(0, max_rows - 1)
-        start = (start_col * CELL_SIZE, start_row * CELL_SIZE)
-        while start in occupied:
-            start_col = random.randint(0, max_cols - 1)
-            start_row = random.randint(0, max_rows - 1)
-            start = (start_col * CELL_SIZE, start_row * CELL_SIZE)
-
-        self.obstacles.append(start)
-        occupied.add(start)
-        current = start
-
-        for _ in range(OBSTACLE_COUNT - 1):
-            if random.random() < 0.25:
-                current = random.choice(self.obstacles)
-
-            placed = False
-            for _ in range(8):
-                dx, dy = random.choice(directions)
-                next_pos = (current[0] + dx * CELL_SIZE, current[1] + dy * CELL_SIZE)
-                if (next_pos[0] < 0 or next_pos[0] >= WINDOW_WIDTH or
-                        next_pos[1] < 0 or next_pos[1] >= WINDOW_HEIGHT):
-                    continue
-                if next_pos in occupied:
-                    continue
-                self.obstacles.append(next_pos)
-                occupied.add(next_pos)
-                current = next_pos
-                placed = True
-                break
-
-            if not placed:
-                current = random.choice(self.obstacles)
-
-    def _respawn_all_foods(self):
-        occupied = list(self.snake.segments) + self.obstacles
-        for powerup in self.powerups:
-            occupied.append(powerup["position"])
-        for food in self.foods:
-            food.respawn(occupied)
-            occupied.append(food.position)
-
-    def _spawn_powerup(self):
-        max_cols = WINDOW_WIDTH // CELL_SIZE
-        max_rows = WINDOW_HEIGHT // CELL_SIZE
-        occupied = set(self.snake.segments)
-        for food in self.foods:
-            occupied.add(food.position)
-        for pos in self.obstacles:
-            occupied.add(pos)
-        for powerup in self.powerups:
-            occupied.add(powerup["position"])
-
-        for _ in range(200):
-            x = random.randint(0, max_cols - 1) * CELL_SIZE
-            y = random.randint(0, max_rows - 1) * CELL_SIZE
-            if (x, y) not in occupied:
-                kind = random.choice(["slow", "double"])
-                self.powerups.append({"type": kind, "position": (x, y)})
-                break
-
-    def _maybe_spawn_powerup(self):
-        if random.random() <= POWERUP_SPAWN_CHANCE:
-            if len(self.powerups) < 1:
-                self._spawn_powerup()
-
-    def _add_particles(self, position, color, count=PARTICLE_COUNT):
-        for _ in range(count):
-            angle = random.random() * 6.283
-            speed = random.uniform(40, 140)
-            self.particles.append({
-                "x": position[0] + CELL_SIZE / 2,
-                "y": position[1] + CELL_SIZE / 2,
-                "vx": speed * math.cos(angle),
-                "vy": speed * math.sin(angle),
-                "life": random.uniform(0.4, 0.9),
-                "color": color,
-                "size": random.randint(2, 4),
-            })
+    # Background plus obstacles, kept across frames. Obstacles only ever get
+    # appended to the simulation's list, so new ones are drawn into the layer
+    # as they appear; a fresh list (after reset) rebuilds it from scratch.
+    def _update_static_layer(self):
+        obstacles = self.sim.obstacles
+        if obstacles is not self._layer_obstacles:
+            self.static_layer.blit(self.background, (0, 0))
+            self._layer_obstacles = obstacles
+            self._layer_count = 0
+        for obstacle in obstacles[self._layer_count:]:
+            self._draw_obstacle(self.static_layer, obstacle, (0, 0))
+        self.profiler.count("obstacles", len(obstacles) - self._layer_count)
+        self._layer_count = len(obstacles)
+
+    # Forces the next dirty-rect frame to repaint the whole screen, e.g. after
+    # something outside the game has drawn over it.
+    def invalidate(self):
+        self.sim.board.changed = None
+
+    # The game that just ended as a Replay, or None for games that are not
+    # recorded: arenas, remote games and games played back from a replay,
+    # which are already on disk. A simulation on a worker thread records its
+    # own, since only the worker may read it.
+    def _recording(self):
+        sim = self.sim
+        if isinstance(sim, ThreadedSimulation):
+            return sim.replay
+        if isinstance(sim, Simulation) and not isinstance(sim, ReplaySimulation):
+            return Replay.from_simulation(sim)
+        return None
+
+    def _save_replay(self, replay):
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        path = os.path.join(REPLAY_DIR, f"{replay.seed:016x}-{replay.score}.psr")
+        replay.save(path)
 
     def _add_popup(self, text, position, color):
-        self.popups.append({
-            "text": text,
-            "x": position[0] + CELL_SIZE / 2,
-            "y": position[1] + CELL_SIZE / 2,
-            "vy": -20,
-            "life": 1.0,
-            "color": color,
-        })
-
-    def _update_particles(self, dt):
-        alive = []
-        for p in self.particles:
-            p["life"] -= dt
-            if p["life"] <= 0:
-                continue
-            p["x"] += p["vx"] * dt
-            p["y"] += p["vy"] * dt
-            alive.append(p)
-        self.particles = alive
-
-    def _update_popups(self, dt):
-        alive = []
-        for popup in self.popups:
-            popup["life"] -= dt
-            if popup["life"] <= 0:
-                continue
-            popup["y"] += popup["vy"] * dt
-            alive.append(popup)
-        self.popups = alive
-
-    def _current_interval(self):
-        if self.powerup_timer > 0 and self.active_powerup == "slow":
-            return self.move_interval * POWERUP_SLOW_FACTOR
-        return self.move_interval
-
-    def _draw_glow(self, screen, position, color, size):
-        glow_size = size * 2
-        glow = pygame.Surface((glow_size, glow_size), pygame.SRCALPHA)
-        glow_color = (color[0], color[1], color[2], 90)
-        pygame.draw.rect(
-            glow,
-            glow_color,
-            (size // 2, size // 2, size, size),
-            border_radius=4
-        )
-        screen.blit(
-            glow,
-            (position[0] - size // 2, position[1] - size // 2),
-            special_flags=pygame.BLEND_RGBA_ADD
-        )
+        self.popups.emit(self.text_cache.render(self.small_font, text, color), position)
 
-    def _add_obstacles(self, count=1):
-        max_cols = WINDOW_WIDTH // CELL_SIZE
-        max_rows = WINDOW_HEIGHT // CELL_SIZE
-        occupied = set(self.snake.segments)
-        for food in self.foods:
-            occupied.add(food.position)
-        for powerup in self.powerups:
-            occupied.add(powerup["position"])
-        for pos in self.obstacles:
-            occupied.add(pos)
-        for _ in range(count):
-            # Spawn new obstacles anywhere on the grid (not necessarily connected)
-            for _ in range(200):
-                x = random.randint(0, max_cols - 1) * CELL_SIZE
-                y = random.randint(0, max_rows - 1) * CELL_SIZE
-                if (x, y) not in occupied:
-                    self.obstacles.append((x, y))
-                    occupied.add((x, y))
-                    break
-    
     def handle_event(self, event):
         if event.type == pygame.KEYDOWN:
-            if not self.alive and event.key == pygame.K_r:
+            if not self.sim.alive and event.key == pygame.K_r:
                 self.reset()
                 return
+            if event.key == pygame.K_a and not (self.view or self.arena):
+                self.autopilot = None if self.autopilot else Autopilot()
+                return
+            if event.key in DIRECTION_KEYS and self._input is None:
+                # Synthetic events (latency.py) carry the time they were posted
+                now = time.perf_counter()
+                self._input = (getattr(event, "sent", None) or now, now)
             if event.key == pygame.K_UP:
-                self.snake.change_direction("UP")
+                self.sim.change_direction("UP")
             elif event.key == pygame.K_DOWN:
-                self.snake.change_direction("DOWN")
+                self.sim.change_direction("DOWN")
             elif event.key == pygame.K_LEFT:
-                self.snake.change_direction("LEFT")
+                self.sim.change_direction("LEFT")
             elif event.key == pygame.K_RIGHT:
-                self.snake.change_direction("RIGHT")
+                self.sim.change_direction("RIGHT")
     
     def update(self, dt):
-        self._update_particles(dt)
-        self._update_popups(dt)
+        self.particles.update(dt)
+        self.popups.update(dt)
         if self.shake_time > 0:
             self.shake_time = max(0.0, self.shake_time - dt)
 
-        if self.combo_timer > 0:
-            self.combo_timer = max(0.0, self.combo_timer - dt)
-            if self.combo_timer == 0:
-                self.combo_count = 0
-
-        if self.powerup_timer > 0:
-            self.powerup_timer = max(0.0, self.powerup_timer - dt)
-            if self.powerup_timer == 0:
-                self.active_powerup = None
-                self.score_multiplier = 1
-
-        if not self.alive:
-            return
-
-        interval = self._current_interval()
-        self.accumulator += dt
-        while self.accumulator >= interval:
-            self.snake.move()
-            self.accumulator -= interval
-
-            if (self.snake.x < 0 or
-                    self.snake.x + self.snake.size > WINDOW_WIDTH or
-                    self.snake.y < 0 or
-                    self.snake.y + self.snake.size > WINDOW_HEIGHT):
-                self.alive = False
-
-            if (self.snake.x, self.snake.y) in self.obstacles:
-                self.alive = False
-
-            if self.snake.is_self_collision():
-                self.alive = False
-
-            if not self.alive:
-                self.shake_time = 0.25
-                self.shake_intensity = SHAKE_DEAD
-                self._play_sound("dead")
-                break
-
-            for powerup in list(self.powerups):
-                if (self.snake.x, self.snake.y) == powerup["position"]:
-                    self.powerups.remove(powerup)
-                    self.active_powerup = powerup["type"]
-                    self.powerup_timer = POWERUP_DURATION
-                    if self.active_powerup == "double":
-                        self.score_multiplier = POWERUP_SCORE_MULTIPLIER
-                        self._add_popup("2X", powerup["position"], POWERUP_COLOR)
-                    else:
-                        self._add_popup("SLOW", powerup["position"], POWERUP_COLOR)
-                    self._add_particles(powerup["position"], POWERUP_COLOR, 12)
-                    self.shake_time = 0.1
-                    self.shake_intensity = SHAKE_EAT
-                    self._play_sound("powerup")
-                    break
-
-            for food in self.foods:
-                if (self.snake.x, self.snake.y) == food.position:
-                    occupied = list(self.snake.segments) + self.obstacles
-                    for other in self.foods:
-                        if other is not food:
-                            occupied.append(other.position)
-                    for powerup in self.powerups:
-                        occupied.append(powerup["position"])
-                    food.respawn(occupied)
-                    self.snake.grow(1)
-                    self.move_interval *= SPEED_UP_FACTOR
-                    if self.combo_timer > 0:
-                        self.combo_count += 1
-                    else:
-                        self.combo_count = 1
-                    self.combo_timer = COMBO_WINDOW
-                    points = BASE_SCORE * self.combo_count * self.score_multiplier
-                    self.score += points
-                    self._add_popup(f"+{points}", food.position, COMBO_COLOR)
-                    self._add_particles(food.position, FOOD_COLOR)
-                    self.shake_time = 0.12
-                    self.shake_intensity = SHAKE_EAT
-                    self._add_obstacles(1)
-                    self._maybe_spawn_powerup()
-                    self._play_sound("eat")
-                    break
+        head = self.sim.snake.segments[0]
+        ticks = self.sim.update(dt, self._steer if self.autopilot else None)
+        self.profiler.count("ticks", ticks)
+        if self._input is not None:
+            self._measure_latency(head)
+        for event in self.sim.pop_events():
+            self._handle_sim_event(event)
+
+    # Input-to-move latency: from a direction key being pressed (or, for real
+    # keys, polled) to the first move made after the key was handed to the
+    # simulation. A simulation on a worker thread reports when the worker
+    # made its last move; otherwise any move happened during this update.
+    def _measure_latency(self, head):
+        pressed, handed = self._input
+        move_time = getattr(self.sim, "move_time", None)
+        if move_time is None:
+            if self.sim.snake.segments[0] == head:
+                return
+            move_time = time.perf_counter()
+        if move_time >= handed:
+            self.profiler.latency(move_time - pressed)
+            self._input = None
+
+    def _steer(self, sim):
+        direction = self.autopilot(sim)
+        if direction:
+            sim.change_direction(direction)
+
+    def _handle_sim_event(self, event):
+        kind, cell = event[0], event[1]
+        position = (cell[0] * CELL_SIZE, cell[1] * CELL_SIZE)
+        if kind == "dead":
+            replay = self._recording() if REPLAY_DIR else None
+            if replay is not None:
+                self._save_replay(replay)
+            self.shake_time = 0.25
+            self.shake_intensity = SHAKE_DEAD
+            self.sounds.play("dead")
+        elif kind == "powerup":
+            if event[2] == "double":
+                self._add_popup("2X", position, POWERUP_COLOR)
+            else:
+                self._add_popup("SLOW", position, POWERUP_COLOR)
+            self.particles.emit(position, POWERUP_COLOR, 12)
+            self.shake_time = 0.1
+            self.shake_intensity = SHAKE_EAT
+            self.sounds.play("powerup")
+        elif kind == "eat":
+            self._add_popup(f"+{event[2]}", position, COMBO_COLOR)
+            self.particles.emit(position, FOOD_COLOR)
+            self.shake_time = 0.12
+            self.shake_intensity = SHAKE_EAT
+            self.sounds.play("eat")
 
     def draw(self, screen):
         offset_x = 0
         offset_y = 0
         if self.shake_time > 0:
-            offset_x = random.randint(-self.shake_intensity, self.shake_intensity)
-            offset_y = random.randint(-self.shake_intensity, self.shake_intensity)
+            offset_x = self.rng.randint(-self.shake_intensity, self.shake_intensity)
+            offset_y = self.rng.randint(-self.shake_intensity, self.shake_intensity)
+        offset = (offset_x, offset_y)
+
+        if self.view:
+            return self._draw_world(screen, offset)
+
+        self._update_static_layer()
+        if self.dirty_rects:
+            return self._draw_dirty(screen, offset)
 
         screen.fill(BG_COLOR)
-        screen.blit(self.background, (offset_x, offset_y))
-
-        alpha = 1.0
-        interval = self._current_interval()
-        if interval > 0:
-            alpha = max(0.0, min(1.0, self.accumulator / interval))
-
-        for obstacle in self.obstacles:
-            pygame.draw.rect(
-                screen,
-                OBSTACLE_COLOR,
-                (obstacle[0] + offset_x, obstacle[1] + offset_y, CELL_SIZE, CELL_SIZE),
-                border_radius=2
-            )
-
-        for food in self.foods:
-            self._draw_glow(screen, (food.position[0] + offset_x, food.position[1] + offset_y), FOOD_COLOR, CELL_SIZE)
-            food.draw(screen, (offset_x, offset_y))
-
-        for powerup in self.powerups:
-            self._draw_glow(screen, (powerup["position"][0] + offset_x, powerup["position"][1] + offset_y), POWERUP_COLOR, CELL_SIZE)
-            pygame.draw.rect(
-                screen,
-                POWERUP_COLOR,
-                (powerup["position"][0] + offset_x, powerup["position"][1] + offset_y, CELL_SIZE, CELL_SIZE),
-                border_radius=6
-            )
-
-        self.snake.draw(screen, alpha, (offset_x, offset_y))
-
-        for p in self.particles:
-            pygame.draw.circle(
-                screen,
-                p["color"],
-                (int(p["x"] + offset_x), int(p["y"] + offset_y)),
-                p["size"]
-            )
-
-        for popup in self.popups:
-            text = self.small_font.render(popup["text"], True, popup["color"])
-            screen.blit(
-                text,
-                (popup["x"] - text.get_width() / 2 + offset_x,
-                 popup["y"] - text.get_height() / 2 + offset_y)
-            )
-
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
+        self._draw_scene(screen, offset)
+        self._draw_overlays(screen, offset)
+        return None
+
+    # Dirty-rect mode keeps the scene (static layer and resting snake body)
+    # on the screen between frames. Each frame it erases last frame's overlays
+    # and any board cells that changed, redraws the overlays, and returns the
+    # rects for pygame.display.update. It returns None, asking for a full
+    # flip, whenever the whole screen had to be redrawn, e.g. during shake.
+    def _draw_dirty(self, screen, offset):
+        board = self.sim.board
+        if board.changed is None or offset != (0, 0) or self._scene_offset != (0, 0):
+            board.changed = []
+            screen.fill(BG_COLOR)
+            self._draw_scene(screen, offset)
+            self._scene_offset = offset
+            self._last_rects = self._draw_overlays(screen, offset)
+            return None
+
+        snake = self.sim.snake
+        cells = [snake.prev_head, snake.segments[0]]
+        if snake.prev_tail is not None:
+            cells.append(snake.prev_tail)
+        for index in board.changed:
+            cells.append((index % board.cols, index // board.cols))
+        board.changed.clear()
+
+        dirty = self._last_rects
+        for cell in cells:
+            dirty.append(pygame.Rect(cell[0] * CELL_SIZE, cell[1] * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+        screen_rect = screen.get_rect()
+        for rect in dirty:
+            self._restore_scene(screen, rect.clip(screen_rect))
+
+        rects = self._draw_overlays(screen, offset)
+        self._last_rects = rects
+        return dirty + rects
+
+    def _restore_scene(self, screen, rect):
+        if not rect.width or not rect.height:
+            return
+        board = self.sim.board
+        head = self.sim.snake.segments[0]
+        body = sprite_cache.get(BODY_COLOR, CELL_SIZE)
+        screen.set_clip(rect)
+        screen.blit(self.static_layer, rect, rect)
+        for y in range(rect.top // CELL_SIZE, (rect.bottom - 1) // CELL_SIZE + 1):
+            for x in range(rect.left // CELL_SIZE, (rect.right - 1) // CELL_SIZE + 1):
+                if not board.in_bounds(x, y):
+                    continue
+                if board.get(x, y) == SNAKE and (x, y) != head:
+                    screen.blit(body, (x * CELL_SIZE, y * CELL_SIZE))
+        screen.set_clip(None)
+
+    def _draw_obstacle(self, screen, obstacle, offset):
         screen.blit(
+            sprite_cache.get(OBSTACLE_COLOR, CELL_SIZE, "obstacle"),
+            (obstacle[0] * CELL_SIZE + offset[0], obstacle[1] * CELL_SIZE + offset[1])
+        )
+
+    def _draw_scene(self, screen, offset):
+        sim = self.sim
+        screen.blit(self.static_layer, offset)
+        draw_snake_body(screen, sim.snake, offset)
+        self.profiler.count("snake", len(sim.snake.segments) - 1)
+        if self.arena:
+            for player in self._rivals():
+                draw_snake_body(screen, player.snake, offset, RIVAL_BODY_COLOR)
+
+    # Every other snake still in the arena
+    def _rivals(self):
+        focus = self.sim.focus
+        return [player for player in self.sim.players if player.alive and player is not focus]
+
+    # Large-world frame: the camera offset replaces the fixed screen origin and
+    # only chunks overlapping the viewport are looked at
+    def _draw_world(self, screen, shake):
+        sim = self.sim
+        view = self.view
+        view.follow(sim.snake, sim.alpha(), sim.cols, sim.rows)
+        offset = (shake[0] - view.x, shake[1] - view.y)
+        keys = view.visible_chunks(sim.board)
+        view.draw_background(screen, offset)
+        self.profiler.count("obstacles", view.draw_obstacles(screen, sim.board, keys, offset))
+        self.profiler.count("chunks", len(keys))
+        draw_snake_body(screen, sim.snake, offset)
+        self.profiler.count("snake", len(sim.snake.segments) - 1)
+        self._draw_overlays(screen, offset, keys)
+        return None
+
+    def _draw_overlays(self, screen, offset, keys=None):
+        sim = self.sim
+        offset_x, offset_y = offset
+        rects = []
+        alpha = sim.alpha()
+
+        blits = []
+        glow = sprite_cache.get(FOOD_COLOR, CELL_SIZE, "glow")
+        tile = sprite_cache.get(FOOD_COLOR, CELL_SIZE)
+        if self.view:
+            foods = self.view.pickups(sim.board, keys, FOOD)
+            powerups = self.view.pickups(sim.board, keys, POWERUP)
+        else:
+            foods = [food.position for food in sim.foods]
+            powerups = [powerup["position"] for powerup in sim.powerups]
+        for cell in foods:
+            x = cell[0] * CELL_SIZE + offset_x
+            y = cell[1] * CELL_SIZE + offset_y
+            blits.append((glow, (x - CELL_SIZE // 2, y - CELL_SIZE // 2), None, pygame.BLEND_RGBA_ADD))
+            blits.append((tile, (x, y)))
+
+        glow = sprite_cache.get(POWERUP_COLOR, CELL_SIZE, "glow")
+        tile = sprite_cache.get(POWERUP_COLOR, CELL_SIZE, "powerup")
+        for cell in powerups:
+            x = cell[0] * CELL_SIZE + offset_x
+            y = cell[1] * CELL_SIZE + offset_y
+            blits.append((glow, (x - CELL_SIZE // 2, y - CELL_SIZE // 2), None, pygame.BLEND_RGBA_ADD))
+            blits.append((tile, (x, y)))
+        rects.extend(screen.blits(blits))
+
+        moving = draw_snake_moving(screen, sim.snake, alpha, offset)
+        if self.arena:
+            for player in self._rivals():
+                moving.extend(draw_snake_moving(
+                    screen, player.snake, player.alpha(), offset, RIVAL_COLOR, RIVAL_BODY_COLOR))
+        rects.extend(moving)
+
+        rects.extend(self.particles.draw(screen, offset))
+        rects.extend(self.popups.draw(screen, offset))
+        text_start = len(rects) - len(self.popups)
+
+        score_text = self.text_cache.render(self.font, f"Score: {sim.score}", WHITE)
+        rects.append(screen.blit(
             score_text,
             (WINDOW_WIDTH - score_text.get_width() - 10, 10)
-        )
+        ))
+
+        if sim.combo_count > 1:
+            combo_text = self.text_cache.render(self.font, f"Combo x{sim.combo_count}", COMBO_COLOR)
+            rects.append(screen.blit(combo_text, (10, 10)))
 
-        if self.combo_count > 1:
-            combo_text = self.font.render(f"Combo x{self.combo_count}", True, COMBO_COLOR)
-            screen.blit(combo_text, (10, 10))
+        if sim.active_powerup and sim.powerup_timer > 0:
+            label = "SLOW" if sim.active_powerup == "slow" else "2X SCORE"
+            power_text = self.text_cache.render(self.small_font, f"{label} {sim.powerup_timer:0.1f}s", POWERUP_COLOR)
+            rects.append(screen.blit(power_text, (10, 42)))
 
-        if self.active_powerup and self.powerup_timer > 0:
-            label = "SLOW" if self.active_powerup == "slow" else "2X SCORE"
-            power_text = self.small_font.render(f"{label} {self.powerup_timer:0.1f}s", True, POWERUP_COLOR)
-            screen.blit(power_text, (10, 42))
+        if self.autopilot:
+            auto_text = self.text_cache.render(self.small_font, "AUTOPILOT", WHITE)
+            rects.append(screen.blit(auto_text, (WINDOW_WIDTH - auto_text.get_width() - 10, 42)))
 
-        if not self.alive:
-            game_over = self.large_font.render("GAME OVER", True, WHITE)
-            restart = self.font.render("Press R to restart", True, WHITE)
-            screen.blit(
+        if not sim.alive:
+            game_over = self.text_cache.render(self.large_font, "GAME OVER", WHITE)
+            restart = self.text_cache.render(self.font, "Press R to restart", WHITE)
+            rects.append(screen.blit(
                 game_over,
                 (WINDOW_WIDTH // 2 - game_over.get_width() // 2,
                  WINDOW_HEIGHT // 2 - game_over.get_height() // 2)
-            )
-            screen.blit(
+            ))
+            rects.append(screen.blit(
                 restart,
                 (WINDOW_WIDTH // 2 - restart.get_width() // 2,
                  WINDOW_HEIGHT // 2 + game_over.get_height() // 2 + 10)
-            )
+            ))
+
+        profiler = self.profiler
+        if profiler.enabled:
+            profiler.count("glows", len(foods) + len(powerups))
+            profiler.count("snake", len(moving))
+            profiler.count("particles", len(self.particles))
+            profiler.count("text", len(rects) - text_start)
+        # Drawn last, over everything, and tracked like the HUD so dirty-rect
+        # frames erase it when it shrinks or is switched off
+        if profiler.show_overlay:
+            rects.append(profiler.draw_overlay(screen, self.small_font))
+        return rects
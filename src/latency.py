@@ -0,0 +1,119 @@
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import pygame
+from game import Game, DIRECTION_KEYS
+from profiler import FrameProfiler
+from simulation import Simulation
+from worker import ThreadedSimulation, RenderThread
+from settings import WINDOW_WIDTH, WINDOW_HEIGHT
+
+# Stands in for a player: posts a direction key at random moments, stamped
+# with the time it was posted, until `stop` is set
+def press_keys(stop, rng, gap):
+    while not stop.wait(rng.uniform(gap / 2, gap * 1.5)):
+        event = pygame.event.Event(pygame.KEYDOWN, key=rng.choice(DIRECTION_KEYS), sent=time.perf_counter())
+        pygame.event.post(event)
+
+
+# Runs main.py's loop headless for `seconds` with every frame's drawing padded
+# to at least `draw_ms` by busy-waiting (holding the GIL, as slow Python draw
+# code would). Threaded runs use the simulation worker and render thread the
+# way main.py does with SIM_THREAD.
+def measure(threaded, seconds, draw_ms, seed, gap):
+    screen = pygame.display.get_surface()
+    profiler = FrameProfiler(enabled=True, window=1 << 20)
+    if threaded:
+        game = Game(profiler=profiler, sim=ThreadedSimulation(Simulation(seed=seed)), dirty_rects=False)
+    else:
+        game = Game(profiler=profiler, sim=Simulation(seed=seed), dirty_rects=False)
+
+    def render(surface, events, dt):
+        start = time.perf_counter()
+        profiler.begin_frame()
+        for event in events:
+            game.handle_event(event)
+        if not game.sim.alive:
+            game.reset()
+        game.update(dt)
+        game.draw(surface)
+        while time.perf_counter() - start < draw_ms / 1000:
+            pass
+        profiler.end_frame()
+
+    pygame.event.clear()
+    stop = threading.Event()
+    feeder = threading.Thread(target=press_keys, args=(stop, random.Random(seed), gap), daemon=True)
+    feeder.start()
+    deadline = time.perf_counter() + seconds
+    if threaded:
+        renderer = RenderThread(screen.get_size(), render)
+        while time.perf_counter() < deadline:
+            for event in pygame.event.get():
+                if event.type == pygame.KEYDOWN and event.key in DIRECTION_KEYS:
+                    game.handle_event(event)
+                else:
+                    renderer.post(event)
+            frame = renderer.take()
+            if frame is None:
+                time.sleep(0.001)
+                continue
+            screen.blit(frame, (0, 0))
+            renderer.release()
+            pygame.display.flip()
+        renderer.stop()
+        game.sim.stop()
+    else:
+        last_frame = time.perf_counter()
+        while time.perf_counter() < deadline:
+            now = time.perf_counter()
+            render(screen, pygame.event.get(), now - last_frame)
+            last_frame = now
+            pygame.display.flip()
+
+    stop.set()
+    feeder.join()
+    samples = sorted(profiler.latencies)
+    p50, p95, p99 = profiler.percentiles((50, 95, 99), samples)
+    return {
+        "mode": "thread" if threaded else "inline",
+        "draw_ms": draw_ms,
+        "frames": profiler.frame_index,
+        "samples": len(samples),
+        "latency_ms_p50": p50 * 1000,
+        "latency_ms_p95": p95 * 1000,
+        "latency_ms_p99": p99 * 1000,
+        "latency_ms_max": samples[-1] * 1000 if samples else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Measure input-to-move latency with the simulation inline and on a worker thread")
+    parser.add_argument("--seconds", type=float, default=10.0, help="per mode and draw cost")
+    parser.add_argument("--draw-ms", type=float, nargs="+", default=[0.0, 30.0, 100.0],
+                        help="minimum time each frame spends drawing")
+    parser.add_argument("--gap", type=float, default=0.25, help="mean seconds between key presses")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pygame.init()
+    pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    for draw_ms in args.draw_ms:
+        for threaded in (False, True):
+            print(json.dumps(measure(threaded, args.seconds, draw_ms, args.seed, args.gap)), flush=True)
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
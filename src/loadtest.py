@@ -0,0 +1,93 @@
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from client import run_bot_client
+from tournament import load_bot
+
+SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_server(port, timeout=10.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+# The server's next stats report, skipping any other output such as library banners
+def read_report(stream):
+    for line in stream:
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError("server exited without reporting its stats")
+
+
+async def run_clients(port, rooms, bot, seconds, slow):
+    tasks = [
+        run_bot_client("127.0.0.1", port, room, bot, seconds, 0.05 if room < slow else 0.0)
+        for room in range(rooms)
+    ]
+    return await asyncio.gather(*tasks)
+
+
+# Starts a server in its own process and connects one simulated player per
+# room over localhost. The server reports its tick cost and traffic; the
+# clients report what actually arrived.
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the PySnake server with simulated clients")
+    parser.add_argument("--rooms", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--bot", default="tournament:greedy_bot")
+    parser.add_argument("--slow", type=int, default=0, help="how many clients read slowly")
+    args = parser.parse_args()
+
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, SERVER, "--port", str(port), "--stats", str(args.seconds / 2)],
+        stdout=subprocess.PIPE, text=True, env=dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1"),
+    )
+    try:
+        asyncio.run(wait_for_server(port))
+        remotes = asyncio.run(run_clients(port, args.rooms, load_bot(args.bot), args.seconds, args.slow))
+        # The second report covers the second half of the run, with every client connected
+        read_report(server.stdout)
+        stats = read_report(server.stdout)
+    finally:
+        server.terminate()
+        server.wait()
+
+    received = sum(remote.bytes_received for remote in remotes)
+    summary = {
+        "rooms": args.rooms,
+        "server_load": stats["load"],
+        "rooms_per_core": args.rooms / stats["load"] if stats["load"] else None,
+        "tick_ms_mean": stats["tick_ms_mean"],
+        "tick_ms_max": stats["tick_ms_max"],
+        "bytes_per_room_tick": stats["bytes_per_room_tick"],
+        "client_bytes_per_second": received / args.seconds,
+        "messages": sum(remote.messages for remote in remotes),
+        "resyncs": stats["resyncs"],
+    }
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,25 +1,123 @@
+import time
 import pygame
-from settings import WINDOW_HEIGHT, WINDOW_WIDTH, FPS
-from game import Game
+from settings import (
+    WINDOW_HEIGHT,
+    WINDOW_WIDTH,
+    FPS,
+    RENDER_MODE,
+    PROFILE_TRACE_PATH,
+    SIM_THREAD,
+    WORLD_MODE,
+    WORLD_COLS,
+    WORLD_ROWS,
+    WORLD_FOOD_COUNT,
+)
+from game import Game, DIRECTION_KEYS
+from profiler import FrameProfiler
+from simulation import Simulation
+from worker import ThreadedSimulation, RenderThread
 
 pygame.init()
 pygame.display.set_caption("PySnake")
 
-screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+if RENDER_MODE == "vsync":
+    # SDL only honours vsync on a renderer-backed window
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SCALED, vsync=1)
+else:
+    screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+frame_cap = FPS if RENDER_MODE == "cap" else 0
 clock = pygame.time.Clock()
 running = True
-game = Game()
+profiler = FrameProfiler()
+if SIM_THREAD:
+    # Dirty rects follow the board as it changes, which a worker thread would
+    # be changing under the renderer
+    if WORLD_MODE:
+        sim = ThreadedSimulation(Simulation(WORLD_COLS, WORLD_ROWS, food_count=WORLD_FOOD_COUNT))
+    else:
+        sim = ThreadedSimulation(Simulation())
+    game = Game(profiler=profiler, sim=sim, dirty_rects=False)
+else:
+    game = Game(profiler=profiler)
 
-while (running):
-    dt = clock.tick(FPS) / 1000
 
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        else: 
-            game.handle_event(event)
+def handle_event(event):
+    if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+        profiler.show_overlay = not profiler.show_overlay
+        profiler.enabled = profiler.enabled or profiler.show_overlay
+        game.invalidate()
+    elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+        profiler.export(PROFILE_TRACE_PATH)
+    else:
+        game.handle_event(event)
+
+
+# Update and draw, timed from `lap`. Returns the dirty rects (None for a full
+# flip) and the lap time to time presenting from.
+def draw_frame(surface, dt, lap):
     game.update(dt)
-    game.draw(screen)
-    pygame.display.flip()
+    lap = profiler.lap("update", lap)
+    rects = game.draw(surface)
+    lap = profiler.lap("draw", lap)
+    return rects, lap
+
+
+def render_threaded(surface, events, dt):
+    lap = profiler.begin_frame()
+    for event in events:
+        handle_event(event)
+    lap = profiler.lap("events", lap)
+    draw_frame(surface, dt, lap)
+    profiler.end_frame()
+
+
+if SIM_THREAD:
+    # The main thread only reads input and presents finished frames. Direction
+    # keys go straight to the simulation worker; everything else is handled
+    # with the next frame on the render thread.
+    renderer = RenderThread((WINDOW_WIDTH, WINDOW_HEIGHT), render_threaded, frame_cap)
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN and event.key in DIRECTION_KEYS:
+                game.handle_event(event)
+            else:
+                renderer.post(event)
+        frame = renderer.take()
+        if frame is None:
+            time.sleep(0.001)
+            continue
+        screen.blit(frame, (0, 0))
+        renderer.release()
+        pygame.display.flip()
+    renderer.stop()
+    game.sim.stop()
+else:
+    last_frame = time.perf_counter()
+    while running:
+        # clock.tick() only paces the loop; its whole-millisecond result is too
+        # coarse to time frames that can be shorter than a millisecond
+        clock.tick(frame_cap)
+        now = time.perf_counter()
+        dt = now - last_frame
+        last_frame = now
+        lap = profiler.begin_frame()
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            else:
+                handle_event(event)
+        lap = profiler.lap("events", lap)
+        rects, lap = draw_frame(screen, dt, lap)
+        if rects is None:
+            pygame.display.flip()
+        else:
+            pygame.display.update(rects)
+        profiler.lap("present", lap)
+        profiler.end_frame()
 
+if profiler.enabled and profiler.trace:
+    profiler.export(PROFILE_TRACE_PATH)
 pygame.quit()
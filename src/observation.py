@@ -0,0 +1,137 @@
+import numpy as np
+from board import Board, SNAKE, FOOD, OBSTACLE, POWERUP
+from settings import POWERUP_DURATION, COMBO_WINDOW
+
+CHANNELS = ("head", "body", "rivals", "food", "obstacle", "powerup", "slow", "double", "combo")
+HEAD, BODY, RIVALS, FOOD_CHANNEL, OBSTACLE_CHANNEL, POWERUP_CHANNEL, SLOW, DOUBLE, COMBO = range(len(CHANNELS))
+
+NEVER = -(1 << 62)
+
+
+# A float32 tensor of shape (len(CHANNELS), rows, cols) describing one game for
+# learning code, refreshed in place by update():
+#
+#   head      1 on the snake's head
+#   body      the snake from tail (1 / length) to head (1.0), so a policy can
+#             tell which cells are about to be vacated
+#   rivals    other snakes' cells (in an Arena)
+#   food, obstacle, powerup
+#             1 where the board holds one
+#   slow, double, combo
+#             the fraction left of each timer, over the whole plane
+#
+# The cell kinds are read through a zero-copy view of the Board's bytearray,
+# and every plane is written with NumPy ufuncs into buffers allocated once, so
+# update() allocates nothing. The body is tracked by stamping each cell with
+# the move on which the head entered it: only cells entered since the last
+# update are stamped, and a cell belongs to the body exactly when its stamp is
+# one of the last `length` moves. `sim` can be a Simulation or an Arena
+# Player; `out` lets a batch place the tensor inside a larger buffer.
+class Observation:
+    def __init__(self, sim, out=None):
+        if not isinstance(sim.board, Board):
+            raise ValueError("observations need a dense Board, not a chunked world")
+        self.sim = sim
+        self.cols = sim.cols
+        self.rows = sim.rows
+        shape = (len(CHANNELS), self.rows, self.cols)
+        if out is None:
+            out = np.zeros(shape, dtype=np.float32)
+        elif out.shape != shape or out.dtype != np.float32:
+            raise ValueError(f"out must be a float32 array of shape {shape}")
+        self.tensor = out
+        self.planes = list(out)
+        self.stamps = np.empty((self.rows, self.cols), dtype=np.int64)
+        self.snake_mask = np.empty((self.rows, self.cols), dtype=bool)
+        self.outside = np.empty((self.rows, self.cols), dtype=bool)
+        self.board = None
+        self.kinds = None
+        self.snake = None
+        self.head = None
+        self.stamp = 0
+
+    def _rebuild(self, board, snake):
+        self.board = board
+        self.kinds = np.frombuffer(board.cells, dtype=np.uint8).reshape(self.rows, self.cols)
+        self.snake = snake
+        self.stamps.fill(NEVER)
+        self.stamp = len(snake.segments) - 1
+        for i, (x, y) in enumerate(snake.segments):
+            if board.in_bounds(x, y):
+                self.stamps[y, x] = self.stamp - i
+
+    # Stamps the cells the head entered since the last update, found by
+    # walking the body from the head back to where it was then
+    def _advance(self, board, snake):
+        segments = snake.segments
+        moves = 0
+        for cell in segments:
+            if cell == self.head:
+                break
+            moves += 1
+        else:
+            self._rebuild(board, snake)
+            return
+        for i in range(moves):
+            x, y = segments[i]
+            self.stamps[y, x] = self.stamp + moves - i
+        self.stamp += moves
+
+    def update(self):
+        sim = self.sim
+        board = sim.board
+        snake = sim.snake
+        planes = self.planes
+        head = snake.segments[0]
+        if board is not self.board or snake is not self.snake or not sim.alive:
+            self._rebuild(board, snake)
+        elif head != self.head:
+            self._advance(board, snake)
+        self.head = head
+
+        kinds = self.kinds
+        np.equal(kinds, FOOD, out=planes[FOOD_CHANNEL], casting="unsafe")
+        np.equal(kinds, OBSTACLE, out=planes[OBSTACLE_CHANNEL], casting="unsafe")
+        np.equal(kinds, POWERUP, out=planes[POWERUP_CHANNEL], casting="unsafe")
+
+        length = len(snake.segments)
+        tail = self.stamp - length + 1
+        body = planes[BODY]
+        np.subtract(self.stamps, tail - 1, out=body, casting="unsafe")
+        np.maximum(body, 0.0, out=body)
+        body *= 1.0 / length
+        np.equal(kinds, SNAKE, out=self.snake_mask)
+        np.less(self.stamps, tail, out=self.outside)
+        np.logical_and(self.snake_mask, self.outside, out=self.snake_mask)
+        np.copyto(planes[RIVALS], self.snake_mask)
+
+        planes[HEAD].fill(0.0)
+        if board.in_bounds(*head):
+            planes[HEAD][head[1], head[0]] = 1.0
+
+        active = sim.active_powerup if sim.powerup_timer > 0 else None
+        left = sim.powerup_timer / POWERUP_DURATION
+        planes[SLOW].fill(left if active == "slow" else 0.0)
+        planes[DOUBLE].fill(left if active == "double" else 0.0)
+        planes[COMBO].fill(sim.combo_timer / COMBO_WINDOW)
+        return self.tensor
+
+
+# Observations of many games of the same size in one contiguous
+# (games, channels, rows, cols) buffer, ready to hand to a model as a batch
+class ObservationBatch:
+    def __init__(self, sims):
+        sims = list(sims)
+        cols, rows = sims[0].cols, sims[0].rows
+        if any(sim.cols != cols or sim.rows != rows for sim in sims):
+            raise ValueError("every game in a batch must have the same board size")
+        self.tensor = np.zeros((len(sims), len(CHANNELS), rows, cols), dtype=np.float32)
+        self.observations = [Observation(sim, self.tensor[i]) for i, sim in enumerate(sims)]
+
+    def __len__(self):
+        return len(self.observations)
+
+    def update(self):
+        for observation in self.observations:
+            observation.update()
+        return self.tensor
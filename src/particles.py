@@ -0,0 +1,163 @@
+import numpy as np
+import pygame
+from settings import CELL_SIZE, PARTICLE_COUNT, PARTICLE_CAPACITY, POPUP_CAPACITY
+
+# Fixed-capacity pool stored as one preallocated NumPy array per field.
+# Entries live in [0, count) and are updated a whole field at a time; dead
+# entries are dropped by compacting the live ones to the front, so nothing is
+# reallocated while effects come and go. Emitting into a full pool is dropped.
+class Pool:
+    fields = ()
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.count = 0
+        for name, dtype in self.fields:
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self._arrays = [getattr(self, name) for name, _ in self.fields]
+        self._step = np.zeros(capacity, dtype=np.float32)
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    # Reserves up to `n` entries, returning the first index and how many fit
+    def _allocate(self, n=1):
+        start = self.count
+        n = min(n, self.capacity - start)
+        self.count = start + n
+        return start, n
+
+    # Counts down every entry's life and drops the ones that ran out
+    def _expire(self, dt):
+        count = self.count
+        life = self.life[:count]
+        life -= dt
+        alive = life > 0
+        if not alive.all():
+            self._compact(alive)
+
+    def _compact(self, alive):
+        count = int(np.count_nonzero(alive))
+        for values in self._arrays:
+            values[:count] = values[:self.count][alive]
+        self.count = count
+
+    # values += rates * dt over the live entries, without a temporary array
+    def _advance(self, values, rates, dt):
+        count = self.count
+        step = self._step[:count]
+        np.multiply(rates[:count], dt, out=step)
+        values[:count] += step
+
+
+class ParticlePool(Pool):
+    fields = (
+        ("x", np.float32),
+        ("y", np.float32),
+        ("vx", np.float32),
+        ("vy", np.float32),
+        ("life", np.float32),
+        ("size", np.uint8),
+        ("color", np.uint8),
+    )
+
+    # `rng` is a NumPy Generator
+    def __init__(self, capacity=PARTICLE_CAPACITY, rng=None):
+        super().__init__(capacity)
+        self.rng = np.random.default_rng() if rng is None else rng
+        self.palette = []
+
+    def _color_index(self, color):
+        color = tuple(color)
+        if color not in self.palette:
+            self.palette.append(color)
+        return self.palette.index(color)
+
+    # One burst is drawn as whole arrays straight into a slice of the pool
+    def emit(self, position, color, count=PARTICLE_COUNT):
+        start, n = self._allocate(count)
+        if not n:
+            return
+        end = start + n
+        rng = self.rng
+        angle = rng.random(n) * 6.283
+        speed = rng.uniform(40, 140, n)
+        self.x[start:end] = position[0] + CELL_SIZE / 2
+        self.y[start:end] = position[1] + CELL_SIZE / 2
+        self.vx[start:end] = speed * np.cos(angle)
+        self.vy[start:end] = speed * np.sin(angle)
+        self.life[start:end] = rng.uniform(0.4, 0.9, n)
+        self.size[start:end] = rng.integers(2, 5, n)
+        self.color[start:end] = self._color_index(color)
+
+    def update(self, dt):
+        if not self.count:
+            return
+        self._expire(dt)
+        self._advance(self.x, self.vx, dt)
+        self._advance(self.y, self.vy, dt)
+
+    def draw(self, screen, offset=(0, 0)):
+        count = self.count
+        xs = (self.x[:count] + offset[0]).astype(np.int32).tolist()
+        ys = (self.y[:count] + offset[1]).astype(np.int32).tolist()
+        sizes = self.size[:count].tolist()
+        palette = self.palette
+        colors = [palette[i] for i in self.color[:count].tolist()]
+        circle = pygame.draw.circle
+        return [circle(screen, color, (x, y), size) for color, x, y, size in zip(colors, xs, ys, sizes)]
+
+
+# Floating score/label text. Surfaces are rendered once by the caller and kept
+# in a parallel list that is compacted together with the arrays.
+class PopupPool(Pool):
+    fields = (
+        ("x", np.float32),
+        ("y", np.float32),
+        ("vy", np.float32),
+        ("life", np.float32),
+    )
+
+    def __init__(self, capacity=POPUP_CAPACITY):
+        super().__init__(capacity)
+        self.surfaces = [None] * capacity
+
+    def emit(self, surface, position, vy=-20, life=1.0):
+        i, n = self._allocate()
+        if not n:
+            return
+        self.x[i] = position[0] + CELL_SIZE / 2
+        self.y[i] = position[1] + CELL_SIZE / 2
+        self.vy[i] = vy
+        self.life[i] = life
+        self.surfaces[i] = surface
+
+    def _compact(self, alive):
+        count = self.count
+        kept = [surface for surface, live in zip(self.surfaces[:count], alive.tolist()) if live]
+        self.surfaces[:count] = kept + [None] * (count - len(kept))
+        super()._compact(alive)
+
+    def clear(self):
+        for i in range(self.count):
+            self.surfaces[i] = None
+        super().clear()
+
+    def update(self, dt):
+        if not self.count:
+            return
+        self._expire(dt)
+        self._advance(self.y, self.vy, dt)
+
+    def draw(self, screen, offset=(0, 0)):
+        count = self.count
+        xs = self.x[:count].tolist()
+        ys = self.y[:count].tolist()
+        offset_x, offset_y = offset
+        return screen.blits([
+            (surface, (x - surface.get_width() / 2 + offset_x, y - surface.get_height() / 2 + offset_y))
+            for surface, x, y in zip(self.surfaces, xs, ys)
+        ])
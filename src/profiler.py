@@ -0,0 +1,116 @@
+import csv
+import json
+import time
+from collections import deque
+from settings import PROFILE, PROFILE_WINDOW, PROFILE_TRACE_FRAMES, WHITE
+
+PHASES = ("events", "update", "draw", "present")
+
+# Per-frame timing for the main loop. Phases are timed with lap(), draw code
+# bumps subsystem counters with count(), and every finished frame becomes one
+# trace row. Every method returns straight away while `enabled` is False, so
+# the instrumentation can stay in place on production builds.
+class FrameProfiler:
+    def __init__(self, enabled=PROFILE, window=PROFILE_WINDOW, trace_frames=PROFILE_TRACE_FRAMES):
+        self.enabled = enabled
+        self.show_overlay = False
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.counters = {}
+        self.frame_times = deque(maxlen=window)
+        self.latencies = deque(maxlen=window)
+        self._latency = None
+        self.trace = deque(maxlen=trace_frames)
+        self.frame_index = 0
+        self._frame_start = None
+        self._last_interval = 0.0
+
+    def begin_frame(self):
+        if not self.enabled:
+            return 0.0
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self._last_interval = now - self._frame_start
+            self.frame_times.append(self._last_interval)
+        self._frame_start = now
+        for name in self.phases:
+            self.phases[name] = 0.0
+        self.counters.clear()
+        return now
+
+    def lap(self, name, start):
+        if not self.enabled:
+            return 0.0
+        now = time.perf_counter()
+        self.phases[name] = now - start
+        return now
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    # Seconds from a direction key to the move it steered, see Game.update
+    def latency(self, seconds):
+        if self.enabled:
+            self.latencies.append(seconds)
+            self._latency = seconds
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        row = {"frame": self.frame_index, "interval": self._last_interval}
+        row.update(self.phases)
+        row.update(self.counters)
+        if self._latency is not None:
+            row["input_latency"] = self._latency
+            self._latency = None
+        self.trace.append(row)
+        self.frame_index += 1
+
+    def percentiles(self, points=(50, 95, 99), samples=None):
+        samples = self.frame_times if samples is None else samples
+        if not samples:
+            return [0.0 for _ in points]
+        times = sorted(samples)
+        last = len(times) - 1
+        return [times[min(last, int(round(last * p / 100)))] for p in points]
+
+    def overlay_lines(self):
+        p50, p95, p99 = self.percentiles()
+        lines = [f"frame p50 {p50 * 1000:.1f}  p95 {p95 * 1000:.1f}  p99 {p99 * 1000:.1f} ms"]
+        lines.append("  ".join(f"{name} {value * 1000:.2f}" for name, value in self.phases.items()))
+        if self.latencies:
+            p50, p95 = self.percentiles((50, 95), self.latencies)
+            lines.append(f"input to move p50 {p50 * 1000:.1f}  p95 {p95 * 1000:.1f} ms")
+        if self.counters:
+            lines.append("  ".join(f"{name} {value}" for name, value in sorted(self.counters.items())))
+        return lines
+
+    # The lines change nearly every frame, so they are rendered directly rather
+    # than through a TextCache, where they would only push out the HUD strings
+    def draw_overlay(self, screen, font):
+        lines = self.overlay_lines()
+        surfaces = [font.render(line, True, WHITE) for line in lines]
+        width = max(surface.get_width() for surface in surfaces) + 12
+        height = sum(surface.get_height() for surface in surfaces) + 8
+        rect = screen.fill((0, 0, 0), (0, screen.get_height() - height, width, height))
+        y = rect.top + 4
+        for surface in surfaces:
+            screen.blit(surface, (6, y))
+            y += surface.get_height()
+        return rect
+
+    def export(self, path):
+        rows = list(self.trace)
+        if path.endswith(".json"):
+            with open(path, "w") as f:
+                json.dump(rows, f)
+            return
+        fields = ["frame", "interval", *PHASES]
+        for row in rows:
+            for name in row:
+                if name not in fields:
+                    fields.append(name)
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, restval=0)
+            writer.writeheader()
+            writer.writerows(rows)
@@ -0,0 +1,210 @@
+import struct
+from board import FOOD, OBSTACLE, POWERUP
+
+# Client to server
+JOIN = 1
+INPUT = 2
+RESET = 3
+# Server to client
+SNAPSHOT = 10
+DELTA = 11
+
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+EVENTS = ("eat", "powerup", "dead")
+POWERUPS = (None, "slow", "double")
+
+# Delta flags
+HAS_STATUS = 1
+HAS_EVENTS = 2
+MOVED = 4
+GREW = 8
+
+LENGTH = struct.Struct("<I")
+STATUS = struct.Struct("<BffB")
+
+
+# Every message is a little-endian u32 length followed by a type byte and its
+# payload. Integers inside payloads are varints; coordinates that can leave
+# the board (a head that hit the wall) are zigzag varints, and board cells are
+# sent as one varint holding (cell index << 3 | cell kind).
+class Writer:
+    def __init__(self, kind):
+        self.data = bytearray(LENGTH.size)
+        self.data.append(kind)
+
+    def byte(self, value):
+        self.data.append(value)
+
+    def varint(self, value):
+        data = self.data
+        while value >= 0x80:
+            data.append(value & 0x7F | 0x80)
+            value >>= 7
+        data.append(value)
+
+    def zigzag(self, value):
+        self.varint(value << 1 if value >= 0 else (-value << 1) - 1)
+
+    def cell(self, cell):
+        self.zigzag(cell[0])
+        self.zigzag(cell[1])
+
+    def pack(self, fmt, *values):
+        self.data += fmt.pack(*values)
+
+    def finish(self):
+        LENGTH.pack_into(self.data, 0, len(self.data) - LENGTH.size)
+        return bytes(self.data)
+
+
+class Reader:
+    def __init__(self, data):
+        self.data = data
+        self.pos = 1
+
+    @property
+    def kind(self):
+        return self.data[0]
+
+    def byte(self):
+        self.pos += 1
+        return self.data[self.pos - 1]
+
+    def varint(self):
+        data = self.data
+        value = 0
+        shift = 0
+        while True:
+            byte = data[self.pos]
+            self.pos += 1
+            value |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                return value
+
+    def zigzag(self):
+        value = self.varint()
+        return (value >> 1) ^ -(value & 1)
+
+    def cell(self):
+        return (self.zigzag(), self.zigzag())
+
+    def unpack(self, fmt):
+        values = fmt.unpack_from(self.data, self.pos)
+        self.pos += fmt.size
+        return values
+
+    def done(self):
+        return self.pos >= len(self.data)
+
+
+# Splits a byte stream into message payloads
+class FrameBuffer:
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def feed(self, data):
+        self.buffer += data
+        messages = []
+        pos = 0
+        buffer = self.buffer
+        while len(buffer) - pos >= LENGTH.size:
+            (length,) = LENGTH.unpack_from(buffer, pos)
+            end = pos + LENGTH.size + length
+            if end > len(buffer):
+                break
+            messages.append(bytes(buffer[pos + LENGTH.size:end]))
+            pos = end
+        del buffer[:pos]
+        return messages
+
+
+def encode_join(room):
+    writer = Writer(JOIN)
+    writer.varint(room)
+    return writer.finish()
+
+
+def encode_input(direction):
+    writer = Writer(INPUT)
+    writer.varint(DIRECTIONS.index(direction))
+    return writer.finish()
+
+
+def encode_reset():
+    return Writer(RESET).finish()
+
+
+def status_of(sim):
+    return (sim.score, sim.combo_count, POWERUPS.index(sim.active_powerup),
+            sim.current_interval(), sim.alive)
+
+
+def _write_status(writer, sim):
+    writer.varint(sim.score)
+    writer.varint(sim.combo_count)
+    writer.pack(STATUS, POWERUPS.index(sim.active_powerup), sim.powerup_timer,
+                sim.current_interval(), sim.alive)
+
+
+def read_status(reader):
+    score = reader.varint()
+    combo = reader.varint()
+    powerup, timer, interval, alive = reader.unpack(STATUS)
+    return score, combo, POWERUPS[powerup], timer, interval, bool(alive)
+
+
+# Everything a client needs to draw the game from scratch: size, status, the
+# snake head first, and every other occupied cell
+def encode_snapshot(sim):
+    writer = Writer(SNAPSHOT)
+    writer.varint(sim.tick_count)
+    writer.varint(sim.cols)
+    writer.varint(sim.rows)
+    _write_status(writer, sim)
+    snake = sim.snake
+    writer.zigzag(snake.dx)
+    writer.zigzag(snake.dy)
+    writer.varint(len(snake.segments))
+    for cell in snake.segments:
+        writer.cell(cell)
+    cells = []
+    for kind, positions in (
+        (OBSTACLE, sim.obstacles),
+        (FOOD, [food.position for food in sim.foods]),
+        (POWERUP, [powerup["position"] for powerup in sim.powerups]),
+    ):
+        for x, y in positions:
+            cells.append((y * sim.cols + x) << 3 | kind)
+    writer.varint(len(cells))
+    for value in cells:
+        writer.varint(value)
+    return writer.finish()
+
+
+# What changed during one tick: status when it differs from the last one sent,
+# the rule events, the snake's move, and the final kind of every other cell
+# that changed
+def encode_delta(sim, tick, status, events, moved, grew, cells):
+    writer = Writer(DELTA)
+    flags = (HAS_STATUS if status else 0) | (HAS_EVENTS if events else 0)
+    flags |= (MOVED if moved else 0) | (GREW if grew else 0)
+    writer.byte(flags)
+    writer.varint(tick)
+    if status:
+        _write_status(writer, sim)
+    if events:
+        writer.varint(len(events))
+        for event in events:
+            writer.byte(EVENTS.index(event[0]))
+            writer.cell(event[1])
+            if event[0] == "eat":
+                writer.varint(event[2])
+            elif event[0] == "powerup":
+                writer.varint(POWERUPS.index(event[2]))
+    if moved:
+        writer.cell(sim.snake.segments[0])
+    writer.varint(len(cells))
+    for value in cells:
+        writer.varint(value)
+    return writer.finish()
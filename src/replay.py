@@ -0,0 +1,138 @@
+import argparse
+import struct
+import sys
+import time
+from simulation import Simulation
+from settings import SIM_TICK_RATE, FOOD_COUNT
+
+MAGIC = b"PSRP"
+VERSION = 3
+HEADER = struct.Struct("<4sBQIIIHII")
+DIRECTIONS = ("UP", "DOWN", "LEFT", "RIGHT")
+
+# A recorded game: the seed plus every direction change tagged with the tick
+# it was applied before. On disk that is a fixed header followed by one varint
+# per input holding (ticks since previous input << 2 | direction).
+class Replay:
+    def __init__(self, seed, cols, rows, inputs, ticks, score, tick_rate=SIM_TICK_RATE, food_count=FOOD_COUNT):
+        self.seed = seed
+        self.cols = cols
+        self.rows = rows
+        self.food_count = food_count
+        self.inputs = inputs
+        self.ticks = ticks
+        self.score = score
+        self.tick_rate = tick_rate
+
+    @classmethod
+    def from_simulation(cls, sim):
+        ticks = sim.tick_count if sim.death_tick is None else sim.death_tick
+        return cls(sim.seed, sim.cols, sim.rows, list(sim.inputs), ticks, sim.score, food_count=sim.food_count)
+
+    def to_bytes(self):
+        out = bytearray(HEADER.pack(
+            MAGIC, VERSION, self.seed, self.cols, self.rows, self.food_count, self.tick_rate, self.ticks, self.score
+        ))
+        out += struct.pack("<I", len(self.inputs))
+        previous = 0
+        for tick, direction in self.inputs:
+            value = (tick - previous) << 2 | DIRECTIONS.index(direction)
+            previous = tick
+            while value >= 0x80:
+                out.append(value & 0x7F | 0x80)
+                value >>= 7
+            out.append(value)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, cols, rows, food_count, tick_rate, ticks, score = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("not a PySnake replay")
+        if version != VERSION:
+            raise ValueError(f"replay format {version} was recorded under different rules (expected {VERSION})")
+        (count,) = struct.unpack_from("<I", data, HEADER.size)
+        pos = HEADER.size + 4
+        inputs = []
+        tick = 0
+        for _ in range(count):
+            value = 0
+            shift = 0
+            while True:
+                byte = data[pos]
+                pos += 1
+                value |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+            tick += value >> 2
+            inputs.append((tick, DIRECTIONS[value & 3]))
+        return cls(seed, cols, rows, inputs, ticks, score, tick_rate, food_count)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read())
+
+
+# A Simulation that plays a Replay back: each recorded input is applied before
+# the tick it was recorded on, and the game stops at the recorded end. reset()
+# restarts the recording, so Game can draw it like a live game.
+class ReplaySimulation(Simulation):
+    def __init__(self, replay):
+        if replay.tick_rate != SIM_TICK_RATE:
+            raise ValueError(f"replay recorded at {replay.tick_rate} ticks/s, simulation runs at {SIM_TICK_RATE}")
+        self.replay = replay
+        self.next_input = 0
+        super().__init__(replay.cols, replay.rows, replay.seed, replay.food_count)
+
+    def reset(self, seed=None):
+        super().reset(self.replay.seed)
+        self.next_input = 0
+
+    def finished(self):
+        return not self.alive or self.tick_count >= self.replay.ticks
+
+    def tick(self):
+        if self.tick_count >= self.replay.ticks:
+            return
+        inputs = self.replay.inputs
+        while self.next_input < len(inputs) and inputs[self.next_input][0] <= self.tick_count:
+            self.change_direction(inputs[self.next_input][1])
+            self.next_input += 1
+        super().tick()
+
+
+def run_replay(replay):
+    sim = ReplaySimulation(replay)
+    while not sim.finished():
+        sim.tick()
+        sim.events.clear()
+    return sim
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-simulate PySnake replays headless and check their scores")
+    parser.add_argument("replays", nargs="+")
+    args = parser.parse_args()
+
+    failed = 0
+    for path in args.replays:
+        replay = Replay.load(path)
+        start = time.perf_counter()
+        sim = run_replay(replay)
+        elapsed = time.perf_counter() - start
+        ok = sim.score == replay.score and sim.tick_count == replay.ticks
+        failed += not ok
+        speedup = replay.ticks / replay.tick_rate / elapsed if elapsed else float("inf")
+        print(f"{path}: {'OK' if ok else 'MISMATCH'} score {sim.score} (recorded {replay.score}), "
+              f"{sim.tick_count} ticks in {elapsed:.3f}s ({speedup:.0f}x real time)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
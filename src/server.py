@@ -0,0 +1,286 @@
+import argparse
+import asyncio
+import json
+import sys
+import time
+from board import SNAKE
+from protocol import (
+    JOIN,
+    INPUT,
+    RESET,
+    DIRECTIONS,
+    FrameBuffer,
+    Reader,
+    encode_snapshot,
+    encode_delta,
+    status_of,
+)
+from simulation import Simulation, SIM_DT
+from settings import (
+    MAX_FRAME_TIME,
+    SERVER_HOST,
+    SERVER_PORT,
+    SERVER_HIGH_WATER,
+    SERVER_LOW_WATER,
+    SERVER_MAX_INPUTS,
+)
+
+
+# One client socket. Everything queued for it during a tick is written with a
+# single transport write when the tick ends. A client that falls more than
+# `high_water` bytes behind stops receiving deltas; once its buffer drains
+# below `low_water` it gets a fresh snapshot instead of the backlog.
+class Connection:
+    def __init__(self, writer, high_water=SERVER_HIGH_WATER, low_water=SERVER_LOW_WATER):
+        self.writer = writer
+        self.transport = writer.transport
+        self.high_water = high_water
+        self.low_water = low_water
+        self.room = None
+        self.pending = bytearray()
+        self.stalled = False
+        self.inputs = 0
+
+    def send(self, data):
+        self.pending += data
+
+    def flush(self):
+        if not self.pending or self.transport.is_closing():
+            self.pending.clear()
+            return 0
+        sent = len(self.pending)
+        self.transport.write(bytes(self.pending))
+        self.pending.clear()
+        return sent
+
+    def backlog(self):
+        return self.transport.get_write_buffer_size()
+
+
+# A match: one authoritative Simulation and the connections watching it. Any
+# member may steer; inputs are applied in arrival order before the next tick.
+class Room:
+    def __init__(self, room_id, seed=None):
+        self.id = room_id
+        self.sim = Simulation(seed=seed)
+        self.members = []
+        self.inputs = []
+        self.resync()
+
+    def resync(self):
+        sim = self.sim
+        sim.board.changed = []
+        self.board = sim.board
+        self.head = sim.snake.segments[0]
+        self.status = status_of(sim)
+        self.snapshot = None
+
+    def join(self, connection):
+        connection.room = self
+        self.members.append(connection)
+        connection.send(self.full_snapshot())
+
+    def leave(self, connection):
+        if connection in self.members:
+            self.members.remove(connection)
+
+    def full_snapshot(self):
+        if self.snapshot is None:
+            self.snapshot = encode_snapshot(self.sim)
+        return self.snapshot
+
+    def tick(self):
+        sim = self.sim
+        self.snapshot = None
+        for connection, direction in self.inputs:
+            if direction is None:
+                if not sim.alive:
+                    sim.reset()
+            else:
+                sim.change_direction(direction)
+        self.inputs.clear()
+        if sim.board is not self.board:
+            # Reset: everybody starts again from a full snapshot
+            self.resync()
+            for connection in self.members:
+                if not connection.stalled:
+                    connection.send(self.full_snapshot())
+            return
+
+        sim.tick()
+        events = sim.pop_events()
+        snake = sim.snake
+        moved = snake.segments[0] != self.head
+        board = sim.board
+        changed = board.changed
+        status = status_of(sim)
+        status_changed = status != self.status
+        if not (moved or events or changed or status_changed):
+            return
+        self.head = snake.segments[0]
+        self.status = status
+
+        # The snake's own cells travel as the move itself; everything else as
+        # the final kind of each changed cell
+        cells = []
+        cols = board.cols
+        for index in dict.fromkeys(changed):
+            kind = board.get(index % cols, index // cols)
+            if kind != SNAKE:
+                cells.append(index << 3 | kind)
+        changed.clear()
+        message = encode_delta(sim, sim.tick_count, status_changed, events, moved,
+                               moved and snake.prev_tail is None, cells)
+        for connection in self.members:
+            if not connection.stalled:
+                connection.send(message)
+
+
+class Server:
+    def __init__(self, host=SERVER_HOST, port=SERVER_PORT, max_inputs=SERVER_MAX_INPUTS):
+        self.host = host
+        self.port = port
+        self.max_inputs = max_inputs
+        self.rooms = {}
+        self.connections = []
+        self.server = None
+        self.ticks = 0
+        self.tick_time = 0.0
+        self.tick_max = 0.0
+        self.bytes_sent = 0
+        self.resyncs = 0
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def _serve(self, reader, writer):
+        connection = Connection(writer)
+        self.connections.append(connection)
+        frames = FrameBuffer()
+        try:
+            while True:
+                data = await reader.read(4096)
+                if not data:
+                    break
+                for message in frames.feed(data):
+                    self._handle(connection, Reader(message))
+        except (ConnectionError, IndexError, ValueError):
+            pass
+        finally:
+            self.connections.remove(connection)
+            self._leave(connection)
+            writer.close()
+
+    # Takes `connection` out of its room, dropping the room once it is empty
+    # so it stops ticking
+    def _leave(self, connection):
+        room = connection.room
+        if room is not None:
+            room.leave(connection)
+            if not room.members:
+                del self.rooms[room.id]
+
+    def _handle(self, connection, reader):
+        kind = reader.kind
+        if kind == JOIN:
+            self._leave(connection)
+            room_id = reader.varint()
+            room = self.rooms.get(room_id)
+            if room is None:
+                room = self.rooms[room_id] = Room(room_id)
+            room.join(connection)
+        elif connection.room is None:
+            return
+        elif kind == INPUT:
+            if connection.inputs >= self.max_inputs:
+                # More direction changes than the snake could use before its next move
+                return
+            connection.inputs += 1
+            connection.room.inputs.append((connection, DIRECTIONS[reader.varint()]))
+        elif kind == RESET:
+            connection.room.inputs.append((connection, None))
+
+    def tick(self):
+        for room in self.rooms.values():
+            room.tick()
+        for connection in self.connections:
+            connection.inputs = 0
+            backlog = connection.backlog()
+            if connection.stalled:
+                if backlog <= connection.low_water and connection.room is not None:
+                    connection.stalled = False
+                    connection.pending.clear()
+                    connection.send(connection.room.full_snapshot())
+                    self.resyncs += 1
+            elif backlog > connection.high_water:
+                connection.stalled = True
+                connection.pending.clear()
+            self.bytes_sent += connection.flush()
+
+    # Fixed-rate tick loop. Ticks that fall more than MAX_FRAME_TIME behind
+    # schedule are skipped rather than run back to back.
+    async def run(self, stats_every=0.0, stats_out=sys.stdout):
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time()
+        next_stats = next_tick + stats_every
+        while True:
+            start = time.perf_counter()
+            self.tick()
+            elapsed = time.perf_counter() - start
+            self.ticks += 1
+            self.tick_time += elapsed
+            self.tick_max = max(self.tick_max, elapsed)
+
+            now = loop.time()
+            if stats_every and now >= next_stats:
+                print(json.dumps(self.stats()), file=stats_out, flush=True)
+                next_stats = now + stats_every
+            next_tick += SIM_DT
+            if now - next_tick > MAX_FRAME_TIME:
+                next_tick = now
+            await asyncio.sleep(max(0.0, next_tick - now))
+
+    def stats(self):
+        ticks = max(1, self.ticks)
+        stats = {
+            "rooms": len(self.rooms),
+            "clients": len(self.connections),
+            "ticks": self.ticks,
+            "tick_ms_mean": self.tick_time / ticks * 1000,
+            "tick_ms_max": self.tick_max * 1000,
+            "load": self.tick_time / ticks / SIM_DT,
+            "bytes_per_tick": self.bytes_sent / ticks,
+            "bytes_per_room_tick": self.bytes_sent / ticks / max(1, len(self.rooms)),
+            "resyncs": self.resyncs,
+        }
+        self.ticks = 0
+        self.tick_time = 0.0
+        self.tick_max = 0.0
+        self.bytes_sent = 0
+        return stats
+
+
+async def serve(host, port, stats_every):
+    server = Server(host, port)
+    await server.start()
+    print(f"listening on {server.host}:{server.port}", file=sys.stderr, flush=True)
+    await server.run(stats_every)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Authoritative PySnake server hosting many rooms")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--stats", type=float, default=0.0, metavar="SECONDS",
+                        help="print load and traffic statistics as JSON this often")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.stats))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
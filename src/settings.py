@@ -1,16 +1,73 @@
-import pygame
+import os
 
 WINDOW_WIDTH = 1280
 WINDOW_HEIGHT = 780
 
 FPS = 60
 
+# "cap" limits rendering to FPS, "vsync" waits for the display refresh and
+# "uncapped" draws as fast as it can; the simulation rate is unaffected
+RENDER_MODE = "cap"
+
+# Only repaint and present the parts of the screen that changed
+DIRTY_RECTS = False
+
+# Rendered HUD and popup strings kept around for reuse
+TEXT_CACHE_SIZE = 64
+
+# Frame profiler (F3 toggles the overlay, F4 writes the trace)
+PROFILE = False
+PROFILE_WINDOW = 300
+PROFILE_TRACE_FRAMES = 18000
+PROFILE_TRACE_PATH = "pysnake_trace.csv"
+
 CELL_SIZE = 20
+GRID_COLS = WINDOW_WIDTH // CELL_SIZE
+GRID_ROWS = WINDOW_HEIGHT // CELL_SIZE
 FOOD_COUNT = 3
 OBSTACLE_COUNT = 6
 
+# Large-world mode: a WORLD_COLS x WORLD_ROWS board seen through a camera that
+# follows the snake. Boards bigger than DENSE_BOARD_LIMIT cells are stored as
+# WORLD_CHUNK x WORLD_CHUNK chunks (a power of two) that exist only where
+# something is; WORLD_CHUNK_CACHE rendered obstacle chunks are kept for reuse.
+WORLD_MODE = False
+WORLD_COLS = 10000
+WORLD_ROWS = 10000
+WORLD_FOOD_COUNT = 20000
+WORLD_CHUNK = 16
+WORLD_CHUNK_CACHE = 256
+DENSE_BOARD_LIMIT = 1 << 20
+
+# Arena mode: ARENA_SNAKES snakes share the board, the first one steered by
+# the player and the rest by ARENA_BOT (module:function). Bots come back
+# ARENA_RESPAWN_DELAY seconds after dying; at most ARENA_POWERUPS power-ups are
+# out at once.
+ARENA_MODE = False
+ARENA_SNAKES = 12
+ARENA_FOOD_COUNT = 12
+ARENA_POWERUPS = 2
+ARENA_RESPAWN_DELAY = 2.0
+ARENA_BOT = "tournament:greedy_bot"
+
+# Seconds the autopilot (A key) may spend choosing each move
+AUTOPILOT_BUDGET = 0.002
+
+# Fixed simulation ticks per second, independent of the frame rate
+SIM_TICK_RATE = 120
+
+# Run the simulation on its own thread so slow frames cannot hold up ticks
+# or input; the main loop then only renders the latest published state
+SIM_THREAD = False
+
+# Most simulated time a single frame may catch up on. After a longer stall the
+# game runs slow for that frame instead of replaying a burst of ticks.
+MAX_FRAME_TIME = 0.25
+
 INITIAL_MOVE_INTERVAL = 0.18
 SPEED_UP_FACTOR = 0.9
+# Fastest the snake gets, in seconds per move
+MIN_MOVE_INTERVAL = 0.04
 
 BG_COLOR = (20, 20, 20)
 GRID_COLOR = (30, 30, 30)
@@ -20,6 +77,7 @@ OBSTACLE_COLOR = (120, 120, 120)
 POWERUP_COLOR = (80, 160, 255)
 COMBO_COLOR = (255, 210, 80)
 GLOW_COLOR = (255, 255, 255)
+RIVAL_COLOR = (230, 150, 0)
 
 # Power-ups
 POWERUP_SPAWN_CHANCE = 0.25
@@ -33,11 +91,29 @@ BASE_SCORE = 100
 
 # Visual juice
 PARTICLE_COUNT = 18
+PARTICLE_CAPACITY = 512
+POPUP_CAPACITY = 32
 SHAKE_EAT = 4
 SHAKE_DEAD = 8
 
-BLACK = pygame.Color(0, 0, 0)
-WHITE = pygame.Color(255, 255, 255)
-RED = pygame.Color(255, 0, 0)
-GREEN = pygame.Color(0, 255, 0)
-BLUE = pygame.Color(0, 0, 255)
+# Finished games are saved here as replays (empty to disable)
+REPLAY_DIR = ""
+
+# Multiplayer server (src/server.py). A client more than SERVER_HIGH_WATER
+# bytes behind stops getting deltas and is sent a fresh snapshot once it has
+# caught up to SERVER_LOW_WATER. Clients may change direction at most
+# SERVER_MAX_INPUTS times per tick.
+SERVER_HOST = "127.0.0.1"
+SERVER_PORT = 7777
+SERVER_HIGH_WATER = 64 * 1024
+SERVER_LOW_WATER = 16 * 1024
+SERVER_MAX_INPUTS = 4
+
+# Synthesized sound effects are cached here between launches
+SOUND_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "pysnake", "sounds")
+
+BLACK = (0, 0, 0)
+WHITE = (255, 255, 255)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
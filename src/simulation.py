@@ -0,0 +1,329 @@
+import random
+from board import Board, ChunkedBoard, obstacle_walk, EMPTY, SNAKE, FOOD, OBSTACLE, POWERUP
+from snake import Snake
+from food import Food
+from state import SimState
+from settings import (
+    GRID_COLS,
+    GRID_ROWS,
+    INITIAL_MOVE_INTERVAL,
+    SPEED_UP_FACTOR,
+    MIN_MOVE_INTERVAL,
+    FOOD_COUNT,
+    OBSTACLE_COUNT,
+    POWERUP_SPAWN_CHANCE,
+    POWERUP_DURATION,
+    POWERUP_SLOW_FACTOR,
+    POWERUP_SCORE_MULTIPLIER,
+    COMBO_WINDOW,
+    BASE_SCORE,
+    SIM_TICK_RATE,
+    MAX_FRAME_TIME,
+    DENSE_BOARD_LIMIT,
+    WORLD_CHUNK,
+)
+
+SIM_DT = 1.0 / SIM_TICK_RATE
+MAX_TICKS_PER_UPDATE = max(1, int(MAX_FRAME_TIME * SIM_TICK_RATE))
+
+# Board setup, power-up spawning and the fixed-tick clock, shared by
+# Simulation and Arena. Both keep `cols`, `rows`, `rng`, `board`, `obstacles`
+# and `powerups` and implement tick(); move_due() says whether the coming tick
+# moves the snake a controller steers. At most `powerup_limit` power-ups lie
+# on the board at once.
+class Playfield:
+    powerup_limit = 1
+
+    def _new_board(self):
+        if self.cols * self.rows > DENSE_BOARD_LIMIT:
+            return ChunkedBoard(self.cols, self.rows, WORLD_CHUNK)
+        return Board(self.cols, self.rows, WORLD_CHUNK)
+
+    def _place_obstacle(self, position):
+        self.obstacles.append(position)
+        self.board.set(position[0], position[1], OBSTACLE)
+
+    def _spawn_obstacles(self):
+        self.obstacles = []
+        board = self.board
+        start = board.random_free(self.rng) if OBSTACLE_COUNT > 0 else None
+        if start is None:
+            return
+
+        def free(x, y):
+            return board.in_bounds(x, y) and board.is_free(x, y)
+
+        for position in obstacle_walk(start, OBSTACLE_COUNT, free, self.rng.random, self.rng.choice):
+            self._place_obstacle(position)
+
+    def _spawn_powerup(self):
+        position = self.board.random_free(self.rng)
+        if position is None:
+            return
+        kind = self.rng.choice(["slow", "double"])
+        self.powerups.append({"type": kind, "position": position})
+        self.board.set(position[0], position[1], POWERUP)
+
+    def _maybe_spawn_powerup(self):
+        if self.rng.random() <= POWERUP_SPAWN_CHANCE:
+            if len(self.powerups) < self.powerup_limit:
+                self._spawn_powerup()
+
+    # Runs as many whole ticks as `dt` covers, at most `max_ticks`; time beyond
+    # that is dropped so a stalled frame cannot trigger a burst of catch-up
+    # ticks. `controller`, if given, is called with the simulation before every
+    # tick that moves the snake and steers it through change_direction().
+    # Returns the number of ticks run.
+    def update(self, dt, controller=None, max_ticks=MAX_TICKS_PER_UPDATE):
+        self.clock += dt
+        ticks = 0
+        while self.clock >= SIM_DT:
+            if ticks == max_ticks:
+                self.clock %= SIM_DT
+                break
+            self.clock -= SIM_DT
+            if controller is not None and self.move_due():
+                controller(self)
+            self.tick()
+            ticks += 1
+        return ticks
+
+
+# Speed, scoring, combo and power-up rules for one snake, shared by Simulation
+# and Arena's players. Both keep `snake`, `alive` and `clock`, call
+# _reset_rules() whenever a snake starts over and append their own events.
+class SnakeRules:
+    def _reset_rules(self):
+        self.move_interval = INITIAL_MOVE_INTERVAL
+        self.accumulator = 0.0
+        self.score = 0
+        self.combo_timer = 0.0
+        self.combo_count = 0
+        self.score_multiplier = 1
+        self.powerup_timer = 0.0
+        self.active_powerup = None
+
+    def current_interval(self):
+        if self.powerup_timer > 0 and self.active_powerup == "slow":
+            return self.move_interval * POWERUP_SLOW_FACTOR
+        return self.move_interval
+
+    # True when the coming tick will move the snake, i.e. the last chance to
+    # change direction for that move
+    def move_due(self):
+        return self.alive and self.accumulator + SIM_DT >= self.current_interval()
+
+    # How far the snake has got from its last cell toward the next one, for
+    # drawing between moves
+    def alpha(self):
+        interval = self.current_interval()
+        if interval <= 0:
+            return 1.0
+        return max(0.0, min(1.0, (self.accumulator + self.clock) / interval))
+
+    # Runs the combo and power-up timers down by `dt`, ending each that runs out
+    def _count_down(self, dt):
+        if self.combo_timer > 0:
+            self.combo_timer = max(0.0, self.combo_timer - dt)
+            if self.combo_timer == 0:
+                self.combo_count = 0
+
+        if self.powerup_timer > 0:
+            self.powerup_timer = max(0.0, self.powerup_timer - dt)
+            if self.powerup_timer == 0:
+                self.active_powerup = None
+                self.score_multiplier = 1
+
+    # Grows and speeds up the snake for a food and returns the points it scored
+    def _eat_food(self):
+        self.snake.grow(1)
+        self.move_interval = max(MIN_MOVE_INTERVAL, self.move_interval * SPEED_UP_FACTOR)
+        if self.combo_timer > 0:
+            self.combo_count += 1
+        else:
+            self.combo_count = 1
+        self.combo_timer = COMBO_WINDOW
+        points = BASE_SCORE * self.combo_count * self.score_multiplier
+        self.score += points
+        return points
+
+    def _apply_powerup(self, kind):
+        self.active_powerup = kind
+        self.powerup_timer = POWERUP_DURATION
+        if kind == "double":
+            self.score_multiplier = POWERUP_SCORE_MULTIPLIER
+
+
+# Game rules without any display, font or audio dependency. Positions are
+# grid cells; whoever renders the simulation scales them to pixels. Things
+# that happen during a step are queued on `events` for the renderer to turn
+# into particles, popups, shake and sound.
+#
+# Time advances in fixed ticks of SIM_DT and all randomness comes from a
+# per-game RNG, so a seed plus the tick-indexed direction changes in `inputs`
+# reproduce a game exactly (see replay.py).
+class Simulation(Playfield, SnakeRules):
+    def __init__(self, cols=GRID_COLS, rows=GRID_ROWS, seed=None, food_count=FOOD_COUNT):
+        self.cols = cols
+        self.rows = rows
+        self.food_count = food_count
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        self.seed = random.getrandbits(63) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.tick_count = 0
+        self.clock = 0.0
+        self.inputs = []
+        self.board = self._new_board()
+        self.snake = Snake(self.cols // 2, self.rows // 2)
+        self.board.set(self.snake.x, self.snake.y, SNAKE)
+        self.powerups = []
+        self._spawn_obstacles()
+        self.foods = [Food() for _ in range(self.food_count)]
+        self._respawn_all_foods()
+        self.alive = True
+        self.death_tick = None
+        self.death_cause = None
+        self._reset_rules()
+        self.events = []
+
+    # `food_at` finds the food on a cell without scanning `foods`, which can
+    # run to tens of thousands in a large world
+    def _respawn_all_foods(self):
+        self.foods = [food for food in self.foods if food.respawn(self.board, self.rng)]
+        self.food_at = {food.position: food for food in self.foods}
+
+    def _remove_food(self, food):
+        foods = self.foods
+        i = foods.index(food)
+        foods[i] = foods[-1]
+        foods.pop()
+
+    def _add_obstacles(self, count=1):
+        for _ in range(count):
+            # Spawn new obstacles anywhere on the grid (not necessarily connected)
+            position = self.board.random_free(self.rng)
+            if position is None:
+                return
+            self._place_obstacle(position)
+
+    def change_direction(self, direction):
+        heading = (self.snake.dx, self.snake.dy)
+        self.snake.change_direction(direction)
+        if heading != (self.snake.dx, self.snake.dy):
+            self.inputs.append((self.tick_count, direction))
+
+    def tick(self):
+        dt = SIM_DT
+        self.tick_count += 1
+        self._count_down(dt)
+
+        if not self.alive:
+            return
+
+        interval = self.current_interval()
+        self.accumulator += dt
+        while self.accumulator >= interval:
+            self.accumulator -= interval
+            self.step()
+            if not self.alive:
+                break
+
+    def step(self):
+        board = self.board
+        tail = self.snake.move()
+        if tail is not None:
+            board.clear(*tail)
+        head = (self.snake.x, self.snake.y)
+
+        if not board.in_bounds(*head):
+            self.alive = False
+            self.death_cause = "wall"
+            kind = EMPTY
+        else:
+            kind = board.get(*head)
+            if kind == OBSTACLE:
+                self.alive = False
+                self.death_cause = "obstacle"
+            elif kind == SNAKE:
+                self.alive = False
+                self.death_cause = "self"
+
+        if not self.alive:
+            self.death_tick = self.tick_count
+            self.events.append(("dead", head))
+            return
+
+        board.set(head[0], head[1], SNAKE)
+
+        if kind == POWERUP:
+            for powerup in self.powerups:
+                if head == powerup["position"]:
+                    self.powerups.remove(powerup)
+                    self._apply_powerup(powerup["type"])
+                    self.events.append(("powerup", head, self.active_powerup))
+                    break
+
+        elif kind == FOOD:
+            food = self.food_at.pop(head, None)
+            if food is not None:
+                if food.respawn(board, self.rng):
+                    self.food_at[food.position] = food
+                else:
+                    # A full board has nowhere left to put this food. Only
+                    # then is the list searched, and swap-removed from.
+                    self._remove_food(food)
+                self.events.append(("eat", head, self._eat_food()))
+                self._add_obstacles(1)
+                self._maybe_spawn_powerup()
+
+    def snapshot(self):
+        return SimState.capture(self)
+
+    def restore(self, state):
+        state.restore(self)
+
+    # A detached copy for lookahead search. Everything is copied straight
+    # across, so the board is copied once rather than into a snapshot and out
+    # again.
+    def clone(self):
+        sim = Simulation.__new__(Simulation)
+        sim.cols = self.cols
+        sim.rows = self.rows
+        sim.food_count = self.food_count
+        sim.seed = self.seed
+        sim.rng = random.Random()
+        sim.rng.setstate(self.rng.getstate())
+        sim.tick_count = self.tick_count
+        sim.clock = self.clock
+        sim.inputs = list(self.inputs)
+        sim.board = self.board.copy()
+        sim.snake = self.snake.copy()
+        sim.food_at = {}
+        sim.foods = []
+        for food in self.foods:
+            copy = Food()
+            copy.position = food.position
+            sim.foods.append(copy)
+            sim.food_at[copy.position] = copy
+        sim.obstacles = list(self.obstacles)
+        sim.powerups = [dict(powerup) for powerup in self.powerups]
+        sim.alive = self.alive
+        sim.death_tick = self.death_tick
+        sim.death_cause = self.death_cause
+        sim.move_interval = self.move_interval
+        sim.accumulator = self.accumulator
+        sim.score = self.score
+        sim.combo_timer = self.combo_timer
+        sim.combo_count = self.combo_count
+        sim.score_multiplier = self.score_multiplier
+        sim.powerup_timer = self.powerup_timer
+        sim.active_powerup = self.active_powerup
+        sim.events = []
+        return sim
+
+    def pop_events(self):
+        events = self.events
+        self.events = []
+        return events
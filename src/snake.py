@@ -1,13 +1,12 @@
-import pygame
-from settings import SNAKE_COLOR, CELL_SIZE
+from collections import deque
 
 class Snake:
     def __init__(self, x, y):
-        self.segments = [(x, y)]
-        self.prev_segments = [(x, y)]
-        self.dx = CELL_SIZE
+        self.segments = deque([(x, y)])
+        self.prev_head = (x, y)
+        self.prev_tail = None
+        self.dx = 1
         self.dy = 0
-        self.size = CELL_SIZE
         self.pending_growth = 0
 
     @property
@@ -17,56 +16,49 @@ class Snake:
     @property
     def y(self):
         return self.segments[0][1]
-    
+
+    @property
+    def tail(self):
+        return self.segments[-1]
+
     def move(self):
-        self.prev_segments = self.segments.copy()
-        new_head = (self.x + self.dx, self.y + self.dy)
-        self.segments.insert(0, new_head)
+        self.prev_head = self.segments[0]
+        self.segments.appendleft((self.x + self.dx, self.y + self.dy))
         if self.pending_growth > 0:
             self.pending_growth -= 1
+            self.prev_tail = None
         else:
-            self.segments.pop()
+            self.prev_tail = self.segments.pop()
+        return self.prev_tail
 
-        if len(self.prev_segments) < len(self.segments):
-            self.prev_segments = [self.prev_segments[0]] + self.prev_segments
-        if len(self.prev_segments) > len(self.segments):
-            self.prev_segments = self.prev_segments[:len(self.segments)]
-    
     def change_direction(self, direction):
         if len(self.segments) > 1:
-            if direction == "UP" and self.dy == CELL_SIZE:
+            if direction == "UP" and self.dy == 1:
                 return
-            if direction == "DOWN" and self.dy == -CELL_SIZE:
+            if direction == "DOWN" and self.dy == -1:
                 return
-            if direction == "LEFT" and self.dx == CELL_SIZE:
+            if direction == "LEFT" and self.dx == 1:
                 return
-            if direction == "RIGHT" and self.dx == -CELL_SIZE:
+            if direction == "RIGHT" and self.dx == -1:
                 return
         if direction == "UP":
-            self.dx, self.dy = 0, -CELL_SIZE
+            self.dx, self.dy = 0, -1
         if direction == "DOWN":
-            self.dx, self.dy = 0, CELL_SIZE
+            self.dx, self.dy = 0, 1
         if direction == "LEFT":
-            self.dx, self.dy = -CELL_SIZE, 0
+            self.dx, self.dy = -1, 0
         if direction == "RIGHT":
-            self.dx, self.dy = CELL_SIZE, 0
+            self.dx, self.dy = 1, 0
+
+    def copy(self):
+        snake = Snake.__new__(Snake)
+        snake.segments = deque(self.segments)
+        snake.prev_head = self.prev_head
+        snake.prev_tail = self.prev_tail
+        snake.dx = self.dx
+        snake.dy = self.dy
+        snake.pending_growth = self.pending_growth
+        return snake
 
     def grow(self, amount=1):
         self.pending_growth += amount
-
-    def is_self_collision(self):
-        return (self.x, self.y) in self.segments[1:]
-    
-    def draw(self, screen, alpha=1.0, offset=(0, 0)):
-        for index, segment in enumerate(self.segments):
-            prev = self.prev_segments[index] if index < len(self.prev_segments) else segment
-            render_x = prev[0] + (segment[0] - prev[0]) * alpha
-            render_y = prev[1] + (segment[1] - prev[1]) * alpha
-            color = SNAKE_COLOR if index == 0 else (max(0, SNAKE_COLOR[0] - 30),
-                                                    max(0, SNAKE_COLOR[1] - 30),
-                                                    max(0, SNAKE_COLOR[2] - 30))
-            pygame.draw.rect(
-                screen,
-                color,
-                (render_x + offset[0], render_y + offset[1], CELL_SIZE, CELL_SIZE)
-            )
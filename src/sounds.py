@@ -0,0 +1,111 @@
+import hashlib
+import os
+import threading
+import numpy as np
+import pygame
+from settings import SOUND_CACHE_DIR
+
+# name: (frequency, duration, volume, attack, release)
+TONES = {
+    "eat": (720, 0.08, 0.35, 0.004, 0.03),
+    "powerup": (880, 0.12, 0.35, 0.004, 0.04),
+    "dead": (220, 0.25, 0.5, 0.004, 0.08),
+}
+
+# Bump when the synthesis changes so stale cache files are ignored.
+CACHE_VERSION = 1
+
+TABLE_BITS = 12
+TABLE_SIZE = 1 << TABLE_BITS
+SINE_TABLE = np.sin(2 * np.pi * np.arange(TABLE_SIZE) / TABLE_SIZE)
+
+
+# Looks every sample up in the sine table and applies the envelope as whole
+# arrays, so the cost barely depends on the duration
+def synthesize(rate, channels, freq, duration, volume, attack=0.0, release=0.0):
+    samples = int(rate * duration)
+    amplitude = int(volume * 32767)
+    table = (SINE_TABLE * amplitude).astype(np.int16)
+    step = freq * TABLE_SIZE / rate
+    indices = (np.arange(samples) * step).astype(np.int64)
+    indices &= TABLE_SIZE - 1
+    mono = table[indices]
+
+    # Linear ramps only touch the first and last few milliseconds
+    attack_samples = min(samples, int(rate * attack))
+    if attack_samples:
+        ramp = np.arange(attack_samples) / attack_samples
+        mono[:attack_samples] = mono[:attack_samples] * ramp
+    release_samples = min(samples, int(rate * release))
+    if release_samples:
+        ramp = np.arange(release_samples - 1, -1, -1) / release_samples
+        mono[samples - release_samples:] = mono[samples - release_samples:] * ramp
+
+    if channels == 1:
+        return mono
+    return np.repeat(mono, channels)
+
+
+def _cache_path(rate, size, channels, params):
+    key = repr((CACHE_VERSION, rate, size, channels, params)).encode()
+    return os.path.join(SOUND_CACHE_DIR, hashlib.sha1(key).hexdigest()[:16] + ".pcm")
+
+
+def load_pcm(rate, size, channels, params):
+    path = _cache_path(rate, size, channels, params)
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        pass
+    data = synthesize(rate, channels, *params).tobytes()
+    try:
+        os.makedirs(SOUND_CACHE_DIR, exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+    return data
+
+
+# Raw PCM for every tone is loaded (or synthesized and cached) on a background
+# thread so startup never waits for it. Sounds that are not ready yet are
+# skipped; pygame Sound objects are created on the calling thread on first use.
+class SoundBank:
+    def __init__(self, tones=TONES, background=True):
+        self.pcm = {}
+        self.sounds = {}
+        init = pygame.mixer.get_init()
+        if not init:
+            return
+        rate, size, channels = init
+        if abs(size) != 16:
+            return
+        self._thread = threading.Thread(
+            target=self._load, args=(tones, rate, size, channels), daemon=True
+        )
+        if background:
+            self._thread.start()
+        else:
+            self._thread.run()
+
+    def _load(self, tones, rate, size, channels):
+        for name, params in tones.items():
+            self.pcm[name] = load_pcm(rate, size, channels, params)
+
+    def get(self, name):
+        sound = self.sounds.get(name)
+        if sound is None:
+            data = self.pcm.get(name)
+            if data is None:
+                return None
+            sound = pygame.mixer.Sound(buffer=data)
+            self.sounds[name] = sound
+        return sound
+
+    def play(self, name):
+        sound = self.get(name)
+        if sound:
+            sound.play()
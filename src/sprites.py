@@ -0,0 +1,115 @@
+import pygame
+from collections import OrderedDict
+from itertools import islice
+from settings import TEXT_CACHE_SIZE, SNAKE_COLOR, CELL_SIZE
+
+GLOW_ALPHA = 90
+
+# Pre-rendered tiles keyed by (color, size, style), drawn once and reused every
+# frame. Surfaces are converted to the display format on first use when a
+# display exists so blitting them needs no per-pixel conversion.
+class SpriteCache:
+    def __init__(self):
+        self.sprites = {}
+
+    def get(self, color, size, style="square"):
+        key = (tuple(color), size, style)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self._render(color, size, style)
+            self.sprites[key] = sprite
+        return sprite
+
+    def clear(self):
+        self.sprites.clear()
+
+    def _render(self, color, size, style):
+        if style == "square":
+            surface = pygame.Surface((size, size))
+            surface.fill(color)
+            return self._convert(surface, False)
+
+        if style == "glow":
+            surface = pygame.Surface((size * 2, size * 2), pygame.SRCALPHA)
+            pygame.draw.rect(
+                surface,
+                (color[0], color[1], color[2], GLOW_ALPHA),
+                (size // 2, size // 2, size, size),
+                border_radius=4
+            )
+            return self._convert(surface, True)
+
+        if style == "obstacle":
+            radius = 2
+        elif style == "powerup":
+            radius = 6
+        else:
+            raise ValueError(f"unknown sprite style: {style}")
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        pygame.draw.rect(surface, color, (0, 0, size, size), border_radius=radius)
+        return self._convert(surface, True)
+
+    def _convert(self, surface, alpha):
+        if pygame.display.get_surface() is None:
+            return surface
+        return surface.convert_alpha() if alpha else surface.convert()
+
+
+# Rendered text Surfaces keyed by (font, text, color), evicting the least
+# recently used entry once `capacity` is reached. Most HUD strings repeat for
+# many frames in a row, so nearly every lookup should be a hit.
+class TextCache:
+    def __init__(self, capacity=TEXT_CACHE_SIZE):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, tuple(color))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+sprite_cache = SpriteCache()
+
+BODY_COLOR = tuple(max(0, c - 30) for c in SNAKE_COLOR)
+
+
+def _cell_blit(color, start, end, alpha, offset):
+    render_x = (start[0] + (end[0] - start[0]) * alpha) * CELL_SIZE
+    render_y = (start[1] + (end[1] - start[1]) * alpha) * CELL_SIZE
+    return (sprite_cache.get(color, CELL_SIZE), (render_x + offset[0], render_y + offset[1]))
+
+
+# Between two steps only the head and the tail of a Snake are in motion; every
+# other segment sits on a cell it also covered on the previous step.
+def draw_snake_body(screen, snake, offset=(0, 0), color=BODY_COLOR):
+    tile = sprite_cache.get(color, CELL_SIZE)
+    offset_x, offset_y = offset
+    screen.blits(
+        [(tile, (x * CELL_SIZE + offset_x, y * CELL_SIZE + offset_y))
+         for x, y in islice(snake.segments, 1, None)],
+        doreturn=False
+    )
+
+
+def draw_snake_moving(screen, snake, alpha=1.0, offset=(0, 0), color=SNAKE_COLOR, body_color=BODY_COLOR):
+    blits = []
+    segments = snake.segments
+    if len(segments) > 1 and snake.prev_tail is not None:
+        blits.append(_cell_blit(body_color, snake.prev_tail, segments[-1], alpha, offset))
+    blits.append(_cell_blit(color, snake.prev_head, segments[0], alpha, offset))
+    return screen.blits(blits)
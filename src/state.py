@@ -0,0 +1,205 @@
+import array
+import struct
+from collections import deque
+from board import Board, ChunkedBoard
+from food import Food
+from snake import Snake
+
+MAGIC = b"PSST"
+VERSION = 3
+HEADER = struct.Struct("<4sBQIdIIbbI?iBddQdIIdBiiBiiIIIIIIB")
+BOARDS = (Board, ChunkedBoard)
+CAUSES = (None, "wall", "obstacle", "self")
+POWERUPS = (None, "slow", "double")
+
+
+# Everything a Simulation needs to carry on from a given tick, and nothing the
+# renderer owns. Snapshots are taken with Simulation.snapshot() and put back
+# with Simulation.restore(); restoring copies out of the state, so one snapshot
+# can be restored any number of times (lookahead, rollback) or written to disk
+# with serialize()/save().
+class SimState:
+    __slots__ = (
+        "seed", "rng_state", "tick_count", "clock", "input_count",
+        "cols", "rows", "board",
+        "segments", "prev_head", "prev_tail", "dx", "dy", "pending_growth",
+        "foods", "obstacles", "powerups",
+        "alive", "death_tick", "death_cause",
+        "move_interval", "accumulator", "score",
+        "combo_timer", "combo_count", "score_multiplier",
+        "powerup_timer", "active_powerup",
+    )
+
+    @classmethod
+    def capture(cls, sim):
+        state = cls.__new__(cls)
+        board = sim.board
+        snake = sim.snake
+        state.seed = sim.seed
+        state.rng_state = sim.rng.getstate()
+        state.tick_count = sim.tick_count
+        state.clock = sim.clock
+        state.input_count = len(sim.inputs)
+        state.cols = sim.cols
+        state.rows = sim.rows
+        state.board = board.copy()
+        state.segments = tuple(snake.segments)
+        state.prev_head = snake.prev_head
+        state.prev_tail = snake.prev_tail
+        state.dx = snake.dx
+        state.dy = snake.dy
+        state.pending_growth = snake.pending_growth
+        state.foods = tuple(food.position for food in sim.foods)
+        state.obstacles = tuple(sim.obstacles)
+        state.powerups = tuple((powerup["type"], powerup["position"]) for powerup in sim.powerups)
+        state.alive = sim.alive
+        state.death_tick = sim.death_tick
+        state.death_cause = sim.death_cause
+        state.move_interval = sim.move_interval
+        state.accumulator = sim.accumulator
+        state.score = sim.score
+        state.combo_timer = sim.combo_timer
+        state.combo_count = sim.combo_count
+        state.score_multiplier = sim.score_multiplier
+        state.powerup_timer = sim.powerup_timer
+        state.active_powerup = sim.active_powerup
+        return state
+
+    def restore(self, sim):
+        sim.seed = self.seed
+        sim.rng.setstate(self.rng_state)
+        sim.tick_count = self.tick_count
+        sim.clock = self.clock
+        del sim.inputs[self.input_count:]
+        sim.cols = self.cols
+        sim.rows = self.rows
+        sim.board = self.board.copy()
+        snake = Snake.__new__(Snake)
+        snake.segments = deque(self.segments)
+        snake.prev_head = self.prev_head
+        snake.prev_tail = self.prev_tail
+        snake.dx = self.dx
+        snake.dy = self.dy
+        snake.pending_growth = self.pending_growth
+        sim.snake = snake
+        sim.foods = []
+        for position in self.foods:
+            food = Food()
+            food.position = position
+            sim.foods.append(food)
+        sim.food_at = {food.position: food for food in sim.foods}
+        sim.obstacles = list(self.obstacles)
+        sim.powerups = [{"type": kind, "position": position} for kind, position in self.powerups]
+        sim.alive = self.alive
+        sim.death_tick = self.death_tick
+        sim.death_cause = self.death_cause
+        sim.move_interval = self.move_interval
+        sim.accumulator = self.accumulator
+        sim.score = self.score
+        sim.combo_timer = self.combo_timer
+        sim.combo_count = self.combo_count
+        sim.score_multiplier = self.score_multiplier
+        sim.powerup_timer = self.powerup_timer
+        sim.active_powerup = self.active_powerup
+        sim.events = []
+
+    def clone(self):
+        # Every field is immutable or copied again on restore(), so sharing is safe
+        state = SimState.__new__(SimState)
+        for name in SimState.__slots__:
+            setattr(state, name, getattr(self, name))
+        return state
+
+    def serialize(self):
+        version, mt, gauss = self.rng_state
+        prev_tail = self.prev_tail or (0, 0)
+        out = bytearray(HEADER.pack(
+            MAGIC, VERSION, self.seed, self.tick_count, self.clock, self.cols, self.rows,
+            self.dx, self.dy, self.pending_growth,
+            self.alive, -1 if self.death_tick is None else self.death_tick, CAUSES.index(self.death_cause),
+            self.move_interval, self.accumulator, self.score,
+            self.combo_timer, self.combo_count, self.score_multiplier,
+            self.powerup_timer, POWERUPS.index(self.active_powerup),
+            self.prev_head[0], self.prev_head[1],
+            self.prev_tail is not None, prev_tail[0], prev_tail[1],
+            len(self.segments), len(self.foods), len(self.obstacles), len(self.powerups),
+            self.input_count, version, BOARDS.index(type(self.board)),
+        ))
+        out += self.board.to_bytes()
+        for cells in (self.segments, self.foods, self.obstacles, [p for _, p in self.powerups]):
+            out += array.array("i", [v for cell in cells for v in cell]).tobytes()
+        out += bytes(POWERUPS.index(kind) for kind, _ in self.powerups)
+        out += array.array("I", mt).tobytes()
+        out += struct.pack("<?d", gauss is not None, gauss or 0.0)
+        return bytes(out)
+
+    @classmethod
+    def deserialize(cls, data):
+        (magic, version, seed, tick_count, clock, cols, rows,
+         dx, dy, pending_growth,
+         alive, death_tick, cause,
+         move_interval, accumulator, score,
+         combo_timer, combo_count, score_multiplier,
+         powerup_timer, active_powerup,
+         head_x, head_y, has_tail, tail_x, tail_y,
+         n_segments, n_foods, n_obstacles, n_powerups,
+         input_count, rng_version, board_type) = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a PySnake state")
+        pos = HEADER.size
+
+        def take(typecode, count):
+            nonlocal pos
+            values = array.array(typecode)
+            values.frombytes(data[pos:pos + count * values.itemsize])
+            pos += count * values.itemsize
+            return values
+
+        def cells(count):
+            flat = take("i", count * 2)
+            return tuple((flat[i], flat[i + 1]) for i in range(0, len(flat), 2))
+
+        state = cls.__new__(cls)
+        state.seed = seed
+        state.tick_count = tick_count
+        state.clock = clock
+        state.input_count = input_count
+        state.cols = cols
+        state.rows = rows
+        state.board, pos = BOARDS[board_type].from_bytes(cols, rows, data, pos)
+        state.segments = cells(n_segments)
+        state.foods = cells(n_foods)
+        state.obstacles = cells(n_obstacles)
+        positions = cells(n_powerups)
+        kinds = data[pos:pos + n_powerups]
+        pos += n_powerups
+        state.powerups = tuple((POWERUPS[kind], position) for kind, position in zip(kinds, positions))
+        mt = tuple(take("I", 625))
+        has_gauss, gauss = struct.unpack_from("<?d", data, pos)
+        state.rng_state = (rng_version, mt, gauss if has_gauss else None)
+        state.prev_head = (head_x, head_y)
+        state.prev_tail = (tail_x, tail_y) if has_tail else None
+        state.dx = dx
+        state.dy = dy
+        state.pending_growth = pending_growth
+        state.alive = alive
+        state.death_tick = None if death_tick < 0 else death_tick
+        state.death_cause = CAUSES[cause]
+        state.move_interval = move_interval
+        state.accumulator = accumulator
+        state.score = score
+        state.combo_timer = combo_timer
+        state.combo_count = combo_count
+        state.score_multiplier = score_multiplier
+        state.powerup_timer = powerup_timer
+        state.active_powerup = POWERUPS[active_powerup]
+        return state
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.serialize())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.deserialize(f.read())
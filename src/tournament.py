@@ -0,0 +1,132 @@
+import argparse
+import importlib
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from board import SNAKE, OBSTACLE
+from simulation import Simulation
+
+DIRECTIONS = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+
+
+# Heads for the nearest food, taking any move that does not die right away
+def greedy_bot(sim):
+    head_x, head_y = sim.snake.x, sim.snake.y
+    if not sim.foods:
+        return None
+    target = min(
+        (food.position for food in sim.foods),
+        key=lambda p: abs(p[0] - head_x) + abs(p[1] - head_y),
+    )
+    board = sim.board
+    best = None
+    for direction, (dx, dy) in DIRECTIONS.items():
+        x, y = head_x + dx, head_y + dy
+        if not board.in_bounds(x, y):
+            continue
+        kind = board.get(x, y)
+        if kind == SNAKE or kind == OBSTACLE:
+            continue
+        distance = abs(target[0] - x) + abs(target[1] - y)
+        if best is None or distance < best[0]:
+            best = (distance, direction)
+    return best[1] if best else None
+
+
+def load_bot(spec):
+    module_name, _, name = spec.partition(":")
+    return getattr(importlib.import_module(module_name), name)
+
+
+# Plays one seeded game, asking the bot for a direction only on ticks where the
+# snake is about to move.
+def play(bot, seed, max_ticks):
+    sim = Simulation(seed=seed)
+    while sim.alive and sim.tick_count < max_ticks:
+        if sim.move_due():
+            direction = bot(sim)
+            if direction:
+                sim.change_direction(direction)
+        sim.tick()
+        sim.events.clear()
+    return {
+        "seed": seed,
+        "score": sim.score,
+        "length": len(sim.snake.segments),
+        "ticks": sim.tick_count if sim.death_tick is None else sim.death_tick,
+        "cause": sim.death_cause or "timeout",
+    }
+
+
+def run_batch(bot_spec, seeds, max_ticks):
+    bot = load_bot(bot_spec)
+    return [play(bot, seed, max_ticks) for seed in seeds]
+
+
+def summarize(results):
+    scores = sorted(result["score"] for result in results)
+    return {
+        "games": len(results),
+        "score_mean": statistics.fmean(scores),
+        "score_median": statistics.median(scores),
+        "score_p90": scores[min(len(scores) - 1, int(len(scores) * 0.9))],
+        "score_max": scores[-1],
+        "length_mean": statistics.fmean(result["length"] for result in results),
+        "ticks_mean": statistics.fmean(result["ticks"] for result in results),
+        "causes": dict(Counter(result["cause"] for result in results)),
+    }
+
+
+def run_tournament(bot_spec, seeds, workers=None, batch_size=200, max_ticks=120000, on_batch=None):
+    batches = [seeds[i:i + batch_size] for i in range(0, len(seeds), batch_size)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_batch, bot_spec, batch, max_ticks) for batch in batches]
+        for future in as_completed(futures):
+            batch = future.result()
+            results.extend(batch)
+            if on_batch:
+                on_batch(batch, len(results))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate a bot over many seeds on all cores")
+    parser.add_argument("--bot", default="tournament:greedy_bot",
+                        help="policy as module:function, called with the Simulation before each move")
+    parser.add_argument("--seeds", type=int, default=1000, help="number of games")
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=200, help="games per worker task")
+    parser.add_argument("--max-ticks", type=int, default=120000, help="stop a game after this many ticks")
+    parser.add_argument("--output", help="stream per-game results to this JSON Lines file")
+    args = parser.parse_args()
+
+    seeds = list(range(args.first_seed, args.first_seed + args.seeds))
+    out = open(args.output, "w") if args.output else None
+    start = time.perf_counter()
+
+    def on_batch(batch, done):
+        if out:
+            for result in batch:
+                out.write(json.dumps(result) + "\n")
+            out.flush()
+        print(f"{done}/{len(seeds)} games", file=sys.stderr)
+
+    try:
+        results = run_tournament(args.bot, seeds, args.workers, args.batch_size, args.max_ticks, on_batch)
+    finally:
+        if out:
+            out.close()
+    summary = summarize(results)
+    summary["seconds"] = time.perf_counter() - start
+    print(json.dumps(summary, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
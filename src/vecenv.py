@@ -0,0 +1,262 @@
+import numpy as np
+from board import obstacle_walk, EMPTY, SNAKE, FOOD, OBSTACLE, POWERUP
+from settings import (
+    GRID_COLS,
+    GRID_ROWS,
+    INITIAL_MOVE_INTERVAL,
+    SPEED_UP_FACTOR,
+    MIN_MOVE_INTERVAL,
+    FOOD_COUNT,
+    OBSTACLE_COUNT,
+    POWERUP_SPAWN_CHANCE,
+    POWERUP_DURATION,
+    POWERUP_SLOW_FACTOR,
+    POWERUP_SCORE_MULTIPLIER,
+    COMBO_WINDOW,
+    BASE_SCORE,
+)
+
+UP, DOWN, LEFT, RIGHT = range(4)
+DX = np.array([0, 0, -1, 1], dtype=np.int64)
+DY = np.array([-1, 1, 0, 0], dtype=np.int64)
+OPPOSITE = np.array([DOWN, UP, RIGHT, LEFT], dtype=np.int64)
+
+NO_POWERUP, SLOW, DOUBLE = 0, 1, 2
+
+
+# N independent boards stepped together, one snake move per step. Every board
+# keeps the same state as Simulation in flat NumPy arrays: a cell-kind grid
+# using the board.py codes, the body as a ring buffer of cell indices, food and
+# power-up cells, timers and score. step() applies the rules of
+# Simulation.step to all boards at once; time between moves is the current
+# move interval, which is what combo and power-up timers count down.
+#
+# Random draws come from one NumPy generator, so a seeded batch is
+# reproducible but does not follow the same sequence as a seeded Simulation.
+class VecSnakeEnv:
+    def __init__(self, num_envs, cols=GRID_COLS, rows=GRID_ROWS, seed=None, auto_reset=True):
+        self.num_envs = num_envs
+        self.cols = cols
+        self.rows = rows
+        self.cells = cols * rows
+        self.auto_reset = auto_reset
+        self.rng = np.random.default_rng(seed)
+
+        n = num_envs
+        self.grid = np.zeros((n, self.cells), dtype=np.uint8)
+        self.body = np.zeros((n, self.cells), dtype=np.int32)
+        self.head_ptr = np.zeros(n, dtype=np.int64)
+        self.tail_ptr = np.zeros(n, dtype=np.int64)
+        self.length = np.zeros(n, dtype=np.int64)
+        self.direction = np.full(n, RIGHT, dtype=np.int64)
+        self.pending_growth = np.zeros(n, dtype=np.int64)
+        self.foods = np.full((n, FOOD_COUNT), -1, dtype=np.int64)
+        self.powerup_cell = np.full(n, -1, dtype=np.int64)
+        self.powerup_kind = np.zeros(n, dtype=np.int64)
+        self.obstacle_count = np.zeros(n, dtype=np.int64)
+        self.move_interval = np.full(n, INITIAL_MOVE_INTERVAL)
+        self.combo_timer = np.zeros(n)
+        self.combo_count = np.zeros(n, dtype=np.int64)
+        self.powerup_timer = np.zeros(n)
+        self.active_powerup = np.zeros(n, dtype=np.int64)
+        self.score_multiplier = np.ones(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.alive = np.zeros(n, dtype=bool)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.final_score = np.zeros(n, dtype=np.int64)
+        self.reset()
+
+    @property
+    def observation(self):
+        return self.grid.reshape(self.num_envs, self.rows, self.cols)
+
+    @property
+    def heads(self):
+        return self.body[np.arange(self.num_envs), self.head_ptr]
+
+    def reset(self, mask=None):
+        indices = range(self.num_envs) if mask is None else np.flatnonzero(mask)
+        for i in indices:
+            self._reset_board(i)
+
+    def _reset_board(self, i):
+        grid = self.grid[i]
+        grid[:] = EMPTY
+        head = (self.rows // 2) * self.cols + self.cols // 2
+        self.body[i, 0] = head
+        self.head_ptr[i] = 0
+        self.tail_ptr[i] = 0
+        self.length[i] = 1
+        grid[head] = SNAKE
+        self.direction[i] = RIGHT
+        self.pending_growth[i] = 0
+        self.obstacle_count[i] = 0
+        self._spawn_obstacles(i)
+        for slot in range(FOOD_COUNT):
+            cell = self._random_free_one(i)
+            self.foods[i, slot] = cell
+            if cell >= 0:
+                grid[cell] = FOOD
+        self.powerup_cell[i] = -1
+        self.powerup_kind[i] = NO_POWERUP
+        self.move_interval[i] = INITIAL_MOVE_INTERVAL
+        self.combo_timer[i] = 0.0
+        self.combo_count[i] = 0
+        self.powerup_timer[i] = 0.0
+        self.active_powerup[i] = NO_POWERUP
+        self.score_multiplier[i] = 1
+        self.score[i] = 0
+        self.alive[i] = True
+        self.steps[i] = 0
+
+    def _random_free_one(self, i):
+        free = np.flatnonzero(self.grid[i] == EMPTY)
+        if not len(free):
+            return -1
+        return int(free[self.rng.integers(len(free))])
+
+    def _spawn_obstacles(self, i):
+        # Simulation's connected random walk, drawn from this batch's generator
+        if OBSTACLE_COUNT <= 0:
+            return
+        grid = self.grid[i]
+        start = self._random_free_one(i)
+        if start < 0:
+            return
+        cols, rows = self.cols, self.rows
+        rng = self.rng
+
+        def free(x, y):
+            return 0 <= x < cols and 0 <= y < rows and grid[y * cols + x] == EMPTY
+
+        def pick(seq):
+            return seq[rng.integers(len(seq))]
+
+        count = 0
+        for x, y in obstacle_walk((start % cols, start // cols), OBSTACLE_COUNT, free, rng.random, pick):
+            grid[y * cols + x] = OBSTACLE
+            count += 1
+        self.obstacle_count[i] = count
+
+    def _random_free(self, boards):
+        # One uniform empty cell per listed board, or -1 where a board is full
+        if not len(boards):
+            return np.zeros(0, dtype=np.int64)
+        free = self.grid[boards] == EMPTY
+        counts = free.sum(axis=1)
+        target = (self.rng.random(len(boards)) * counts).astype(np.int64)
+        cells = np.argmax(np.cumsum(free, axis=1) > target[:, None], axis=1)
+        cells[counts == 0] = -1
+        return cells
+
+    def step(self, actions):
+        n = self.num_envs
+        cols = self.cols
+        rewards = np.zeros(n, dtype=np.float32)
+        dones = np.zeros(n, dtype=bool)
+        idx = np.flatnonzero(self.alive)
+        if not len(idx):
+            return rewards, dones
+
+        # Turn, ignoring reversals once the snake is longer than its head
+        actions = np.asarray(actions, dtype=np.int64)[idx]
+        turn = (actions >= 0) & ~((self.length[idx] > 1) & (actions == OPPOSITE[self.direction[idx]]))
+        self.direction[idx[turn]] = actions[turn]
+
+        # Timers run down by the time it takes to reach this move
+        slow = (self.powerup_timer[idx] > 0) & (self.active_powerup[idx] == SLOW)
+        interval = self.move_interval[idx] * np.where(slow, POWERUP_SLOW_FACTOR, 1.0)
+        combo = self.combo_timer[idx]
+        ran = combo > 0
+        combo = np.maximum(0.0, combo - interval)
+        self.combo_timer[idx] = combo
+        self.combo_count[idx[ran & (combo == 0)]] = 0
+        power = self.powerup_timer[idx]
+        ran = power > 0
+        power = np.maximum(0.0, power - interval)
+        self.powerup_timer[idx] = power
+        expired = idx[ran & (power == 0)]
+        self.active_powerup[expired] = NO_POWERUP
+        self.score_multiplier[expired] = 1
+
+        # Move: the tail leaves before the head arrives
+        head = self.body[idx, self.head_ptr[idx]]
+        direction = self.direction[idx]
+        x = head % cols + DX[direction]
+        y = head // cols + DY[direction]
+        inside = (x >= 0) & (x < cols) & (y >= 0) & (y < self.rows)
+        new = np.where(inside, y * cols + x, 0)
+
+        growing = self.pending_growth[idx] > 0
+        self.pending_growth[idx[growing]] -= 1
+        shrink = idx[~growing]
+        self.grid[shrink, self.body[shrink, self.tail_ptr[shrink]]] = EMPTY
+        self.tail_ptr[shrink] = (self.tail_ptr[shrink] + 1) % self.cells
+        self.length[shrink] -= 1
+
+        kind = np.where(inside, self.grid[idx, new], EMPTY)
+        dead = ~inside | (kind == SNAKE) | (kind == OBSTACLE)
+        died = idx[dead]
+        self.alive[died] = False
+        dones[died] = True
+
+        live = ~dead
+        boards = idx[live]
+        new = new[live]
+        kind = kind[live]
+        ptr = (self.head_ptr[boards] + 1) % self.cells
+        self.head_ptr[boards] = ptr
+        self.body[boards, ptr] = new
+        self.grid[boards, new] = SNAKE
+        self.length[boards] += 1
+        self.steps[idx] += 1
+
+        # Power-up pickup
+        picked = boards[kind == POWERUP]
+        if len(picked):
+            self.active_powerup[picked] = self.powerup_kind[picked]
+            self.powerup_timer[picked] = POWERUP_DURATION
+            doubled = picked[self.powerup_kind[picked] == DOUBLE]
+            self.score_multiplier[doubled] = POWERUP_SCORE_MULTIPLIER
+            self.powerup_cell[picked] = -1
+            self.powerup_kind[picked] = NO_POWERUP
+
+        # Food: respawn, grow, speed up, combo, score, new obstacle, maybe power-up
+        ate = kind == FOOD
+        eaters = boards[ate]
+        if len(eaters):
+            slots = np.argmax(self.foods[eaters] == new[ate][:, None], axis=1)
+            cells = self._random_free(eaters)
+            self.foods[eaters, slots] = cells
+            placed = cells >= 0
+            self.grid[eaters[placed], cells[placed]] = FOOD
+
+            self.pending_growth[eaters] += 1
+            self.move_interval[eaters] = np.maximum(MIN_MOVE_INTERVAL, self.move_interval[eaters] * SPEED_UP_FACTOR)
+            chained = self.combo_timer[eaters] > 0
+            self.combo_count[eaters] = np.where(chained, self.combo_count[eaters] + 1, 1)
+            self.combo_timer[eaters] = COMBO_WINDOW
+            points = BASE_SCORE * self.combo_count[eaters] * self.score_multiplier[eaters]
+            self.score[eaters] += points
+            rewards[eaters] = points
+
+            cells = self._random_free(eaters)
+            placed = cells >= 0
+            self.grid[eaters[placed], cells[placed]] = OBSTACLE
+            self.obstacle_count[eaters[placed]] += 1
+
+            roll = self.rng.random(len(eaters))
+            spawners = eaters[(roll <= POWERUP_SPAWN_CHANCE) & (self.powerup_cell[eaters] < 0)]
+            cells = self._random_free(spawners)
+            placed = cells >= 0
+            spawners = spawners[placed]
+            cells = cells[placed]
+            self.powerup_cell[spawners] = cells
+            self.powerup_kind[spawners] = self.rng.integers(SLOW, DOUBLE + 1, size=len(spawners))
+            self.grid[spawners, cells] = POWERUP
+
+        if dones.any():
+            self.final_score[dones] = self.score[dones]
+            if self.auto_reset:
+                self.reset(dones)
+        return rewards, dones
@@ -0,0 +1,379 @@
+import sys
+import threading
+import time
+from collections import deque
+import pygame
+from board import OBSTACLE, FOOD, POWERUP
+from food import Food
+from replay import Replay, ReplaySimulation
+from simulation import SIM_DT
+from snake import Snake
+from settings import MAX_FRAME_TIME, CELL_SIZE, WINDOW_WIDTH, WINDOW_HEIGHT
+
+
+# Everything the renderer needs from one moment of the simulation. The worker
+# builds a new Frame after each tick that changed something and never touches
+# it again, so the render thread can read it without locks while the next one
+# is being built. Nothing in it is shared with the simulation: `foods` and
+# `obstacles` are tuples, and `chunks`, `cells` and `revisions` are what a
+# camera view needs of the board, copied out of the chunks around the head.
+# `generation` counts resets, so the render side knows when its per-board
+# state is stale.
+class Frame:
+    __slots__ = (
+        "tick_count", "time", "move_time", "accumulator", "interval",
+        "segments", "prev_head", "prev_tail", "dx", "dy",
+        "foods", "powerups", "obstacles", "generation", "chunks", "cells", "revisions",
+        "score", "combo_count", "active_powerup", "powerup_timer", "alive",
+    )
+
+    def __init__(self, sim, now, move_time, generation, foods, obstacles, view):
+        snake = sim.snake
+        self.tick_count = sim.tick_count
+        self.time = now
+        self.move_time = move_time
+        self.accumulator = sim.accumulator
+        self.interval = sim.current_interval()
+        self.segments = tuple(snake.segments)
+        self.prev_head = snake.prev_head
+        self.prev_tail = snake.prev_tail
+        self.dx = snake.dx
+        self.dy = snake.dy
+        self.foods = foods
+        self.powerups = tuple(dict(powerup) for powerup in sim.powerups)
+        self.obstacles = obstacles
+        self.generation = generation
+        self.chunks, self.cells, self.revisions = view
+        self.score = sim.score
+        self.combo_count = sim.combo_count
+        self.active_powerup = sim.active_powerup
+        self.powerup_timer = sim.powerup_timer
+        self.alive = sim.alive
+
+
+# Obstacle, food and power-up cells and obstacle revisions of the board chunks
+# overlapping `bounds` (x0, y0, x1, y1 in cells), in the shape Frame keeps them
+def copy_view(board, bounds):
+    keys = board.chunks_in(*bounds)
+    cells = {}
+    for key in keys:
+        for kind in (OBSTACLE, FOOD, POWERUP):
+            found = tuple(board.find_in(key, kind))
+            if found:
+                cells[key, kind] = found
+    revisions = {key: board.revisions[key] for key in keys if key in board.revisions}
+    return frozenset(keys), cells, revisions
+
+
+# The board as the render thread sees it: the chunk queries WorldView makes,
+# answered from the latest Frame's copy. One lives as long as the board it
+# stands for, so a view's per-board caches carry over from frame to frame.
+class FrameBoard:
+    def __init__(self, cols, rows, chunk):
+        self.cols = cols
+        self.rows = rows
+        self.chunk = chunk
+        self.shift = chunk.bit_length() - 1
+        self.changed = None
+        self.frame = None
+
+    @property
+    def revisions(self):
+        return self.frame.revisions
+
+    def chunks_in(self, x0, y0, x1, y1):
+        shift = self.shift
+        chunks = self.frame.chunks
+        return [
+            (cx, cy)
+            for cy in range(max(0, y0) >> shift, ((min(self.rows, y1) - 1) >> shift) + 1)
+            for cx in range(max(0, x0) >> shift, ((min(self.cols, x1) - 1) >> shift) + 1)
+            if (cx, cy) in chunks
+        ]
+
+    def find_in(self, key, kind):
+        return self.frame.cells.get((key, kind), ())
+
+
+# Runs a Simulation on a worker thread at SIM_TICK_RATE and shows it to Game
+# through the same attributes a Simulation has. Direction changes and restarts
+# are queued to the worker; the worker publishes a new Frame whenever a tick
+# changes something, and update() on the render thread picks up the latest
+# one. The render thread never reads the simulation itself: the board it sees
+# is a FrameBoard over the `view` (width, height in pixels) around the head,
+# and a game that ends leaves its Replay in `replay` before the dead event is
+# handed over.
+#
+# The render thread can take as long as it likes over a frame: the snake keeps
+# moving on schedule, and interpolation and timers are extrapolated from the
+# time the frame was published.
+class ThreadedSimulation:
+    # How often a thread holding the GIL is asked to hand it over while the
+    # worker runs. The default 5 ms would let a busy render thread hold back
+    # the worker for most of a tick.
+    SWITCH_INTERVAL = 0.0005
+
+    def __init__(self, sim, view=(WINDOW_WIDTH, WINDOW_HEIGHT)):
+        self.sim = sim
+        self.cols = sim.cols
+        self.rows = sim.rows
+        self.chunk = sim.board.chunk
+        self.view = view
+        self.commands = deque()
+        self.events = deque()
+        self.controller = None
+        self.error = None
+        self.replay = None
+        self.move_time = 0.0
+        self.generation = 0
+        self._foods = None
+        self._obstacles = None
+        self._bounds = None
+        self._view = None
+        self.front = self._publish(time.perf_counter(), True)
+        self.frame = None
+        self.snake = Snake(0, 0)
+        self.tick_count = 0
+        self._shown_generation = None
+        self._food_objects = []
+        self._food_source = None
+        self._show(self.front)
+        self.running = True
+        self.switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(self.SWITCH_INTERVAL)
+        self.thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        self.thread.join()
+        sys.setswitchinterval(self.switch_interval)
+
+    # Worker thread
+
+    def _run(self):
+        try:
+            next_tick = time.perf_counter()
+            while self.running:
+                now = time.perf_counter()
+                if now < next_tick:
+                    time.sleep(next_tick - now)
+                    continue
+                self._tick(now)
+                next_tick += SIM_DT
+                if now - next_tick > MAX_FRAME_TIME:
+                    next_tick = now
+        except Exception as exc:
+            self.error = exc
+
+    def _tick(self, now):
+        sim = self.sim
+        changed = False
+        reset = False
+        while self.commands:
+            command, value = self.commands.popleft()
+            if command == "reset":
+                sim.reset(value)
+                self.generation += 1
+                changed = reset = True
+            else:
+                sim.change_direction(value)
+        controller = self.controller
+        if controller is not None and sim.move_due():
+            controller(sim)
+        head = sim.snake.segments[0]
+        status = (sim.score, sim.combo_count, sim.active_powerup, sim.alive)
+        sim.tick()
+        events = sim.pop_events()
+        if sim.snake.segments[0] != head:
+            # Taken after the queued commands were applied, so a move never
+            # looks older than the input it carried
+            self.move_time = time.perf_counter()
+            changed = True
+        if changed or events or status != (sim.score, sim.combo_count, sim.active_powerup, sim.alive):
+            # Food, obstacles and power-ups only ever change with an event
+            self.front = self._publish(now, reset or bool(events))
+        if events:
+            if not sim.alive and not isinstance(sim, ReplaySimulation):
+                self.replay = Replay.from_simulation(sim)
+            self.events.extend(events)
+
+    # A Frame of the simulation as it is now. The food and obstacle tuples and
+    # the copy of the board around the head are carried over from the last
+    # frame unless `pickups` says they changed or the head has moved on to
+    # other chunks.
+    def _publish(self, now, pickups):
+        sim = self.sim
+        if pickups:
+            self._foods = tuple(food.position for food in sim.foods)
+            self._obstacles = tuple(sim.obstacles)
+        bounds = self._view_bounds()
+        if pickups or bounds != self._bounds:
+            self._bounds = bounds
+            self._view = copy_view(sim.board, bounds)
+        return Frame(sim, now, self.move_time, self.generation, self._foods, self._obstacles, self._view)
+
+    # The cells a camera following the head can show while it moves between
+    # its last cell and the next, clamped at the world edges as
+    # WorldView.follow is, rounded out to whole chunks
+    def _view_bounds(self):
+        snake = self.sim.snake
+        width = self.view[0] // CELL_SIZE + 2
+        height = self.view[1] // CELL_SIZE + 2
+        xs = []
+        ys = []
+        for x, y in (snake.prev_head, snake.segments[0]):
+            xs.append(max(0, min(self.cols - width, x - width // 2)))
+            ys.append(max(0, min(self.rows - height, y - height // 2)))
+        shift = self.sim.board.shift
+        return (
+            min(xs) >> shift << shift, min(ys) >> shift << shift,
+            ((max(xs) + width - 1) >> shift) + 1 << shift, ((max(ys) + height - 1) >> shift) + 1 << shift,
+        )
+
+    # Render thread
+
+    def _show(self, frame):
+        self.frame = frame
+        snake = self.snake
+        snake.segments = frame.segments
+        snake.prev_head = frame.prev_head
+        snake.prev_tail = frame.prev_tail
+        snake.dx = frame.dx
+        snake.dy = frame.dy
+        if frame.generation != self._shown_generation:
+            self._shown_generation = frame.generation
+            self.board = FrameBoard(self.cols, self.rows, self.chunk)
+            self.obstacles = []
+        self.board.frame = frame
+        self.powerups = list(frame.powerups)
+        self.obstacles.extend(frame.obstacles[len(self.obstacles):])
+        self.score = frame.score
+        self.combo_count = frame.combo_count
+        self.active_powerup = frame.active_powerup
+        self.alive = frame.alive
+        self.move_time = frame.move_time
+
+    # Food objects for the frame on show, made on first use and reused after
+    # that. A large world draws food from the board instead and never asks.
+    @property
+    def foods(self):
+        positions = self.frame.foods
+        if positions is not self._food_source:
+            self._food_source = positions
+            foods = self._food_objects
+            while len(foods) < len(positions):
+                foods.append(Food())
+            del foods[len(positions):]
+            for food, position in zip(foods, positions):
+                food.position = position
+        return self._food_objects
+
+    def update(self, dt, controller=None, max_ticks=None):
+        if self.error is not None:
+            raise RuntimeError("simulation worker stopped") from self.error
+        self.controller = controller
+        frame = self.front
+        if frame is self.frame:
+            return 0
+        ticks = max(0, frame.tick_count - self.tick_count)
+        self.tick_count = frame.tick_count
+        self._show(frame)
+        return ticks
+
+    def _since_frame(self):
+        return time.perf_counter() - self.frame.time
+
+    @property
+    def powerup_timer(self):
+        return max(0.0, self.frame.powerup_timer - self._since_frame())
+
+    def current_interval(self):
+        return self.frame.interval
+
+    def alpha(self):
+        interval = self.frame.interval
+        if interval <= 0:
+            return 1.0
+        return max(0.0, min(1.0, (self.frame.accumulator + self._since_frame()) / interval))
+
+    def pop_events(self):
+        events = []
+        while self.events:
+            events.append(self.events.popleft())
+        return events
+
+    def change_direction(self, direction):
+        self.commands.append(("direction", direction))
+
+    def reset(self, seed=None):
+        self.commands.append(("reset", seed))
+
+
+# Runs update and draw on their own thread, into two offscreen surfaces in
+# turn, so the main thread, which SDL needs for reading input and presenting,
+# never waits on a slow frame. `draw(surface, events, dt)` renders one frame
+# and handles the events posted since the last one. The main thread take()s
+# the newest finished surface, presents it and release()s it; no new frame is
+# started until the last one has been taken, so rendering runs at the
+# presentation rate, capped at `frame_cap` frames per second when non-zero.
+class RenderThread:
+    def __init__(self, size, draw, frame_cap=0):
+        self.draw = draw
+        self.frame_cap = frame_cap
+        self.surfaces = [pygame.Surface(size).convert() for _ in range(2)]
+        self.ready = None
+        self.presenting = None
+        self.events = deque()
+        self.error = None
+        self.condition = threading.Condition()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="render", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.thread.join()
+
+    def post(self, event):
+        self.events.append(event)
+
+    def _run(self):
+        try:
+            clock = pygame.time.Clock()
+            last_frame = time.perf_counter()
+            while True:
+                with self.condition:
+                    while self.running and self.ready is not None:
+                        self.condition.wait()
+                    if not self.running:
+                        return
+                    target = 1 if self.presenting == 0 else 0
+                clock.tick(self.frame_cap)
+                now = time.perf_counter()
+                events = []
+                while self.events:
+                    events.append(self.events.popleft())
+                self.draw(self.surfaces[target], events, now - last_frame)
+                last_frame = now
+                with self.condition:
+                    self.ready = target
+        except Exception as exc:
+            self.error = exc
+
+    def take(self):
+        if self.error is not None:
+            raise RuntimeError("render thread stopped") from self.error
+        with self.condition:
+            if self.ready is None:
+                return None
+            self.presenting = self.ready
+            self.ready = None
+            self.condition.notify()
+            return self.surfaces[self.presenting]
+
+    def release(self):
+        with self.condition:
+            self.presenting = None
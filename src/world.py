@@ -0,0 +1,103 @@
+import pygame
+from collections import OrderedDict
+from board import OBSTACLE
+from sprites import sprite_cache
+from settings import CELL_SIZE, BG_COLOR, GRID_COLOR, OBSTACLE_COLOR, WORLD_CHUNK_CACHE
+
+
+# Draws a board through a camera that follows the snake's head. Nothing
+# here is the size of the world: the background is one screen-sized grid tile
+# shifted by the camera, obstacles are pre-rendered per chunk and kept in a
+# small LRU cache, and food and power-ups are looked up only in the chunks the
+# viewport overlaps.
+class WorldView:
+    def __init__(self, width, height, cache_size=WORLD_CHUNK_CACHE):
+        self.width = width
+        self.height = height
+        self.cache_size = cache_size
+        self.chunk_art = OrderedDict()
+        self.board = None
+        self.x = 0
+        self.y = 0
+        self.tile = self._build_tile()
+
+    def _build_tile(self):
+        width = self.width + CELL_SIZE
+        height = self.height + CELL_SIZE
+        surface = pygame.Surface((width, height))
+        surface.fill(BG_COLOR)
+        for x in range(0, width, CELL_SIZE):
+            pygame.draw.line(surface, GRID_COLOR, (x, 0), (x, height))
+        for y in range(0, height, CELL_SIZE):
+            pygame.draw.line(surface, GRID_COLOR, (0, y), (width, y))
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface
+
+    # Centres the camera on the interpolated head, clamped to the world edges
+    def follow(self, snake, alpha, cols, rows):
+        head = snake.segments[0]
+        prev = snake.prev_head
+        x = (prev[0] + (head[0] - prev[0]) * alpha + 0.5) * CELL_SIZE - self.width / 2
+        y = (prev[1] + (head[1] - prev[1]) * alpha + 0.5) * CELL_SIZE - self.height / 2
+        self.x = int(max(0, min(cols * CELL_SIZE - self.width, x)))
+        self.y = int(max(0, min(rows * CELL_SIZE - self.height, y)))
+
+    def visible_chunks(self, board):
+        x0 = self.x // CELL_SIZE
+        y0 = self.y // CELL_SIZE
+        x1 = (self.x + self.width) // CELL_SIZE + 1
+        y1 = (self.y + self.height) // CELL_SIZE + 1
+        return board.chunks_in(x0, y0, x1, y1)
+
+    def draw_background(self, screen, offset):
+        screen.blit(self.tile, (offset[0] % CELL_SIZE - CELL_SIZE, offset[1] % CELL_SIZE - CELL_SIZE))
+
+    def draw_obstacles(self, screen, board, keys, offset):
+        if board is not self.board:
+            self.chunk_art.clear()
+            self.board = board
+        size = board.chunk * CELL_SIZE
+        blits = []
+        for key in keys:
+            if not board.revisions.get(key):
+                continue
+            art = self._chunk_art(board, key)
+            if art is not None:
+                blits.append((art, (key[0] * size + offset[0], key[1] * size + offset[1])))
+        screen.blits(blits, doreturn=False)
+        return len(blits)
+
+    def _chunk_art(self, board, key):
+        revision = board.revisions.get(key, 0)
+        cached = self.chunk_art.get(key)
+        if cached is not None and cached[0] == revision:
+            self.chunk_art.move_to_end(key)
+            return cached[1]
+
+        cells = list(board.find_in(key, OBSTACLE))
+        if not cells:
+            surface = None
+        else:
+            size = board.chunk * CELL_SIZE
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            tile = sprite_cache.get(OBSTACLE_COLOR, CELL_SIZE, "obstacle")
+            base_x = key[0] * board.chunk
+            base_y = key[1] * board.chunk
+            surface.blits(
+                [(tile, ((x - base_x) * CELL_SIZE, (y - base_y) * CELL_SIZE)) for x, y in cells],
+                doreturn=False,
+            )
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+        self.chunk_art[key] = (revision, surface)
+        self.chunk_art.move_to_end(key)
+        if len(self.chunk_art) > self.cache_size:
+            self.chunk_art.popitem(last=False)
+        return surface
+
+    def pickups(self, board, keys, kind):
+        cells = []
+        for key in keys:
+            cells.extend(board.find_in(key, kind))
+        return cells
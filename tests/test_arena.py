@@ -0,0 +1,110 @@
+from collections import deque
+from arena import Arena
+from board import SNAKE, FOOD
+from food import Food
+from settings import BASE_SCORE, INITIAL_MOVE_INTERVAL, SPEED_UP_FACTOR
+from simulation import Simulation
+
+STEPS = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+
+
+# An arena of human-steered players on an empty 12x12 board, for laying out
+# collisions by hand
+def empty_arena(snakes):
+    arena = Arena(snakes, 12, 12, seed=0, food_count=0, humans=snakes)
+    arena.board = arena._new_board()
+    arena.obstacles = []
+    arena.powerups = []
+    arena.foods = []
+    arena.food_at = {}
+    return arena
+
+
+def place(arena, index, cells, direction):
+    player = arena.players[index]
+    player.spawn(cells[0])
+    player.snake.segments = deque(cells)
+    player.snake.dx, player.snake.dy = STEPS[direction]
+    for x, y in cells:
+        arena.board.set(x, y, SNAKE)
+    return player
+
+
+def snake_cells(arena):
+    board = arena.board
+    return {(x, y) for y in range(board.rows) for x in range(board.cols) if board.get(x, y) == SNAKE}
+
+
+def test_heads_meeting_on_one_cell_both_die():
+    arena = empty_arena(2)
+    a = place(arena, 0, [(5, 5), (4, 5)], "RIGHT")
+    b = place(arena, 1, [(7, 5), (8, 5)], "LEFT")
+    arena.step([a, b])
+    assert (a.alive, b.alive) == (False, False)
+    assert (a.death_cause, b.death_cause) == ("head", "head")
+    assert not snake_cells(arena)
+    assert arena.pop_events() == [("dead", (6, 5))]
+
+
+def test_heads_swapping_cells_both_die():
+    arena = empty_arena(2)
+    a = place(arena, 0, [(5, 5)], "RIGHT")
+    b = place(arena, 1, [(6, 5)], "LEFT")
+    arena.step([a, b])
+    assert (a.death_cause, b.death_cause) == ("head", "head")
+    assert not snake_cells(arena)
+
+
+# A head may take the cell another snake's tail leaves in the same step, but
+# not the tail of a snake that is not moving
+def test_following_a_moving_tail():
+    arena = empty_arena(2)
+    a = place(arena, 0, [(5, 5), (4, 5)], "RIGHT")
+    b = place(arena, 1, [(7, 5), (6, 5)], "RIGHT")
+    arena.step([a, b])
+    assert a.alive and b.alive
+    assert snake_cells(arena) == {(6, 5), (5, 5), (8, 5), (7, 5)}
+
+    arena.step([a])
+    assert not a.alive
+    assert a.death_cause == "snake"
+    assert snake_cells(arena) == {(8, 5), (7, 5)}
+
+
+def test_following_its_own_tail():
+    arena = empty_arena(1)
+    a = place(arena, 0, [(5, 5), (5, 6), (6, 6), (6, 5)], "RIGHT")
+    arena.step([a])
+    assert a.alive
+    assert list(a.snake.segments) == [(6, 5), (5, 5), (5, 6), (6, 6)]
+
+
+# Deaths are all decided before any corpse is cleared: running into the body
+# of a snake that dies in the same step is still fatal
+def test_corpses_clear_after_every_death_is_decided():
+    arena = empty_arena(2)
+    a = place(arena, 0, [(5, 1)], "RIGHT")
+    b = place(arena, 1, [(6, 0), (6, 1), (6, 2)], "UP")
+    arena.step([a, b])
+    assert (a.death_cause, b.death_cause) == ("snake", "wall")
+    assert not snake_cells(arena)
+
+
+# Players score, speed up and chain combos by the same rules as Simulation
+def test_eating_follows_the_single_player_rules():
+    arena = empty_arena(1)
+    a = place(arena, 0, [(5, 5)], "RIGHT")
+    sim = Simulation(12, 12, seed=0)
+    for x in (6, 7):
+        food = Food()
+        food.position = (x, 5)
+        arena.foods.append(food)
+        arena.food_at[food.position] = food
+        arena.board.set(x, 5, FOOD)
+    for _ in range(2):
+        arena.step([a])
+        sim._eat_food()
+    assert a.alive
+    assert (a.score, a.combo_count) == (sim.score, sim.combo_count) == (BASE_SCORE * 3, 2)
+    assert a.move_interval == sim.move_interval == INITIAL_MOVE_INTERVAL * SPEED_UP_FACTOR ** 2
+    assert len(arena.foods) == 2
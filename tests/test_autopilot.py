@@ -0,0 +1,63 @@
+import time
+from collections import deque
+import pytest
+from autopilot import Autopilot, BLOCKED, INF
+from board import FOOD
+from simulation import Simulation
+
+
+# Path lengths to the nearest food by a plain breadth-first search
+def fresh_distances(board):
+    cells = board.cells
+    cols, rows = board.cols, board.rows
+    dist = [INF] * len(cells)
+    queue = deque()
+    for i, kind in enumerate(cells):
+        if kind == FOOD:
+            dist[i] = 0
+            queue.append(i)
+    while queue:
+        i = queue.popleft()
+        x, y = i % cols, i // cols
+        for nx, ny in ((x - 1, y), (x + 1, y), (x, y - 1), (x, y + 1)):
+            n = ny * cols + nx
+            if 0 <= nx < cols and 0 <= ny < rows and dist[n] == INF and not BLOCKED[cells[n]]:
+                dist[n] = dist[i] + 1
+                queue.append(n)
+    return dist
+
+
+# Plays `ticks` ticks steered by an autopilot with the given budget, checking
+# its distance field against a fresh search whenever it reports it up to date
+def play_checked(seed, budget, ticks=6000):
+    sim = Simulation(seed=seed)
+    pilot = Autopilot(budget)
+    checked = 0
+    while sim.tick_count < ticks:
+        if not sim.alive:
+            sim.reset(sim.seed + 1)
+        if sim.move_due():
+            start = time.perf_counter()
+            if pilot.sync(sim, start + budget):
+                assert list(pilot.dist) == fresh_distances(sim.board)
+                checked += 1
+            direction = pilot.choose(sim, start + budget)
+            if direction:
+                sim.change_direction(direction)
+        sim.tick()
+        sim.events.clear()
+    return checked
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_patched_distances_match_a_fresh_search(seed):
+    checked = play_checked(seed, budget=10.0)
+    assert checked > 100
+
+
+# With a tight budget rebuilds run over several decisions and patches can give
+# up half way; whatever sync() calls up to date still has to be exact
+@pytest.mark.parametrize("seed", range(2))
+def test_distances_stay_exact_under_a_tight_budget(seed):
+    checked = play_checked(seed, budget=0.0003)
+    assert checked > 0
@@ -0,0 +1,57 @@
+import random
+import pytest
+from board import Board, ChunkedBoard, EMPTY, SNAKE, FOOD, OBSTACLE
+
+
+def check_free_index(board):
+    cells = board.cells
+    assert sorted(board.free) == [i for i in range(len(cells)) if cells[i] == EMPTY]
+    for slot, index in enumerate(board.free):
+        assert board.slots[index] == slot
+    for index in range(len(cells)):
+        if cells[index] != EMPTY:
+            assert board.slots[index] == -1
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_free_index_follows_random_sets(seed):
+    rng = random.Random(seed)
+    board = Board(23, 17)
+    for _ in range(3000):
+        x, y = rng.randrange(board.cols), rng.randrange(board.rows)
+        board.set(x, y, rng.choice((EMPTY, EMPTY, SNAKE, FOOD, OBSTACLE)))
+    check_free_index(board)
+    assert board.free_count() == board.cells.count(EMPTY)
+
+
+def test_random_free_only_returns_empty_cells():
+    rng = random.Random(1)
+    board = Board(8, 8)
+    cells = [(x, y) for y in range(8) for x in range(8)]
+    rng.shuffle(cells)
+    for x, y in cells[:-3]:
+        board.set(x, y, SNAKE)
+    picked = {board.random_free(rng) for _ in range(200)}
+    assert picked == set(cells[-3:])
+    for x, y in cells[-3:]:
+        board.set(x, y, FOOD)
+    assert board.is_full()
+    assert board.random_free(rng) is None
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_chunked_board_matches_dense(seed):
+    rng = random.Random(seed)
+    dense = Board(70, 45)
+    chunked = ChunkedBoard(70, 45)
+    for _ in range(3000):
+        x, y = rng.randrange(70), rng.randrange(45)
+        kind = rng.choice((EMPTY, EMPTY, SNAKE, FOOD, OBSTACLE))
+        dense.set(x, y, kind)
+        chunked.set(x, y, kind)
+    assert chunked.free_count() == dense.free_count()
+    assert all(chunked.get(x, y) == dense.get(x, y) for y in range(45) for x in range(70))
+    assert chunked.revisions == dense.revisions
+    for key in dense.chunks_in(0, 0, 70, 45):
+        for kind in (SNAKE, FOOD, OBSTACLE):
+            assert sorted(chunked.find_in(key, kind)) == sorted(dense.find_in(key, kind))
@@ -0,0 +1,82 @@
+import random
+import numpy as np
+import pytest
+from arena import Arena
+from board import SNAKE, FOOD, OBSTACLE, POWERUP
+from observation import (
+    Observation, ObservationBatch, CHANNELS, HEAD, BODY, RIVALS, FOOD_CHANNEL, OBSTACLE_CHANNEL,
+    POWERUP_CHANNEL, SLOW, DOUBLE, COMBO,
+)
+from settings import POWERUP_DURATION, COMBO_WINDOW
+from simulation import Simulation
+from tournament import greedy_bot
+
+
+# The tensor built from scratch out of the board, snake and timers
+def brute_force(sim):
+    cols, rows = sim.cols, sim.rows
+    board = sim.board
+    expected = np.zeros((len(CHANNELS), rows, cols), dtype=np.float32)
+    kinds = np.array([[board.get(x, y) for x in range(cols)] for y in range(rows)])
+    expected[FOOD_CHANNEL] = kinds == FOOD
+    expected[OBSTACLE_CHANNEL] = kinds == OBSTACLE
+    expected[POWERUP_CHANNEL] = kinds == POWERUP
+    segments = list(sim.snake.segments)
+    length = len(segments)
+    # Head first: a fatal head that ran into the body never made it onto the
+    # board, so the body segment under it is what the body plane shows
+    for i in range(length):
+        x, y = segments[i]
+        if board.in_bounds(x, y):
+            expected[BODY, y, x] = np.float32(length - i) * np.float32(1.0 / length)
+    own = set(segments)
+    for y in range(rows):
+        for x in range(cols):
+            if kinds[y, x] == SNAKE and (x, y) not in own:
+                expected[RIVALS, y, x] = 1.0
+    head = segments[0]
+    if board.in_bounds(*head):
+        expected[HEAD, head[1], head[0]] = 1.0
+    active = sim.active_powerup if sim.powerup_timer > 0 else None
+    left = sim.powerup_timer / POWERUP_DURATION
+    expected[SLOW] = left if active == "slow" else 0.0
+    expected[DOUBLE] = left if active == "double" else 0.0
+    expected[COMBO] = sim.combo_timer / COMBO_WINDOW
+    return expected
+
+
+def steer(rng):
+    def controller(sim):
+        direction = rng.choice(("UP", "DOWN", "LEFT", "RIGHT")) if rng.random() < 0.15 else greedy_bot(sim)
+        if direction:
+            sim.change_direction(direction)
+    return controller
+
+
+# Updated at uneven intervals, so some updates see several moves at once and
+# some none, across deaths and resets
+@pytest.mark.parametrize("seed", range(4))
+def test_simulation_matches_brute_force(seed):
+    rng = random.Random(seed)
+    sim = Simulation(seed=seed)
+    observation = Observation(sim)
+    controller = steer(rng)
+    for _ in range(400):
+        sim.update(rng.choice((0.0, 1 / 60, 1 / 20, 0.3)), controller)
+        sim.events.clear()
+        if not sim.alive and rng.random() < 0.2:
+            sim.reset(rng.getrandbits(32))
+        np.testing.assert_allclose(observation.update(), brute_force(sim), rtol=1e-6, atol=0)
+
+
+@pytest.mark.parametrize("seed", range(2))
+def test_arena_players_match_brute_force(seed):
+    rng = random.Random(seed)
+    arena = Arena(8, 40, 30, seed=seed, bot=greedy_bot, humans=0)
+    observations = ObservationBatch(arena.players[:3])
+    for _ in range(300):
+        arena.update(rng.choice((1 / 60, 1 / 20, 0.2)))
+        arena.pop_events()
+        tensor = observations.update()
+        for i, player in enumerate(arena.players[:3]):
+            np.testing.assert_allclose(tensor[i], brute_force(player), rtol=1e-6, atol=0)
@@ -0,0 +1,66 @@
+import random
+import pytest
+from replay import Replay, ReplaySimulation, run_replay
+from simulation import Simulation
+from tournament import greedy_bot
+
+SEEDS = range(6)
+
+
+# Plays a seeded game at 60 frames per second, steered by the greedy bot with
+# the odd random turn so there are plenty of inputs to record
+def play(seed, max_ticks=20000):
+    rng = random.Random(seed)
+    sim = Simulation(seed=seed)
+
+    def steer(sim):
+        direction = rng.choice(("UP", "DOWN", "LEFT", "RIGHT")) if rng.random() < 0.1 else greedy_bot(sim)
+        if direction:
+            sim.change_direction(direction)
+
+    while sim.alive and sim.tick_count < max_ticks:
+        sim.update(1 / 60, steer)
+        sim.events.clear()
+    return sim
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_round_trip(seed):
+    replay = Replay.from_simulation(play(seed))
+    loaded = Replay.from_bytes(replay.to_bytes())
+    assert vars(loaded) == vars(replay)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_replay_reproduces_the_game(seed):
+    sim = play(seed)
+    replay = Replay.from_bytes(Replay.from_simulation(sim).to_bytes())
+    assert replay.inputs
+    played = run_replay(replay)
+    assert played.score == sim.score
+    assert played.tick_count == replay.ticks
+    assert played.alive == sim.alive
+    assert list(played.snake.segments) == list(sim.snake.segments)
+    assert sorted(food.position for food in played.foods) == sorted(food.position for food in sim.foods)
+    assert played.inputs == sim.inputs
+
+
+def test_reset_replays_from_the_start():
+    replay = Replay.from_simulation(play(3, max_ticks=3000))
+    sim = ReplaySimulation(replay)
+    while not sim.finished():
+        sim.tick()
+    first = (sim.score, list(sim.snake.segments))
+    sim.reset(seed=12345)
+    while not sim.finished():
+        sim.tick()
+    assert (sim.score, list(sim.snake.segments)) == first
+
+
+def test_rejects_other_formats():
+    data = bytearray(Replay.from_simulation(play(0, max_ticks=600)).to_bytes())
+    data[4] += 1
+    with pytest.raises(ValueError):
+        Replay.from_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        Replay.from_bytes(b"XXXX" + bytes(data[4:]))
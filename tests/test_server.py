@@ -0,0 +1,153 @@
+import random
+import pytest
+from client import RemoteSimulation
+from protocol import FrameBuffer, Reader, SNAPSHOT, DELTA, encode_input, encode_reset
+from server import Connection, Room, Server
+from tournament import greedy_bot
+
+SEEDS = range(4)
+
+
+# Stands in for an asyncio transport: keeps what was written and reports
+# whatever write buffer size the test sets
+class FakeTransport:
+    def __init__(self):
+        self.written = bytearray()
+        self.buffered = 0
+
+    def write(self, data):
+        self.written += data
+
+    def is_closing(self):
+        return False
+
+    def get_write_buffer_size(self):
+        return self.buffered
+
+    def take(self):
+        data = bytes(self.written)
+        self.written.clear()
+        return data
+
+
+class FakeWriter:
+    def __init__(self):
+        self.transport = FakeTransport()
+
+
+# A server with one seeded room and one client whose messages go straight to
+# Server._handle, the way _serve hands them over
+def connect(seed, **kwargs):
+    server = Server(**kwargs)
+    server.rooms[0] = Room(0, seed)
+    connection = Connection(FakeWriter())
+    server.connections.append(connection)
+    frames = FrameBuffer()
+
+    def send(data):
+        for message in frames.feed(data):
+            server._handle(connection, Reader(message))
+
+    remote = RemoteSimulation(send)
+    return server, connection, remote
+
+
+def kinds(data):
+    return [message[0] for message in FrameBuffer().feed(data)]
+
+
+def assert_mirrors(remote, sim):
+    assert list(remote.snake.segments) == list(sim.snake.segments)
+    assert bytes(remote.board.cells) == bytes(sim.board.cells)
+    assert sorted(food.position for food in remote.foods) == sorted(food.position for food in sim.foods)
+    assert sorted(p["position"] for p in remote.powerups) == sorted(p["position"] for p in sim.powerups)
+    assert sorted(remote.obstacles) == sorted(sim.obstacles)
+    assert (remote.score, remote.combo_count, remote.active_powerup, remote.alive) == (
+        sim.score, sim.combo_count, sim.active_powerup, sim.alive)
+    assert remote.interval == pytest.approx(sim.current_interval())
+
+
+# A full snapshot on join, then one delta per tick, keeps the client's copy
+# identical to the room's simulation through eating, power-ups, deaths and
+# restarts
+@pytest.mark.parametrize("seed", SEEDS)
+def test_snapshot_and_deltas_mirror_the_room(seed):
+    server, connection, remote = connect(seed)
+    sim = server.rooms[0].sim
+    transport = connection.transport
+    rng = random.Random(seed)
+    server.tick()
+    assert kinds(transport.written)[0] == SNAPSHOT
+    deaths = 0
+    scored = False
+    for _ in range(6000):
+        remote.feed(transport.take())
+        assert_mirrors(remote, sim)
+        scored = scored or remote.score > 0
+        if not remote.alive:
+            deaths += 1
+            remote.reset()
+        elif remote.moves:
+            # Steer from the client's copy once per move, as bot clients do
+            remote.moves = 0
+            direction = rng.choice(("UP", "DOWN", "LEFT", "RIGHT")) if rng.random() < 0.2 else greedy_bot(remote)
+            if direction:
+                remote.change_direction(direction)
+        server.tick()
+    assert deaths and scored
+
+
+def test_inputs_past_the_cap_are_dropped_but_reset_is_not():
+    server, connection, remote = connect(0, max_inputs=2)
+    room = server.rooms[0]
+    for direction in ("UP", "LEFT", "DOWN", "RIGHT"):
+        remote.change_direction(direction)
+    remote.send(encode_reset())
+    assert [direction for _, direction in room.inputs] == ["UP", "LEFT", None]
+
+    server.tick()
+    assert not room.inputs
+    remote.send(encode_input("DOWN"))
+    assert [direction for _, direction in room.inputs] == ["DOWN"]
+
+
+# A client whose write buffer passes the high-water mark gets nothing until it
+# drains below the low-water mark, then a single fresh snapshot
+def test_stalled_client_resyncs_with_a_snapshot():
+    server, connection, remote = connect(1)
+    connection.high_water, connection.low_water = 100, 10
+    sim = server.rooms[0].sim
+    transport = connection.transport
+    server.tick()
+    remote.feed(transport.take())
+    for _ in range(30):
+        server.tick()
+    remote.feed(transport.take())
+    assert_mirrors(remote, sim)
+
+    transport.buffered = 500
+    server.tick()
+    assert connection.stalled
+    assert not transport.written
+    for _ in range(60):
+        server.tick()
+    transport.buffered = 50
+    server.tick()
+    assert connection.stalled
+    assert not transport.written
+    assert server.resyncs == 0
+
+    transport.buffered = 0
+    server.tick()
+    assert not connection.stalled
+    assert server.resyncs == 1
+    data = transport.take()
+    assert kinds(data)[0] == SNAPSHOT
+    remote.feed(data)
+    assert_mirrors(remote, sim)
+    for _ in range(30):
+        server.tick()
+    data = transport.take()
+    assert set(kinds(data)) <= {DELTA}
+    remote.feed(data)
+    assert_mirrors(remote, sim)
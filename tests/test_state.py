@@ -0,0 +1,86 @@
+import pytest
+import simulation
+from board import Board, ChunkedBoard, OBSTACLE
+from simulation import Simulation
+from state import SimState
+from tournament import greedy_bot
+
+
+def steer(sim):
+    direction = greedy_bot(sim)
+    if direction:
+        sim.change_direction(direction)
+
+
+def run(sim, ticks):
+    for _ in range(ticks):
+        if sim.move_due():
+            steer(sim)
+        sim.tick()
+    return fingerprint(sim)
+
+
+def fingerprint(sim):
+    board = sim.board
+    cells = bytes(board.get(x, y) for y in range(sim.rows) for x in range(sim.cols))
+    return (
+        sim.tick_count, sim.score, sim.alive, sim.death_cause, list(sim.snake.segments), sim.snake.pending_growth,
+        sorted(food.position for food in sim.foods), list(sim.obstacles), sim.powerups, sim.active_powerup,
+        sim.powerup_timer, sim.combo_count, sim.combo_timer, sim.move_interval, sim.inputs,
+        board.free_count(), cells, sim.rng.random(),
+    )
+
+
+# A small world stored in chunks, as a large one would be
+@pytest.fixture(params=[Board, ChunkedBoard])
+def board_type(request, monkeypatch):
+    if request.param is ChunkedBoard:
+        monkeypatch.setattr(simulation, "DENSE_BOARD_LIMIT", 0)
+    return request.param
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_restore_then_step_matches(board_type, seed):
+    sim = Simulation(seed=seed)
+    assert type(sim.board) is board_type
+    run(sim, 600)
+    state = sim.snapshot()
+    expected = run(sim, 2000)
+    sim.restore(state)
+    assert run(sim, 2000) == expected
+    # A snapshot can be restored again after the game moved on
+    sim.restore(state)
+    assert run(sim, 2000) == expected
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_serialized_state_restores_into_a_fresh_simulation(board_type, seed):
+    sim = Simulation(seed=seed)
+    run(sim, 900)
+    state = SimState.deserialize(sim.snapshot().serialize())
+    expected = run(sim, 1500)
+    other = Simulation(seed=seed + 100)
+    other.inputs = list(sim.inputs[:state.input_count])
+    state.restore(other)
+    assert type(other.board) is board_type
+    assert run(other, 1500) == expected
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_clone_is_independent(board_type, seed):
+    sim = Simulation(seed=seed)
+    run(sim, 900)
+    clone = sim.clone()
+    expected = run(clone, 1500)
+    assert run(sim, 1500) == expected
+
+
+def test_serialized_state_keeps_the_chunk_size(board_type, monkeypatch):
+    monkeypatch.setattr(simulation, "WORLD_CHUNK", 32)
+    sim = Simulation(seed=1)
+    run(sim, 300)
+    state = SimState.deserialize(sim.snapshot().serialize())
+    assert (state.board.chunk, state.board.shift) == (32, 5)
+    for key in sim.board.chunks_in(0, 0, sim.cols, sim.rows):
+        assert list(state.board.find_in(key, OBSTACLE)) == list(sim.board.find_in(key, OBSTACLE))
+        assert bool(state.board.revisions.get(key)) == bool(list(sim.board.find_in(key, OBSTACLE)))
@@ -0,0 +1,19 @@
+from tournament import play, greedy_bot, run_tournament, summarize
+
+SPEC = "tournament:greedy_bot"
+
+
+def test_play_is_deterministic():
+    assert [play(greedy_bot, seed, 20000) for seed in range(4)] == [play(greedy_bot, seed, 20000) for seed in range(4)]
+
+
+# Results come back in completion order, but each game depends only on its
+# seed, whatever the batching and number of workers
+def test_pool_matches_serial_play():
+    seeds = list(range(10))
+    results = run_tournament(SPEC, seeds, workers=2, batch_size=3, max_ticks=20000)
+    by_seed = sorted(results, key=lambda result: result["seed"])
+    assert by_seed == [play(greedy_bot, seed, 20000) for seed in seeds]
+    summary = summarize(results)
+    assert summary["games"] == len(seeds)
+    assert sum(summary["causes"].values()) == len(seeds)
@@ -0,0 +1,130 @@
+import random
+import numpy as np
+import pytest
+from board import SNAKE, OBSTACLE, FOOD
+from simulation import Simulation, SIM_DT
+from settings import POWERUP_SLOW_FACTOR
+from vecenv import VecSnakeEnv, UP, DOWN, LEFT, RIGHT, NO_POWERUP, SLOW, DOUBLE
+
+ACTIONS = {"UP": UP, "DOWN": DOWN, "LEFT": LEFT, "RIGHT": RIGHT}
+STEPS = {"UP": (0, -1), "DOWN": (0, 1), "LEFT": (-1, 0), "RIGHT": (1, 0)}
+POWERUPS = {None: NO_POWERUP, "slow": SLOW, "double": DOUBLE}
+
+
+# Puts a Simulation's game on board `i` of `env`
+def load(env, i, sim):
+    cols = sim.cols
+    env.grid[i] = np.frombuffer(bytes(sim.board.cells), dtype=np.uint8)
+    segments = list(sim.snake.segments)
+    for k, (x, y) in enumerate(reversed(segments)):
+        env.body[i, k] = y * cols + x
+    env.tail_ptr[i] = 0
+    env.head_ptr[i] = len(segments) - 1
+    env.length[i] = len(segments)
+    env.direction[i] = [UP, DOWN, LEFT, RIGHT][[(0, -1), (0, 1), (-1, 0), (1, 0)].index((sim.snake.dx, sim.snake.dy))]
+    env.pending_growth[i] = sim.snake.pending_growth
+    env.foods[i] = -1
+    for slot, food in enumerate(sim.foods):
+        env.foods[i, slot] = food.position[1] * cols + food.position[0]
+    env.powerup_cell[i] = -1
+    env.powerup_kind[i] = NO_POWERUP
+    for powerup in sim.powerups:
+        env.powerup_cell[i] = powerup["position"][1] * cols + powerup["position"][0]
+        env.powerup_kind[i] = POWERUPS[powerup["type"]]
+    env.obstacle_count[i] = len(sim.obstacles)
+    env.move_interval[i] = sim.move_interval
+    env.combo_timer[i] = sim.combo_timer
+    env.combo_count[i] = sim.combo_count
+    env.powerup_timer[i] = sim.powerup_timer
+    env.active_powerup[i] = POWERUPS[sim.active_powerup]
+    env.score_multiplier[i] = sim.score_multiplier
+    env.score[i] = sim.score
+    env.alive[i] = sim.alive
+
+
+# Heads for the nearest food or power-up, with the odd random turn
+def choose(sim, rng):
+    if rng.random() < 0.1:
+        return rng.choice(list(STEPS))
+    head = sim.snake.segments[0]
+    targets = [food.position for food in sim.foods] + [powerup["position"] for powerup in sim.powerups]
+    best = None
+    for name, (dx, dy) in STEPS.items():
+        x, y = head[0] + dx, head[1] + dy
+        if not sim.board.in_bounds(x, y) or sim.board.get(x, y) in (SNAKE, OBSTACLE):
+            continue
+        distance = min(abs(tx - x) + abs(ty - y) for tx, ty in targets)
+        if best is None or distance < best[0]:
+            best = (distance, name)
+    return best[1] if best else rng.choice(list(STEPS))
+
+
+# Ticks the simulation up to and including its next move, returning the time
+# that took
+def next_move(sim):
+    ticks = 0
+    head = sim.snake.segments[0]
+    while sim.alive:
+        sim.tick()
+        ticks += 1
+        if sim.snake.segments[0] != head or not sim.alive:
+            break
+    return ticks * SIM_DT
+
+
+# Every move of seeded games is made both by a Simulation and by a one-board
+# VecSnakeEnv loaded with the same position, and the outcomes compared. The
+# two draw spawn positions from different generators, so the environment is
+# reloaded from the simulation before each move and only spawn counts are
+# compared. The environment also counts timers down by the move interval
+# where the simulation counts whole ticks, so a timer within that difference
+# of running out is left out of the timer-dependent checks.
+@pytest.mark.parametrize("seed", range(4))
+def test_moves_match_simulation(seed):
+    rng = random.Random(seed)
+    env = VecSnakeEnv(1, seed=seed, auto_reset=False)
+    sim = Simulation(seed=seed)
+    seen = {"eat": 0, "powerup": 0, "dead": 0, "combo": 0}
+    for _ in range(3000):
+        if not sim.alive:
+            sim.reset(rng.getrandbits(32))
+        load(env, 0, sim)
+        direction = choose(sim, rng)
+        sim.change_direction(direction)
+        before = (sim.score, sim.combo_timer, sim.powerup_timer)
+        slow = sim.powerup_timer > 0 and sim.active_powerup == "slow"
+        interval = sim.move_interval * (POWERUP_SLOW_FACTOR if slow else 1.0)
+        elapsed = next_move(sim)
+        rewards, dones = env.step([ACTIONS[direction]])
+        sim.events.clear()
+
+        assert bool(dones[0]) == (not sim.alive)
+        assert bool(env.alive[0]) == sim.alive
+        if not sim.alive:
+            seen["dead"] += 1
+            continue
+        segments = list(sim.snake.segments)
+        head = env.body[0, env.head_ptr[0]]
+        assert (head % sim.cols, head // sim.cols) == segments[0]
+        assert env.length[0] == len(segments)
+        assert env.pending_growth[0] == sim.snake.pending_growth
+        assert env.move_interval[0] == sim.move_interval
+        assert env.obstacle_count[0] == len(sim.obstacles)
+        assert np.count_nonzero(env.grid[0] == FOOD) == len(sim.foods)
+        assert np.count_nonzero(env.grid[0] == OBSTACLE) == len(sim.obstacles)
+        if sim.score > before[0]:
+            seen["eat"] += 1
+            seen["combo"] += sim.combo_count > 1
+
+        low, high = min(elapsed, interval) - 1e-9, max(elapsed, interval) + 1e-9
+        if any(low <= timer <= high for timer in before[1:]):
+            continue
+        assert env.score[0] == sim.score
+        assert rewards[0] == sim.score - before[0]
+        assert env.combo_count[0] == sim.combo_count
+        assert env.active_powerup[0] == POWERUPS[sim.active_powerup]
+        assert env.score_multiplier[0] == sim.score_multiplier
+        if sim.powerup_timer > before[2]:
+            seen["powerup"] += 1
+            assert env.powerup_timer[0] == sim.powerup_timer
+    assert all(seen.values()), seen